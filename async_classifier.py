@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/async_classifier.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: asyncio API around classifier.py for services running an event
+#          loop. File reads, image decoding and inference are run in
+#          executors so the event loop never blocks, and the number of images
+#          in flight is bounded so one loop can keep the inference backend
+#          busy without queueing unbounded work.
+#
+#   Example call:
+#    python async_classifier.py --dir pet_images/ --arch vgg --concurrency 8
+#
+#   Example usage from a coroutine:
+#    label = await classify_async('pet_images/Collie_03797.jpg', 'vgg')
+#    async for img_name, label in classify_dir_async('pet_images/', 'vgg'):
+#        ...
+##
+
+# Imports python modules
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from os import cpu_count, listdir
+from os.path import isfile
+
+# Imports PIL to decode images from memory
+from PIL import Image
+
+# Imports preprocessing & prediction steps of the classifier function
+from classifier import preprocess_image, predict
+
+# executors shared by all calls, created on first use. Decoding releases the
+# GIL so it gets one thread per core; inference uses torch intra-op threads
+# so a single thread is enough to saturate it
+executors = {}
+EXECUTOR_THREADS = {'io': 4, 'decode': cpu_count() or 1, 'inference': 1}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Classify a directory of images with the asyncio API")
+    parser.add_argument('--dir', type=str, default='pet_images/',
+                        help="Path to images files directory")
+    parser.add_argument('--arch', type=str, default='vgg',
+                        help='CNN model architecture to use for image classification(default - vgg)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Max number of images in flight(default - 8)')
+    in_arg = parser.parse_args()
+
+    async def print_classifications():
+        async for img_name, label in classify_dir_async(
+                in_arg.dir, in_arg.arch, in_arg.concurrency):
+            print('{:<50} is classified as: {}'.format(img_name, label))
+
+    asyncio.run(print_classifications())
+
+
+def get_executor(stage):
+    """
+    Returns the thread pool executor used for a stage of the classification,
+    one of: io decode inference.
+    """
+    if stage not in executors:
+        executors[stage] = ThreadPoolExecutor(EXECUTOR_THREADS[stage])
+
+    return executors[stage]
+
+
+def list_images(images_dir):
+    """
+    Returns the sorted filenames of the files of images_dir.
+    """
+    return sorted(name for name in listdir(images_dir) if isfile(images_dir + name))
+
+
+def read_file(img_path):
+    with open(img_path, 'rb') as img_file:
+        return img_file.read()
+
+
+def decode_image(img_bytes):
+    # PIL opens images lazily, so make sure decoding happens in the executor
+    img_pil = Image.open(BytesIO(img_bytes))
+    img_pil.load()
+
+    return preprocess_image(img_pil)
+
+
+async def classify_async(path_or_bytes, arch, semaphore=None):
+    """
+    Classifies an image without blocking the event loop.
+    Parameters:
+     path_or_bytes - path to the image file (string) or its content (bytes)
+     arch - model architecture, one of: resnet alexnet vgg (string)
+     semaphore - optional asyncio.Semaphore bounding the number of images
+                 being read, decoded or classified at the same time
+    Returns:
+     ImageNet label of the predicted class (string)
+    """
+    if semaphore is not None:
+        async with semaphore:
+            return await classify_async(path_or_bytes, arch)
+
+    loop = asyncio.get_running_loop()
+    img_bytes = path_or_bytes
+    if not isinstance(path_or_bytes, (bytes, bytearray)):
+        img_bytes = await loop.run_in_executor(get_executor('io'),
+                                               read_file, path_or_bytes)
+
+    img_tensor = await loop.run_in_executor(get_executor('decode'),
+                                            decode_image, img_bytes)
+
+    return await loop.run_in_executor(get_executor('inference'),
+                                      predict, img_tensor, arch)
+
+
+async def classify_dir_async(images_dir, arch, concurrency=8):
+    """
+    Asynchronous generator classifying all the images of a directory with at
+    most concurrency images in flight. Results are yielded as soon as they
+    are ready, so not necessarily in directory order. The images still in
+    flight are cancelled when the consumer stops early or one of them fails.
+    Parameters:
+     images_dir - The (full) path to the folder of images (string)
+     arch - model architecture, one of: resnet alexnet vgg (string)
+     concurrency - max number of images in flight (int)
+    Yields:
+     (image filename, ImageNet label of the predicted class) tuples
+    """
+    loop = asyncio.get_running_loop()
+    img_names = iter(await loop.run_in_executor(get_executor('io'), list_images,
+                                                images_dir))
+
+    pending = {}
+    try:
+        while True:
+            # keep up to concurrency images in flight
+            for img_name in img_names:
+                task = asyncio.ensure_future(classify_async(images_dir + img_name, arch))
+                pending[task] = img_name
+                if len(pending) >= concurrency:
+                    break
+
+            if not pending:
+                return
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield pending.pop(task), task.result()
+    finally:
+        # don't leave orphaned tasks behind
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/bench_startup.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Tracks the startup cost of the command line programs: the wall
+#          time & peak RSS of runs that never reach inference (--help,
+#          importing the modules) and which heavy modules (torch,
+#          torchvision, PIL, numpy) got imported anyway. Results can be
+#          appended to a JSON lines file to follow them over time.
+#
+#   Example call:
+#    python bench_startup.py --repeat 5 --output startup_bench.jsonl
+##
+
+# Imports python modules
+import argparse
+import json
+import os
+import subprocess
+import sys
+from time import time
+
+# heavy modules that must only be imported by inference/labeling code paths
+HEAVY_MODULES = ('torch', 'torchvision', 'PIL', 'numpy')
+
+# name -> command (run with this python interpreter)
+COMMANDS = {
+    'check_images --help': ['check_images.py', '--help'],
+    'rescore --help': ['rescore.py', '--help'],
+    'import check_images': ['-c', 'import sys, check_images; print(",".join('
+                            'm for m in {!r} if m in sys.modules))'.format(HEAVY_MODULES)],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the startup time & RSS of the programs")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Runs per command, the median time is reported(default - 5)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Append the results as a JSON line to this file')
+    in_arg = parser.parse_args()
+
+    results = {}
+    for name, args in COMMANDS.items():
+        results[name] = bench_command(args, in_arg.repeat)
+        print('{:>22}: {:7.3f}s {:7.1f}MB  heavy modules: {}'.format(
+            name, results[name]['secs'], results[name]['max_rss_mb'],
+            results[name]['heavy_modules'] or 'none'))
+
+    if in_arg.output:
+        with open(in_arg.output, 'a') as output_file:
+            output_file.write(json.dumps({'time': time(), 'results': results}) + '\n')
+
+
+def run_command(args, env=None):
+    """
+    Runs python with args (in env, None for this process's environment) &
+    returns its wall time, peak RSS (from the child's own rusage) and stdout.
+    """
+    start_time = time()
+    process = subprocess.Popen([sys.executable] + args, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, env=env)
+    stdout = process.stdout.read()
+    # wait4 returns the resource usage of this child only
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = status
+    secs = time() - start_time
+    process.stdout.close()
+
+    # ru_maxrss is in KB on Linux (bytes on macOS)
+    max_rss_mb = rusage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+    return secs, max_rss_mb, stdout.decode('utf-8', 'replace')
+
+
+def bench_command(args, repeat):
+    """
+    Runs a command repeat times.
+    Returns:
+     result - Dictionary with the median 'secs', max 'max_rss_mb' and the
+              'heavy_modules' printed by the import check (empty otherwise)
+    """
+    runs = [run_command(args) for _ in range(repeat)]
+    times = sorted(secs for secs, _, _ in runs)
+
+    heavy_modules = ''
+    if args[0] == '-c':
+        heavy_modules = runs[-1][2].strip()
+
+    return {'secs': round(times[len(times) // 2], 4),
+            'max_rss_mb': round(max(max_rss for _, max_rss, _ in runs), 1),
+            'heavy_modules': heavy_modules}
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
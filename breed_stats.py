@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/breed_stats.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Per-breed breakdown of the results of a run: a pet label by
+#          classifier label confusion matrix and the precision & recall of
+#          every pet label. Labels are mapped to integer ids once and all the
+#          counts are numpy reductions (unique / bincount) over those ids, so
+#          it scales to millions of images. The confusion matrix is kept
+#          sparse (COO: one row, col, count triple per non-empty cell) as
+#          most (pet label, class) pairs never occur.
+#
+#   Example usage:
+#    stats = calculates_breed_stats(results_dic)
+#    save_breed_stats('vgg_breeds.npz', stats)
+##
+
+# Imports numpy for the vectorized counts
+import numpy as np
+
+# Imports the label matching of the classifications
+from check_images import check_match
+
+
+def calculates_breed_stats(results_dic):
+    """
+    Calculates the confusion matrix and the per pet label precision & recall
+    of a run.
+    Parameters:
+      results_dic - Dictionary with key as image filename and value as a List
+             (index)idx 0 = pet image label (string)
+                    idx 1 = classifier label (string)
+                    idx 2 = 1/0 (int)  where 1 = match between pet image and
+                            classifer labels and 0 = no match between labels
+                    idx 3 = 1/0 (int)  where 1 = pet image 'is-a' dog and
+                            0 = pet Image 'is-NOT-a' dog.
+    Returns:
+     breed_stats - Dictionary of numpy arrays:
+                   'labels' - distinct pet labels (sorted), row labels
+                   'classes' - distinct classifier labels (sorted), column
+                               labels
+                   'rows', 'cols', 'counts' - the non-empty cells of the
+                                              confusion matrix
+                   'cell_match' - whether the class of each cell matches
+                                  its pet label
+                   and per pet label: 'is_dog', 'n_images', 'n_correct',
+                   'n_predicted' (images whose classifier label matches the
+                   pet label), 'precision' & 'recall' (0 to 1, NaN when
+                   undefined)
+    """
+    image_results = list(results_dic.values())
+    pet_labels = np.array([image_result[0] for image_result in image_results], dtype=str)
+    classifier_labels = np.array([image_result[1] for image_result in image_results],
+                                 dtype=str)
+    match = np.array([image_result[2] for image_result in image_results], dtype=np.int64)
+    pet_is_dog = np.array([image_result[3] if len(image_result) > 3 else 0
+                           for image_result in image_results], dtype=np.int64)
+
+    labels, label_ids = np.unique(pet_labels, return_inverse=True)
+    classes, class_ids = np.unique(classifier_labels, return_inverse=True)
+    n_labels, n_classes = len(labels), len(classes)
+
+    # one code per (pet label, class) cell, counted without a dense matrix
+    cell_codes, counts = np.unique(label_ids.astype(np.int64) * n_classes + class_ids,
+                                   return_counts=True)
+
+    n_images = np.bincount(label_ids, minlength=n_labels)
+    n_correct = np.bincount(label_ids, weights=match, minlength=n_labels).astype(np.int64)
+    is_dog = np.bincount(label_ids, weights=pet_is_dog, minlength=n_labels) > 0
+
+    # a class predicts every pet label it matches: look up the pet labels a
+    # class could match (its names & their words) once per distinct class &
+    # sum the images of the matching classes
+    label_index = {str(label): label_idx for label_idx, label in enumerate(labels)}
+    match_pairs = np.array([(class_idx, label_index[candidate])
+                            for class_idx, class_name in enumerate(classes)
+                            for candidate in match_candidates(str(class_name))
+                            if candidate in label_index and check_match(class_name, candidate)],
+                           dtype=np.int64).reshape(-1, 2)
+    class_counts = np.bincount(class_ids, minlength=n_classes)
+    n_predicted = np.bincount(match_pairs[:, 1], weights=class_counts[match_pairs[:, 0]],
+                              minlength=n_labels).astype(np.int64)
+
+    cell_match = np.isin(cell_codes, match_pairs[:, 1] * n_classes + match_pairs[:, 0])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(n_predicted > 0, n_correct / n_predicted, np.nan)
+        recall = np.where(n_images > 0, n_correct / n_images, np.nan)
+
+    return {'labels': labels, 'classes': classes,
+            'rows': cell_codes // n_classes, 'cols': cell_codes % n_classes,
+            'counts': counts, 'cell_match': cell_match, 'is_dog': is_dog,
+            'n_images': n_images, 'n_correct': n_correct, 'n_predicted': n_predicted,
+            'precision': precision, 'recall': recall}
+
+
+def match_candidates(class_name):
+    """
+    Returns the pet labels check_match() can match a classifier label with:
+    each of its comma separated names & the words of those names (set).
+    """
+    names = class_name.split(', ')
+
+    return set(names).union(*(name.split(' ') for name in names))
+
+
+def top_confusions(breed_stats):
+    """
+    Finds the most frequent classifier label of each pet label among its
+    images that didn't match.
+    Returns:
+     confusions - Dictionary with key as pet label and value as a (classifier
+                  label, count) tuple, only for pet labels with misses
+    """
+    missed = ~breed_stats['cell_match']
+    rows = breed_stats['rows'][missed]
+    cols = breed_stats['cols'][missed]
+    counts = breed_stats['counts'][missed]
+
+    # sort by row then decreasing count & keep the first cell of each row
+    order = np.lexsort((-counts, rows))
+    rows, cols, counts = rows[order], cols[order], counts[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = rows[1:] != rows[:-1]
+
+    return {str(breed_stats['labels'][row]): (str(breed_stats['classes'][col]), int(count))
+            for row, col, count in zip(rows[first], cols[first], counts[first])}
+
+
+def save_breed_stats(path, breed_stats):
+    """
+    Saves the breed stats (sparse confusion matrix included) to a .npz file.
+    Parameters:
+     path - path of the .npz file (string)
+     breed_stats - Dictionary returned by calculates_breed_stats()
+    Returns:
+     None
+    """
+    np.savez_compressed(path, **breed_stats)
@@ -21,19 +21,48 @@
 
 # Imports python modules
 import argparse
+import sys
+from collections import Counter
+from functools import partial
+from io import BytesIO
+from itertools import islice
 from time import time, sleep
-from os import listdir, mkdir
+from os import environ, listdir, mkdir
 from os.path import exists, isfile
 from random import randint
 # Imports classifier function for using CNN to classify images
-from classifier import classifier
+from classifier import classifier_batch, classifier_topk_batch, imagenet_classes_dict
+from classifier import FULL_RESOLUTION, MIN_RESOLUTION, RESOLUTION_ARCHS
+from classifier import open_image, resolve_precision, PRECISIONS, DECODE_MODES
+from classifier import embedding_layers
+# Imports duplicate detection so duplicates are only classified once
+from dedupe import group_duplicates
+# Imports process pool classification sharing the model weights
+from worker_pool import classify_paths
+# Imports the processes x threads layout auto-tuning
+from scheduler import get_layout, available_cores, CALIBRATION_IMAGES
+# Imports the memory budget planning of the workers & batch size
+from memory_budget import (memory_arg, probe_images, measure_footprint, plan_layout,
+                           MemoryGuard, cache_budget, PROBE_SCAN_IMAGES)
+# Imports reading the input images straight from tar/zip shards
+from shard_input import is_shard_input, list_shard_members, iter_shard_images, shards_dir
+# Imports structured results writers
+from results_writer import open_results_writer, RESULTS_FORMATS
+# Imports sharded archive output of the labeled images
+from label_archive import ShardedArchiveWriter, ARCHIVE_FORMATS
+# Imports the checkpoint journal used to resume interrupted runs
+from checkpoint import CheckpointJournal, default_checkpoint_path
+# Imports the decoded image cache shared by the classify & label stages
+from image_cache import DecodedImageCache
+# Imports classification in a running classifier daemon
+from classifier_daemon import DaemonClient, daemon_classify_batch, DAEMON_SOCKET_ENV
+# NOTE: torch, torchvision, PIL & numpy are only imported by the code paths
+# running inference, drawing labels or saving arrays, so --help, argument
+# errors & reports start fast (see bench_startup.py)
 
 # Imports print functions that check the lab
 from print_functions_for_lab_checks import *
 
-# Imports for using PIL to add classification labels to images
-from PIL import Image, ImageDraw, ImageFont
-
 # prettypring for debugging
 import pprint
 
@@ -45,32 +74,176 @@ def main():
 
     # get command line arguments
     in_arg = get_input_args()
+    # extra statistics about the run itself (not the classification) that
+    # are added to the summary report
+    run_stats = {}
     # check_command_line_arguments(in_arg)
 
     # create pet image labels by creating a dictionary with key=filename and value=file label
     # to be used to check the accuracy of the classifier function
     answers_dic = get_pet_labels(in_arg.dir)
 
+    # bf16 falls back to fp32 on CPUs without native support (of the
+    # daemon's machine when classifying in one)
+    if in_arg.daemon:
+        with DaemonClient(in_arg.daemon) as daemon_client:
+            precision = daemon_client.resolve_precision(in_arg.precision)
+        if precision != in_arg.precision:
+            print('The classifier daemon doesn\'t support {}, using {}'.format(
+                in_arg.precision, precision))
+    else:
+        precision = resolve_precision(in_arg.precision)
+    if in_arg.precision != 'fp32':
+        run_stats['precision'] = precision
+
+    # split the cores between processes & threads with the layout tuned for
+    # the classifier settings
+    workers, threads = in_arg.workers, in_arg.threads
+    if workers == 'auto':
+        # a few images are enough to calibrate with when reading shards
+        calibration_files = image_files(in_arg.dir, answers_dic)
+        if is_shard_input(in_arg.dir):
+            calibration_files = islice(calibration_files, CALIBRATION_IMAGES)
+        layout = get_layout(in_arg.arch, in_arg.batch_size,
+                            [img_file for _, img_file in calibration_files],
+                            recalibrate=in_arg.recalibrate,
+                            resolution=in_arg.resolution, precision=precision,
+                            decode=in_arg.decode)
+        workers, threads = layout['workers'], layout['threads']
+        run_stats['layout'] = '{}x{} ({:.2f} images/sec calibrated)'.format(
+            workers, threads, layout['images_per_sec'])
+    workers = int(workers)
+
+    # pick the workers & batch size fitting the memory budget from the
+    # measured model & per-image footprints
+    batch_size = in_arg.batch_size
+    memory_guard = None
+    # the decoded image cache is only used when labeling images classified
+    # in this process, & draft decoded images are too small to be labeled
+    cache_mb = in_arg.decode_cache_mb
+    if in_arg.no_labels or in_arg.daemon or in_arg.decode == 'draft':
+        cache_mb = 0
+    if in_arg.max_memory:
+        # probe with the largest images (reading shards only for a few)
+        probe_files = probe_images(
+            image_files(in_arg.dir, answers_dic),
+            max_scanned=PROBE_SCAN_IMAGES if is_shard_input(in_arg.dir) else None)
+        footprint = measure_footprint(
+            in_arg.arch, probe_files,
+            partial(classifier_batch, resolution=in_arg.resolution,
+                    precision=precision, decode=in_arg.decode))
+        # the cache gets part of the budget, unless it leaves too little or
+        # the plan needs workers (which don't use it)
+        cache_mb = cache_budget(in_arg.max_memory, footprint, cache_mb)
+        workers, batch_size = plan_layout(in_arg.max_memory, footprint,
+                                          available_cores(), reserved_mb=cache_mb)
+        if workers > 1 and cache_mb:
+            cache_mb = 0
+            workers, batch_size = plan_layout(in_arg.max_memory, footprint,
+                                              available_cores())
+        memory_guard = MemoryGuard(in_arg.max_memory, batch_size, footprint, workers,
+                                   reserved_mb=cache_mb)
+        run_stats['memory_plan'] = '{} workers x batch {} (model {:.0f}MB, {:.1f}MB per image)'.format(
+            workers, batch_size, footprint['model'], footprint['per_image'])
+
+    # decode each image once for both classifying & labeling it (worker
+    # processes & the daemon decode the images they classify themselves)
+    image_cache = None
+    if cache_mb and workers == 1:
+        image_cache = DecodedImageCache(cache_mb << 20)
+
+    # journal the classifications so an interrupted run can be resumed
+    journal = None
+    if not in_arg.no_checkpoint:
+        journal = CheckpointJournal(
+            in_arg.checkpoint_file,
+            {'dir': in_arg.dir, 'arch': in_arg.arch, 'resolution': in_arg.resolution,
+             'topk': in_arg.topk if in_arg.save_topk else None,
+             'precision': precision, 'decode': in_arg.decode,
+             'embeddings': in_arg.save_embeddings is not None},
+            resume=in_arg.resume, overwrite=in_arg.overwrite_checkpoint)
+
+    # stream one record per image as it is classified & a final stats record
+    results_writer = dog_names = None
+    if in_arg.results_file:
+        results_writer = open_results_writer(in_arg.results_file, in_arg.results_format)
+        if exists(in_arg.dogfile):
+            with open(in_arg.dogfile) as dogs_file:
+                dog_names = set(line.rstrip() for line in dogs_file)
+
     # create the classifier labels with the classifier function using in_arg.arch, 
     # comparing the labels, and creating a dictionary of results (result_dic)
-    result_dic = classify_images(in_arg.dir, answers_dic, in_arg.arch)
+    classify = partial(classify_images, in_arg.dir,
+                       model=in_arg.arch,
+                       dedupe_distance=in_arg.dedupe,
+                       workers=workers,
+                       batch_size=batch_size,
+                       threads=threads,
+                       pin_cpus=in_arg.workers == 'auto',
+                       resolution=in_arg.resolution,
+                       precision=precision,
+                       decode=in_arg.decode,
+                       topk_file=in_arg.save_topk,
+                       topk=in_arg.topk,
+                       embeddings_file=in_arg.save_embeddings,
+                       run_stats=run_stats,
+                       journal=journal,
+                       memory_guard=memory_guard,
+                       daemon=in_arg.daemon,
+                       image_cache=image_cache,
+                       results_writer=results_writer,
+                       dog_names=dog_names)
+    if in_arg.sample:
+        # estimate the stats from a growing sample instead of every image
+        result_dic = sample_images(classify, answers_dic, in_arg.dogfile,
+                                   in_arg.sample, in_arg.ci_width,
+                                   in_arg.confidence, in_arg.sample_seed,
+                                   run_stats)
+    else:
+        result_dic = classify(answers_dic)
 
     # extra: annotate images with classification
-    label_images(result_dic, in_arg.dir)
+    if not in_arg.no_labels:
+        if not in_arg.no_checks:
+            print(len(result_dic))
+            print("#################")
+        label_images(result_dic, in_arg.dir, in_arg.label_archive,
+                     in_arg.label_quality, in_arg.label_thumbnails,
+                     in_arg.label_shard_mb, image_cache)
+    if image_cache is not None:
+        run_stats['n_decodes_avoided'] = image_cache.n_hits
+        run_stats['decode_bytes_saved'] = '{:.1f}MB ({} images evicted from a {}MB cache)'.format(
+            image_cache.bytes_saved / (1 << 20), image_cache.n_evictions, cache_mb)
     # check classification
-    check_classifying_images(result_dic)
+    if not in_arg.no_checks:
+        check_classifying_images(result_dic)
 
     # adjust the results dictionary(result_dic) to determine if classifier correctly classified
     # images as 'a dog' or 'not a dog'. This demonstrates if the model can 
     # correctly classify dog images as dogs (regardless of breed)
     adjust_results4_isadog(result_dic, in_arg.dogfile)
-    check_classifying_labels_as_dogs(result_dic)
+    if not in_arg.no_checks:
+        check_classifying_labels_as_dogs(result_dic)
 
     # calculate results of run and puts statistics in a results statistics dictionary (results_stats_dic)
     results_stats_dic = calculates_results_stats(result_dic)
-    check_calculating_results(result_dic, results_stats_dic)
+    if not in_arg.no_checks:
+        print(results_stats_dic)
+        check_calculating_results(result_dic, results_stats_dic)
+
+    # per-breed precision, recall & confusion matrix
+    breed_stats = None
+    if in_arg.breed_stats or in_arg.breed_stats_file:
+        # Imports the vectorized per-breed stats (numpy) only when asked for
+        from breed_stats import calculates_breed_stats, save_breed_stats
+        breed_stats = calculates_breed_stats(result_dic)
+        if in_arg.breed_stats_file:
+            save_breed_stats(in_arg.breed_stats_file, breed_stats)
+
     #  print summary results, incorrect classifications of dogs and breeds if requested.
-    print_results(result_dic, results_stats_dic, in_arg.arch)
+    print_results(result_dic, results_stats_dic, in_arg.arch,
+                  run_stats=run_stats,
+                  breed_stats=breed_stats if in_arg.breed_stats else None)
 
     # measure total program runtime by collecting end time
     end_time = time()
@@ -84,6 +257,16 @@ def main():
     tot_time = "{}:{}:{}".format(hours, mins, secs)
     print("\n** Total Elapsed Runtime:", tot_time)
 
+    # the records were written as the images were classified
+    if results_writer is not None:
+        run_stats['secs_total'] = round(tot_seconds, 2)
+        results_writer.write_stats(dict(results_stats_dic, **run_stats))
+        results_writer.close()
+
+    # the run completed, nothing left to resume
+    if journal is not None:
+        journal.remove()
+
 
 def get_input_args():
     """
@@ -91,11 +274,76 @@ def get_input_args():
     the argparse module. This function returns these arguments as an
     ArgumentParser object. 
      3 command line arguments are created:
-       dir - Path to the pet image files(default- 'pet_images/')
+       dir - Path to the pet image files, or tar/zip shards of them given as
+             a path or a glob pattern(default- 'pet_images/')
        arch - CNN model architecture to use for image classification(default-
               pick any of the following vgg, alexnet, resnet)
        dogfile - Text file that contains all labels associated to dogs(default-
                 'dognames.txt'
+     Optional arguments:
+       dedupe - classify only one image per group of duplicate images, value
+                is the max perceptual hash distance of near duplicates
+                (default- None, no deduplication)
+       workers - number of worker processes sharing the model weights, or
+                 'auto' for the processes x threads layout tuned for this
+                 machine by scheduler.py (default- 1, classify in this process)
+       threads - torch threads per worker (default- None, cores split
+                 evenly between workers)
+       batch_size - number of images per forward pass (default- 1)
+       recalibrate - re-run the layout calibration of --workers auto
+                     (default- False)
+       resolution - side of the square input images, 128 to 224 for the
+                    archs ending with a global average pool (default- 224)
+       label_archive - write the labeled images into tar or zip shards with
+                       an index instead of one file each (default- None)
+       label_quality - JPEG quality of the labeled images (default- None,
+                       PIL's default)
+       label_thumbnails - max sides of the labeled thumbnails to write
+                          instead of the full size images (default- None)
+       label_shard_mb - size of the label archive shards in MB (default- 256)
+       results_file - file the results are written to, one record per image
+                      and a final stats record (default- None)
+       results_format - format of results_file: jsonl csv npz (default-
+                        guessed from the results_file extension)
+       no_checks - don't print the check_* lab checks (default- False)
+       save_topk - file the top-k class ids & logits of every image are saved
+                   to, to be re-scored by rescore.py (default- None)
+       topk - number of classes saved per image with save_topk (default- 5)
+       precision - numeric precision of inference: fp32 or bf16, bf16 falls
+                   back to fp32 without CPU support (default- fp32)
+       decode - JPEG decoding: full, or draft decoding at the smallest scale
+                covering the input resolution (default- full)
+       no_labels - don't write the labeled images (default- False)
+       max_memory - memory budget, the workers & batch size are picked to fit
+                    it and batches shrink when getting close (default- None)
+       save_embeddings - file the penultimate layer embeddings of every image
+                         are saved to, for embedding_index.py (default- None)
+       resume - classify only the images missing from the checkpoint journal
+                of an interrupted run (default- False)
+       checkpoint_file - checkpoint journal of the run (default-
+                         checkpoint_<arch>_<dir>_<dir digest>.jsonl, removed
+                         when the run completes)
+       overwrite_checkpoint - start a new journal over the existing one
+                              instead of refusing to run (default- False)
+       no_checkpoint - don't journal the classifications (default- False)
+       breed_stats - print the precision & recall of every dog breed
+                     (default- False)
+       breed_stats_file - file the per-breed stats & the sparse confusion
+                          matrix are saved to (default- None)
+       sample - classify a stratified random sample of this many images,
+                doubled until the confidence intervals of the stats are
+                narrow enough (default- None, every image)
+       ci_width - widest confidence interval accepted by sample, in
+                  percentage points (default- 5.0)
+       confidence - confidence level of the intervals (default- 0.95)
+       sample_seed - random seed of the sample (default- None)
+       daemon - Unix socket of a running classifier_daemon.py the images
+                are classified by instead of loading the model (default-
+                $DOG_CLASSIFIER_SOCKET when set, a daemon answers on it &
+                none of workers, threads or max_memory is given, else None)
+       decode_cache_mb - size in MB of the cache of the images decoded to be
+                         classified, reused to label them (default- 0,
+                         disabled)
     Parameters:
      None - simply using argparse module to create & store command line arguments
     Returns:
@@ -104,13 +352,145 @@ def get_input_args():
     parser = argparse.ArgumentParser(
         description="Check images using a certain CNN model")
     parser.add_argument('--dir', type=str, default='pet_images/',
-                        help="Path to images files directory")
+                        help="Path to images files directory, or to tar/zip shards of images given as a path or a quoted glob pattern, e.g. 'shards/pets-*.tar'")
     parser.add_argument('--arch', type=str, default='vgg',
                         help='CNN model architecture to use for image classification(default - pick any of the following vgg, alexnet, resnet)')
     parser.add_argument('--dogfile', type=str, default='dognames.txt',
                         help='Text file that contains all labels associated to dogs(default -"dognames.txt")')
+    parser.add_argument('--dedupe', type=int, nargs='?', const=3, default=None,
+                        metavar='MAX_DISTANCE',
+                        help='Classify one image per group of exact or near duplicates; MAX_DISTANCE is the max dHash bit distance of near duplicates, 0 for exact duplicates only(default - 3 when given)')
+    parser.add_argument('--workers', type=workers_arg, default=1,
+                        help='Number of worker processes classifying images, the model weights are loaded once and shared by all workers; auto uses the processes x threads layout calibrated for this machine(default - 1)')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='Torch threads per worker(default - cores split evenly between workers)')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Number of images classified per forward pass(default - 1)')
+    parser.add_argument('--recalibrate', action='store_true',
+                        help='Re-run the calibration of --workers auto instead of using the saved layout')
+    parser.add_argument('--resolution', type=int, default=FULL_RESOLUTION,
+                        help='Input resolution, {} to {} for {} (default - {})'.format(
+                            MIN_RESOLUTION, FULL_RESOLUTION,
+                            ', '.join(RESOLUTION_ARCHS), FULL_RESOLUTION))
+    parser.add_argument('--results-file', type=str, default=None,
+                        help='Write one record per image & a final stats record to this file(default - None)')
+    parser.add_argument('--results-format', type=str, default=None,
+                        choices=RESULTS_FORMATS,
+                        help='Format of the results file(default - guessed from its extension)')
+    parser.add_argument('--no-checks', action='store_true',
+                        help="Don't print the per-image check_* lab checks, for large runs")
+    parser.add_argument('--save-topk', type=str, default=None,
+                        help='Save the top-k class ids & logits of every image to this .npz file, to re-score them with rescore.py(default - None)')
+    parser.add_argument('--topk', type=int, default=5,
+                        help='Number of classes saved per image with --save-topk(default - 5)')
+    parser.add_argument('--precision', type=str, default='fp32',
+                        choices=PRECISIONS,
+                        help='Inference precision, bf16 uses CPU autocast & falls back to fp32 on CPUs without native bf16 support(default - fp32)')
+    parser.add_argument('--decode', type=str, default='full',
+                        choices=DECODE_MODES,
+                        help='JPEG decoding, draft decodes at the smallest 1/2, 1/4 or 1/8 scale covering the input resolution(default - full)')
+    parser.add_argument('--no-labels', action='store_true',
+                        help="Don't write the labeled images, e.g. when benchmarking")
+    parser.add_argument('--max-memory', type=memory_arg, default=None,
+                        metavar='SIZE',
+                        help='Memory budget such as 4G: picks the workers & batch size fitting it from the measured model & per-image footprints, and shrinks the batches if the memory used gets close to it(default - None, overrides --workers & --batch-size)')
+    parser.add_argument('--save-embeddings', type=str, default=None,
+                        help='Save the penultimate layer embedding of every image (captured during the classification forward pass) to this float16 .npy file, to find similar pets with embedding_index.py(default - None)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Resume an interrupted run: images found in the checkpoint journal are not classified again')
+    parser.add_argument('--checkpoint-file', type=str, default=None,
+                        help='Checkpoint journal of the classifications, removed once the run completes(default - checkpoint_<arch>_<dir>_<dir digest>.jsonl)')
+    parser.add_argument('--overwrite-checkpoint', action='store_true',
+                        help='Start over when the checkpoint journal of an interrupted run exists, instead of refusing to run')
+    parser.add_argument('--no-checkpoint', action='store_true',
+                        help="Don't journal the classifications (the run can't be resumed)")
+    parser.add_argument('--breed-stats', action='store_true',
+                        help='Print the images, precision, recall & most frequent confusion of every dog breed')
+    parser.add_argument('--breed-stats-file', type=str, default=None,
+                        help='Save the per-breed stats & the sparse pet label x classifier label confusion matrix to this .npz file(default - None)')
+    parser.add_argument('--sample', type=int, nargs='?', const=100, default=None,
+                        metavar='N',
+                        help='Estimate the results stats from a stratified random sample of N images, doubled until every confidence interval is at most --ci-width wide(default - 100 when given)')
+    parser.add_argument('--ci-width', type=float, default=5.0,
+                        help='Widest confidence interval of the --sample stats, in percentage points(default - 5.0)')
+    parser.add_argument('--confidence', type=float, default=0.95,
+                        help='Confidence level of the --sample intervals(default - 0.95)')
+    parser.add_argument('--sample-seed', type=int, default=None,
+                        help='Random seed of the --sample images(default - None, a new sample every run)')
+    parser.add_argument('--daemon', type=str, default=None,
+                        metavar='SOCKET',
+                        help='Classify in the classifier_daemon.py listening on this Unix socket, which keeps the models loaded(default - ${} unless --workers, --threads or --max-memory is given)'.format(DAEMON_SOCKET_ENV))
+    parser.add_argument('--decode-cache-mb', type=int, default=0,
+                        help='Size in MB of the LRU cache of decoded images shared by classifying & labeling, so each image is decoded once; unused with several workers, --daemon or --decode draft, at most a quarter of --max-memory which plans for it(default - 0, disabled)')
+
+    parser.add_argument('--label-archive', type=str, default=None,
+                        choices=ARCHIVE_FORMATS,
+                        help='Write the labeled images into tar or zip shards indexed by name instead of one file per image(default - None)')
+    parser.add_argument('--label-quality', type=int, default=None,
+                        help='JPEG quality of the labeled images, 1 to 95(default - PIL default)')
+    parser.add_argument('--label-thumbnails', type=int, nargs='+', default=None,
+                        metavar='SIZE',
+                        help='Write labeled thumbnails with these max sides instead of full size images(default - None)')
+    parser.add_argument('--label-shard-mb', type=int, default=256,
+                        help='Size of the label archive shards in MB(default - 256)')
+
+    in_arg = parser.parse_args()
+    if in_arg.max_memory and in_arg.workers == 'auto':
+        parser.error('--max-memory picks the workers, it can\'t be used with --workers auto')
+    if in_arg.dedupe is not None and in_arg.dedupe < 0:
+        parser.error('--dedupe MAX_DISTANCE must be 0 or more')
+    if in_arg.threads and in_arg.workers == 'auto':
+        parser.error('--workers auto picks the threads, it can\'t be used with --threads')
+    local_settings = in_arg.workers != 1 or in_arg.threads or in_arg.max_memory
+    # the environment daemon is only a default for runs that could use it
+    env_daemon = in_arg.daemon is None and not local_settings
+    if env_daemon:
+        in_arg.daemon = environ.get(DAEMON_SOCKET_ENV) or None
+    if in_arg.daemon and local_settings:
+        parser.error('--workers, --threads & --max-memory can\'t be used with --daemon, the daemon classifies the images')
+    if in_arg.daemon:
+        try:
+            DaemonClient(in_arg.daemon).close()
+        except OSError as error:
+            if not env_daemon:
+                parser.error('can\'t connect to the classifier daemon on {}: {}'.format(
+                    in_arg.daemon, error))
+            # e.g. a stale socket left by a daemon that was stopped
+            print('Warning: can\'t connect to the classifier daemon on ${} ({}), classifying locally'.format(
+                DAEMON_SOCKET_ENV, error))
+            in_arg.daemon = None
+    if not in_arg.no_checkpoint:
+        if in_arg.checkpoint_file is None:
+            in_arg.checkpoint_file = default_checkpoint_path(in_arg.dir, in_arg.arch)
+        # don't truncate the journal of an interrupted (or running) run
+        if (exists(in_arg.checkpoint_file) and not in_arg.resume and
+                not in_arg.overwrite_checkpoint):
+            parser.error('the checkpoint journal {} of an interrupted or running run exists: '
+                         'use --resume to resume it, --overwrite-checkpoint to start over '
+                         'or --no-checkpoint'.format(in_arg.checkpoint_file))
+    if in_arg.sample is not None and (in_arg.save_topk or in_arg.save_embeddings):
+        parser.error('--sample only classifies some images, it can\'t be used with --save-topk or --save-embeddings')
+    if in_arg.sample is not None and (in_arg.sample < 1 or not 0 < in_arg.confidence < 1):
+        parser.error('--sample must be positive & --confidence between 0 and 1')
+    if in_arg.resolution != FULL_RESOLUTION and (
+            in_arg.arch not in RESOLUTION_ARCHS or
+            not MIN_RESOLUTION <= in_arg.resolution <= FULL_RESOLUTION):
+        parser.error('--resolution must be between {} and {} and is only supported by: {}'.format(
+            MIN_RESOLUTION, FULL_RESOLUTION, ', '.join(RESOLUTION_ARCHS)))
+
+    return in_arg
+
+
+def workers_arg(value):
+    """
+    argparse type of --workers: a positive number of workers or 'auto'.
+    """
+    if value == 'auto':
+        return value
+    if not value.isdigit() or int(value) < 1:
+        raise argparse.ArgumentTypeError("expected a number of workers or 'auto'")
 
-    return parser.parse_args()
+    return int(value)
 
 
 def get_pet_labels(image_dir):
@@ -121,19 +501,23 @@ def get_pet_labels(image_dir):
     the accuracy of the image classifier model.
     Parameters:
      image_dir - The (full) path to the folder of images that are to be
-                 classified by pretrained CNN models (string)
+                 classified by pretrained CNN models, or the tar/zip shards
+                 of the images (string)
     Returns:
      petlabels_dic - Dictionary storing image filename (as key) and Pet Image
                      Labels (as value)  
     """
 
     petlabels_dic = {}
-    filenames_list = listdir(image_dir)
+    # only the shard headers are read to list the images they contain
+    if is_shard_input(image_dir):
+        filenames_list = list_shard_members(image_dir)
+    else:
+        filenames_list = [filename for filename in listdir(image_dir)
+                          if isfile('{}/{}'.format(image_dir, filename))]
     # print(len(filenames_list))
 
     for filename in filenames_list:
-        if not isfile('{}/{}'.format(image_dir, filename)):
-            continue
         label = filename[0:-4].lower()  # remove file extension
         label = " ".join(label.split("_")[:-1])    # remove digits from name & make label str 
         petlabels_dic[filename] = label
@@ -142,8 +526,32 @@ def get_pet_labels(image_dir):
     return petlabels_dic
 
 
+def image_files(images_dir, img_names):
+    """
+    Yields the images to read for img_names: their path in images_dir, or
+    their content read sequentially from the shards when images_dir names
+    tar/zip shards (then in shard order rather than img_names order).
+    Parameters:
+     images_dir - The (full) path to the folder of images, or the shards
+                  (string)
+     img_names - image filenames (iterable)
+    Yields:
+     (image filename, image path or content bytes) tuples
+    """
+    if is_shard_input(images_dir):
+        return iter_shard_images(images_dir, set(img_names))
+
+    return ((img_name, images_dir + img_name) for img_name in img_names)
+
 
-def classify_images(images_dir, petlabel_dic, model):
+
+def classify_images(images_dir, petlabel_dic, model, dedupe_distance=None,
+                    workers=1, batch_size=1, threads=None, pin_cpus=False,
+                    resolution=FULL_RESOLUTION, topk_file=None, topk=5,
+                    run_stats=None, journal=None, precision='fp32',
+                    decode='full', memory_guard=None, embeddings_file=None,
+                    daemon=None, image_cache=None, results_writer=None,
+                    dog_names=None):
     """
     Creates classifier labels with classifier function, compares labels, and 
     creates a dictionary containing both labels and comparison of them to be
@@ -154,13 +562,50 @@ def classify_images(images_dir, petlabel_dic, model):
      classifier() function to classify images in this function. 
      Parameters: 
       images_dir - The (full) path to the folder of images that are to be
-                   classified by pretrained CNN models (string)
+                   classified by pretrained CNN models, or the tar/zip shards
+                   of the images (string)
       petlabel_dic - Dictionary that contains the pet image(true) labels
                      that classify what's in the image, where its key is the
                      pet image filename & its value is pet image label where
                      label is lowercase with space between each word in label 
       model - pretrained CNN whose architecture is indicated by this parameter,
               values must be: resnet alexnet vgg (string)
+      dedupe_distance - if not None, images are grouped into exact and near
+                        duplicates (max dHash distance dedupe_distance) and
+                        only one image per group is classified, its
+                        classification is used for the whole group (int)
+      workers - number of worker processes classifying images, more than 1
+                classifies with a process pool sharing the model weights (int)
+      batch_size - number of images classified per forward pass (int)
+      threads - torch threads per worker, None splits the cores evenly (int)
+      pin_cpus - pin each worker to its own set of cores (bool)
+      resolution - side of the square input images (int)
+      topk_file - if not None, the top-k class ids & logits of every image
+                  are saved to this file for rescore.py (string)
+      topk - number of classes saved per image in topk_file (int)
+      run_stats - optional dictionary updated with run statistics such as
+                  the deduplication ratio and the time it saved or the memory
+                  used by each worker
+      precision - numeric precision of inference, one of
+                  classifier.PRECISIONS (string)
+      decode - JPEG decoding, one of classifier.DECODE_MODES (string)
+      journal - optional CheckpointJournal: images it already holds (from an
+                interrupted run) aren't classified again & the new
+                classifications are journaled as each batch is done
+      memory_guard - optional memory_budget.MemoryGuard shrinking the batches
+                     when the memory used gets close to its budget
+      embeddings_file - if not None, the penultimate layer embeddings of
+                        every image are captured during the same forward
+                        passes & saved to this .npy file, see
+                        embedding_index.py (string)
+      daemon - if not None, the images are classified by the
+               classifier_daemon.py listening on this Unix socket (string)
+      image_cache - optional image_cache.DecodedImageCache the images are
+                    decoded through when classifying in this process
+      results_writer - optional results_writer.ResultsWriter the record of
+                       every image is written to as each batch is classified
+      dog_names - dog names of the dogfile, to write the is-a-dog flags of
+                  the records (set)
      Returns:
       results_dic - Dictionary with key as image filename and value as a List 
              (index)idx 0 = pet image label (string)
@@ -171,9 +616,129 @@ def classify_images(images_dir, petlabel_dic, model):
 
     results_dic = {}
 
+    # classifier outputs of the images, starting with the ones journaled by
+    # an interrupted run
+    outputs = {}
+    if journal is not None:
+        outputs.update((img_name, output) for img_name, output in journal.records.items()
+                       if img_name in petlabel_dic)
+        if run_stats is not None and outputs:
+            run_stats['n_resumed'] = len(outputs)
+    pending_names = [img_name for img_name in petlabel_dic if img_name not in outputs]
+
+    def classification(output):
+        # the top-k outputs are (class ids, logits), best class first
+        if topk_file is not None:
+            output = imagenet_classes_dict[output[0][0]]
+        return output.lower()
+
+    def write_records(img_names):
+        for img_name in img_names:
+            label = petlabel_dic[img_name]
+            img_classification = classification(outputs[img_name])
+            img_result = [label, img_classification, check_match(img_classification, label)]
+            if dog_names is not None:
+                img_result += [int(label in dog_names), int(img_classification in dog_names)]
+            results_writer.write_record(img_name, img_result)
+        results_writer.sync()
+
+    if results_writer is not None and outputs:
+        write_records(list(outputs))
+
+    # every image is its own group unless deduplicating
+    dedupe_start = time()
+    if dedupe_distance is not None:
+        groups = group_duplicates(images_dir, pending_names,
+                                  dedupe_distance, run_stats,
+                                  image_files(images_dir, pending_names))
+    else:
+        groups = {img_name: [img_name] for img_name in pending_names}
+    dedupe_secs = time() - dedupe_start
+
+    # classify one representative per group & share it with the group
+    classify_start = time()
+    # the images are streamed to the classifier, rep_names keeps the order
+    # they were read in (the shard order when reading shards)
+    rep_names = []
+
+    def rep_files():
+        for rep_name, rep_file in image_files(images_dir, groups):
+            rep_names.append(rep_name)
+            yield rep_file
+
+    # one memory-mapped row per image, in petlabel_dic order (rows of the
+    # images resumed from the journal were written by the interrupted run)
+    embeddings = None
+    if embeddings_file is not None:
+        # Imports the embeddings storage (numpy) only when saving them
+        from embedding_index import open_embeddings, save_embeddings_meta
+        embeddings = open_embeddings(embeddings_file, len(petlabel_dic),
+                                     embedding_layers[model][1], resume=bool(outputs))
+        embedding_rows = {img_name: row for row, img_name in enumerate(petlabel_dic)}
+
+    # keep the top-k outputs instead of only the best label when saving them
+    # (the cache can't be shared with worker processes)
+    if workers > 1:
+        image_cache = None
+    classify_fn = partial(classifier_batch, resolution=resolution,
+                          precision=precision, decode=decode,
+                          embed=embeddings is not None, image_cache=image_cache)
+    if topk_file is not None:
+        classify_fn = partial(classifier_topk_batch, k=topk,
+                              resolution=resolution, precision=precision,
+                              decode=decode, embed=embeddings is not None,
+                              image_cache=image_cache)
+    if daemon is not None:
+        classify_fn = partial(daemon_classify_batch, socket_path=daemon,
+                              resolution=resolution, precision=precision,
+                              decode=decode, embed=embeddings is not None,
+                              k=topk if topk_file is not None else None)
+
+    n_stored = [0]
+
+    def store_outputs(batch_outputs):
+        # batches complete in order, so they follow the reps read so far
+        batch_names = rep_names[n_stored[0]:n_stored[0] + len(batch_outputs)]
+        n_stored[0] += len(batch_outputs)
+        for rep_name, rep_output in zip(batch_names, batch_outputs):
+            if embeddings is not None:
+                rep_output, rep_embedding = rep_output
+                for img_name in groups[rep_name]:
+                    embeddings[embedding_rows[img_name]] = rep_embedding
+            for img_name in groups[rep_name]:
+                outputs[img_name] = rep_output
+                if journal is not None:
+                    journal.record(img_name, rep_output)
+        if results_writer is not None:
+            write_records([img_name for rep_name in batch_names
+                           for img_name in groups[rep_name]])
+
+    classify_paths(rep_files(), model, workers, run_stats, classify_fn,
+                   batch_size, threads, pin_cpus, on_batch=store_outputs,
+                   memory_guard=memory_guard)
+    classify_secs = time() - classify_start
+    if memory_guard is not None and run_stats is not None:
+        run_stats['peak_memory'] = '{:.1f}MB of {:.0f}MB'.format(
+            memory_guard.peak_mb, memory_guard.max_mb)
+        run_stats['n_batch_shrinks'] = memory_guard.n_shrinks
+    if journal is not None:
+        journal.sync()
+        if run_stats is not None:
+            run_stats['secs_checkpoint'] = round(journal.secs, 3)
+
+    classifications = {img_name: classification(output)
+                       for img_name, output in outputs.items()}
+    # accumulated over the calls of a run (the rounds of --sample)
+    if run_stats is not None:
+        run_stats['n_classified'] = run_stats.get('n_classified', 0) + len(rep_names)
+        run_stats['secs_classify'] = round(run_stats.get('secs_classify', 0.0) + classify_secs, 3)
+        if run_stats['secs_classify'] > 0:
+            run_stats['images_per_sec'] = round(
+                run_stats['n_classified'] / run_stats['secs_classify'], 2)
+
     for img_name, label in petlabel_dic.items():
         image_attrs = [label]
-        img_classification = classifier(images_dir + img_name, model).lower()
+        img_classification = classifications[img_name]
         image_attrs.append(img_classification)
         
         
@@ -183,10 +748,100 @@ def classify_images(images_dir, petlabel_dic, model):
         #     img_name, img_classification))
         results_dic[img_name] = image_attrs
 
+    if embeddings is not None:
+        embeddings.flush()
+        save_embeddings_meta(embeddings_file, model, list(petlabel_dic),
+                             list(petlabel_dic.values()),
+                             [classifications[img_name] for img_name in petlabel_dic])
+
+    if topk_file is not None:
+        # Imports storage of the top-k model outputs for offline re-scoring
+        from rescore import save_topk
+        save_topk(topk_file, model, list(petlabel_dic), list(petlabel_dic.values()),
+                  [outputs[img_name][0] for img_name in petlabel_dic],
+                  [outputs[img_name][1] for img_name in petlabel_dic])
+
+    if dedupe_distance is not None and run_stats is not None and groups:
+        n_skipped = len(pending_names) - len(groups)
+        run_stats['n_dedup_skipped'] = n_skipped
+        run_stats['pct_dedup'] = round(n_skipped / len(pending_names) * 100, 1)
+        run_stats['secs_dedup_hashing'] = round(dedupe_secs, 2)
+        # inference time of the skipped images, estimated from the average
+        # of the representatives (the hashing cost is reported above)
+        run_stats['secs_dedup_saved'] = round(classify_secs / len(groups) * n_skipped, 2)
+
     return results_dic
 
 
 
+def sample_images(classify, petlabel_dic, dogsfile, sample_size, ci_width,
+                  confidence=0.95, seed=None, run_stats=None):
+    """
+    Classifies a stratified random sample of the images, doubling it until
+    the confidence interval of every calculates_results_stats() percentage is
+    at most ci_width wide (or every image is classified). See sampling.py.
+    Parameters:
+     classify - function called as classify(petlabel_dic) returning the
+                results dictionary of those images, e.g. classify_images()
+                with its other arguments bound
+     petlabel_dic - Dictionary with key as image filename and value as pet
+                    image label
+     dogsfile - text file with one dog name per line (string)
+     sample_size - number of images of the first sample (int)
+     ci_width - widest confidence interval accepted, in percentage points
+                (float)
+     confidence - confidence level of the intervals (float)
+     seed - random seed of the sample, None for a new sample (int)
+     run_stats - optional dictionary updated with the sample size & the
+                 confidence interval of each percentage
+    Returns:
+     results_dic - results dictionary of the sampled images, see
+                   classify_images()
+    """
+    # Imports the sampling & confidence intervals only when sampling
+    from sampling import stratified_order, stat_populations, confidence_intervals
+
+    dog_names = set()
+    if exists(dogsfile):
+        with open(dogsfile) as dogs_file:
+            dog_names.update(line.rstrip() for line in dogs_file)
+    populations = stat_populations(petlabel_dic, dog_names)
+    sample_order = stratified_order(petlabel_dic, seed)
+
+    results_dic = {}
+    n_rounds = 0
+    while True:
+        n_rounds += 1
+        new_names = sample_order[len(results_dic):sample_size]
+        results_dic.update(classify({img_name: petlabel_dic[img_name]
+                                     for img_name in new_names}))
+
+        # adjust_results4_isadog() extends the lists, adjust a copy
+        adjusted_dic = {img_name: list(img_result) for img_name, img_result in results_dic.items()}
+        adjust_results4_isadog(adjusted_dic, dogsfile)
+        intervals = confidence_intervals(adjusted_dic, populations, confidence)
+        # a stat no sampled image counts for is only done if no image does
+        widths = {stat: interval[2] - interval[1] if interval else
+                  (0.0 if populations[stat] == 0 else float('inf'))
+                  for stat, interval in intervals.items()}
+        print('Sample round {}: {} images, widest interval {:.1f} points'.format(
+            n_rounds, len(results_dic), max(widths.values())))
+        if max(widths.values()) <= ci_width or len(results_dic) == len(sample_order):
+            break
+        sample_size *= 2
+
+    if run_stats is not None:
+        run_stats['n_sampled'] = len(results_dic)
+        run_stats['pct_sampled'] = len(results_dic) / max(len(petlabel_dic), 1) * 100
+        run_stats['n_sample_rounds'] = n_rounds
+        for stat, interval in intervals.items():
+            if interval:
+                run_stats['ci_{}'.format(stat[4:])] = '{:.1f}% ({:.1f}% - {:.1f}%, {:g}% confidence)'.format(
+                    interval[0], interval[1], interval[2], confidence * 100)
+
+    return results_dic
+
+
 def check_match(classification_str, label):
     classification_list = classification_str.split(', ')
 
@@ -324,12 +979,12 @@ def calculates_results_stats(results_dic):
         results_stats['pct_correct_breed'] = round((n_correct_breeds / results_stats['n_dogs_img']) * 100, 1)
 
     results_stats['pct_matches'] = round((n_matches / results_stats['n_images']) * 100, 1)
-    print(results_stats)
 
     return results_stats
         
 
-def print_results(result_dic, results_stats, model, print_incorrect_dogs=True, print_incorrect_breed=True):
+def print_results(result_dic, results_stats, model, print_incorrect_dogs=True, print_incorrect_breed=True,
+                  run_stats=None, breed_stats=None):
     """
     Prints summary results on the classification and then prints incorrectly 
     classified dogs and incorrectly classified dog breeds if user indicates 
@@ -355,13 +1010,20 @@ def print_results(result_dic, results_stats, model, print_incorrect_dogs=True, p
                              False doesn't print anything(default) (bool)  
       print_incorrect_breed - True prints incorrectly classified dog breeds and 
                               False doesn't print anything(default) (bool) 
+      run_stats - Dictionary of statistics about the run itself (counts start
+                  with 'n', percentages with 'pct' and durations with 'secs')
+                  printed after the results summary if not empty
+      breed_stats - Dictionary returned by breed_stats.calculates_breed_stats(),
+                    if given the images, precision & recall of every dog breed
+                    are printed (default- None)
     Returns:
            None - simply printing results.
     """
 
     # split string, replace sep with space, capitalize words
     capwords2 = lambda full_str, sep: ' '.join(s.capitalize() for s in full_str.split(sep))
-    print(chr(27) + "[2J") # clear terminal for report
+    if sys.stdout.isatty():
+        print(chr(27) + "[2J") # clear terminal for report
 
     report_header = '****Results summary report for CNN model Architecture {}****\n'.format(
         model.upper())
@@ -379,6 +1041,16 @@ def print_results(result_dic, results_stats, model, print_incorrect_dogs=True, p
         if stat[:3] == 'pct':  # it's a percentage
             print('{:>20}: {:5.1f}%'.format(capwords2(stat, '_'), value))
 
+    if run_stats:
+        print("################################################")
+        for stat, value in run_stats.items():
+            if stat[:3] == 'pct':
+                print('{:>20}: {:5.1f}%'.format(capwords2(stat, '_'), value))
+            elif stat[:4] == 'secs':
+                print('{:>20}: {:8.2f}s'.format(capwords2(stat[5:], '_'), value))
+            else:
+                print('{:>20}: {}'.format(capwords2(stat, '_'), value))
+
     if print_incorrect_dogs:
         print("################################################")
         incorrect_dog_h = '***Incorrectly classified dog images****'
@@ -394,51 +1066,173 @@ def print_results(result_dic, results_stats, model, print_incorrect_dogs=True, p
         print('{:^100s}'.format(incorrect_breed_h))
         wrong_breeds_list = [pet[0] for pet in result_dic.values() if (pet[3] + pet[4]) == 2 and pet[2] == 0]
         print('Total: {}'.format(len(wrong_breeds_list)))
-        print('\n'.join(wrong_breeds_list))
-    
+        for breed, count in Counter(wrong_breeds_list).most_common():
+            print('{:>30}: {}'.format(breed, count))
 
-def label_images(results_dic, img_dir):
+    if breed_stats is not None:
+        # Imports the confusion lookup (numpy is only needed with breed_stats)
+        from breed_stats import top_confusions
 
-    results_dir = img_dir + '/labeled_imgs'
+        print("################################################")
+        print('{:^100s}'.format('***Results per dog breed****'))
+        print('{:>30} {:>7} {:>8} {:>10} {:>7}  {}'.format(
+            'Breed', 'Images', 'Correct', 'Precision', 'Recall', 'Most confused with'))
+        confusions = top_confusions(breed_stats)
+        for idx in breed_stats['is_dog'].nonzero()[0]:
+            label = breed_stats['labels'][idx]
+            confusion = ''
+            if label in confusions:
+                confusion = '{} ({})'.format(*confusions[label])
+            # precision is undefined for breeds that were never predicted
+            precision = breed_stats['precision'][idx]
+            precision = 'n/a' if precision != precision else '{:.1f}%'.format(precision * 100)
+            print('{:>30} {:>7d} {:>8d} {:>10} {:>6.1f}%  {}'.format(
+                label, breed_stats['n_images'][idx], breed_stats['n_correct'][idx],
+                precision, breed_stats['recall'][idx] * 100, confusion))
     
+
+def label_images(results_dic, img_dir, archive_format=None, quality=None,
+                 thumbnail_sizes=None, shard_mb=256, image_cache=None):
+    """
+    Draws the classifier label on every image & saves the labeled images in
+    img_dir/labeled_imgs (next to the shards when reading shards), either as
+    one JPEG file per image named after its
+    classification or packed into archive shards (see label_archive.py).
+    Parameters:
+      results_dic - Dictionary with key as image filename and value as a List
+             (index)idx 0 = pet image label (string)
+                    idx 1 = classifier label (string)
+      img_dir - The (full) path to the folder of images, or the tar/zip
+                shards of the images (string)
+      archive_format - None for one file per image, else tar or zip to write
+                       shards indexed by member name (string)
+      quality - JPEG quality, None for PIL's default (int)
+      thumbnail_sizes - max sides of the labeled thumbnails written instead
+                        of the full size image, None for full size (list)
+      shard_mb - size of the archive shards in MB (int)
+      image_cache - optional image_cache.DecodedImageCache holding the
+                    images decoded to classify them
+    Returns:
+           None - simply saving the labeled images.
+    """
+
+    out_dir = shards_dir(img_dir) if is_shard_input(img_dir) else img_dir
+    results_dir = out_dir + '/labeled_imgs'
     
-    x, y = 30, 50 # text position
-    color = 'rgb(255, 255, 255)'
-    border_color = 'rgb(0, 0, 0)'
     
     if not exists(results_dir):
         mkdir(results_dir)
 
+    archive_writer = None
+    if archive_format is not None:
+        archive_writer = ShardedArchiveWriter(results_dir, archive_format,
+                                              shard_mb << 20)
+    save_options = {} if quality is None else {'quality': quality}
+    thumbnail_sizes = thumbnail_sizes or [None]
+
     # label images with classification
-    print(len(results_dic))
-    print("#################")
-    for img_name, img_result in results_dic.items():
+    for img_name, img in labeling_images(results_dic, img_dir, image_cache):
+        img_result = results_dic[img_name]
         
         # classification result label
         img_lbl = '\n'.join(img_result[1].title().split(', '))
 
-        # open image to add label to it
-        img = Image.open(img_dir + img_name)
-        draw = ImageDraw.Draw(img)
-        
-        font_size = int(img.size[0] * .1) # adapt fontsize to image width
-
-        font = ImageFont.truetype('fonts/Roboto-Bold.ttf', font_size)
-        # draw border
-        draw.text((x-1, y-1), img_lbl, font=font, fill=border_color)
-        draw.text((x+1, y-1), img_lbl, font=font, fill=border_color)
-        draw.text((x-1, y+1), img_lbl, font=font, fill=border_color)
-        draw.text((x+1, y+1), img_lbl, font=font, fill=border_color)
-
-        # draw  text
-        draw.text((x, y), img_lbl, fill=color, font=font)
-        img_path = '{}labeled_imgs/{}.jpg'.format(img_dir, img_result[1])
-
-        # if another image has same classification, add a rand number suffix to its name
-        if exists(img_path): 
-            img.save('{}{}{}'.format(img_path[:-4], randint(1, 1000), img_path[-4:]))
-        else:
-            img.save(img_path)
+        for thumbnail_size in thumbnail_sizes:
+            # the label is drawn after shrinking so its size fits the output
+            labeled_img = img if len(thumbnail_sizes) == 1 and image_cache is None else img.copy()
+            if thumbnail_size is not None:
+                labeled_img.thumbnail((thumbnail_size, thumbnail_size))
+            draw_label(labeled_img, img_lbl)
+
+            size_suffix = '' if thumbnail_size is None else '_{}'.format(thumbnail_size)
+            if archive_writer is not None:
+                img_buffer = BytesIO()
+                labeled_img.save(img_buffer, 'JPEG', **save_options)
+                member_name = '{}{}.jpg'.format(img_name.rsplit('.', 1)[0], size_suffix)
+                archive_writer.add(member_name, img_buffer.getvalue(), img_result[1])
+                continue
+
+            img_path = '{}labeled_imgs/{}{}.jpg'.format(out_dir, img_result[1],
+                                                       size_suffix)
+
+            # if another image has same classification, add a rand number suffix to its name
+            if exists(img_path): 
+                labeled_img.save('{}{}{}'.format(img_path[:-4], randint(1, 1000), img_path[-4:]),
+                                 **save_options)
+            else:
+                labeled_img.save(img_path, **save_options)
+
+    if archive_writer is not None:
+        archive_writer.close()
+
+
+def labeling_images(img_names, img_dir, image_cache=None):
+    """
+    Yields the opened images to label. The images still in the cache come
+    first, most recently used first so they're used before being evicted,
+    without reading them again; the others are then read (and decoded
+    through the cache).
+    Parameters:
+     img_names - image filenames (iterable)
+     img_dir - The (full) path to the folder of images, or the shards
+               (string)
+     image_cache - optional image_cache.DecodedImageCache
+    Yields:
+     (image filename, PIL image) tuples, cached images are shared so they
+     must be drawn on a copy
+    """
+    if image_cache is None:
+        for img_name, img_file in image_files(img_dir, img_names):
+            yield img_name, open_image(img_file)
+        return
+
+    # the cache sources of the images, see image_cache.image_source()
+    shard_input = is_shard_input(img_dir)
+    img_sources = {(img_dir, img_name) if shard_input else img_dir + img_name: img_name
+                   for img_name in img_names}
+    cached_names = set()
+    for source in image_cache.recent_sources():
+        if source in img_sources:
+            cached_names.add(img_sources[source])
+            yield img_sources[source], image_cache.get(source)
+
+    uncached_names = [img_name for img_name in img_sources.values()
+                      if img_name not in cached_names]
+    # don't stream the shards again when every image was cached
+    if not uncached_names:
+        return
+    for img_name, img_file in image_files(img_dir, uncached_names):
+        yield img_name, image_cache.open(img_file)
+
+
+def draw_label(img, img_lbl):
+    """
+    Draws a white label with a black border on the top left of an image.
+    Parameters:
+     img - PIL image, modified in place
+     img_lbl - label text, can span several lines (string)
+    Returns:
+     None - img is modified in place
+    """
+    from PIL import ImageDraw, ImageFont
+
+    x, y = 30, 50 # text position
+    color = 'rgb(255, 255, 255)'
+    border_color = 'rgb(0, 0, 0)'
+
+    draw = ImageDraw.Draw(img)
+    
+    font_size = max(1, int(img.size[0] * .1)) # adapt fontsize to image width
+
+    font = ImageFont.truetype('fonts/Roboto-Bold.ttf', font_size)
+    # draw border
+    draw.text((x-1, y-1), img_lbl, font=font, fill=border_color)
+    draw.text((x+1, y-1), img_lbl, font=font, fill=border_color)
+    draw.text((x-1, y+1), img_lbl, font=font, fill=border_color)
+    draw.text((x+1, y+1), img_lbl, font=font, fill=border_color)
+
+    # draw  text
+    draw.text((x, y), img_lbl, fill=color, font=font)
 
 
 
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/checkpoint.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Append-only checkpoint journal of the per-image classifications of
+#          a run, so a run over a large directory that dies partway through
+#          can be resumed (check_images.py --resume) instead of redoing all
+#          the inference. The journal is a JSON lines file:
+#            {"config": {"arch": ..., "resolution": ..., "topk": ...}}
+#            {"name": <image filename>, "output": <classifier output>}
+#            ...
+#          Records are buffered & written + fsynced in batches, so the cost
+#          is one fsync per batch_size images (or per max_secs seconds). A
+#          record torn by a crash is dropped when the journal is reopened.
+#          An existing journal is never silently replaced: it is resumed, or
+#          only overwritten when asked to. The default journal path is keyed
+#          by the arch & the input directory, so runs over different
+#          directories don't share it.
+#
+#   Example usage:
+#    with CheckpointJournal(default_checkpoint_path('pet_images/', 'vgg'),
+#                           {'arch': 'vgg'}, resume=True) as journal:
+#        done = journal.records
+#        journal.record('Collie_03797.jpg', 'collie')
+##
+
+# Imports python modules
+import hashlib
+import json
+import os
+from os.path import abspath, basename, dirname, normpath
+from time import time
+
+
+def default_checkpoint_path(images_dir, arch):
+    """
+    Returns the default journal path of a run: checkpoint_<arch>_<input
+    directory name>_<digest of its absolute path>.jsonl, in the current
+    directory.
+    """
+    images_dir = normpath(abspath(images_dir))
+    dir_digest = hashlib.sha1(images_dir.encode('utf-8')).hexdigest()[:8]
+
+    return 'checkpoint_{}_{}_{}.jsonl'.format(
+        arch, ''.join(char if char.isalnum() or char in '-_' else '_'
+                      for char in basename(images_dir)), dir_digest)
+
+
+class CheckpointJournal(object):
+    """
+    Journal of the classifier outputs of a run, keyed by image filename.
+    Resuming loads the records already journaled into self.records (a
+    Dictionary with key as image filename and value as classifier output)
+    & appends to the journal, otherwise a new journal is started: an existing
+    journal (of an interrupted or still running run) raises FileExistsError
+    unless overwrite.
+    """
+
+    def __init__(self, path, config, resume=False, overwrite=False, batch_size=64,
+                 max_secs=2.0):
+        self.path = path
+        self.config = config
+        self.batch_size = batch_size
+        self.max_secs = max_secs
+        self.records = {}
+        self.pending = []
+        self.last_sync = time()
+        # total time spent writing the journal, to keep an eye on its cost
+        self.secs = 0.0
+
+        journal_config = None
+        if resume and os.path.exists(path):
+            journal_config, self.records, valid_size = load_journal(path)
+        if journal_config is not None:
+            if journal_config != config:
+                raise ValueError('Checkpoint {} was written by a run with {}, not {}; '
+                                 'rerun without --resume to start over'.format(
+                                     path, journal_config, config))
+            # drop a record torn by a crash so appends start on a new line
+            os.truncate(path, valid_size)
+            self.journal_file = open(path, 'a')
+        else:
+            # created exclusively, so two runs can't share a journal
+            self.journal_file = open(path, 'w' if overwrite else 'x')
+            self.journal_file.write(json.dumps({'config': config}) + '\n')
+            self.sync()
+            # make the new directory entry durable too
+            sync_dir(path)
+
+    def record(self, img_name, output):
+        """
+        Journals the classifier output of an image, written with the next
+        batch.
+        Parameters:
+         img_name - image filename (string)
+         output - classifier output, must be JSON serializable
+        """
+        self.pending.append(json.dumps({'name': img_name, 'output': output}) + '\n')
+        if (len(self.pending) >= self.batch_size or
+                time() - self.last_sync >= self.max_secs):
+            self.sync()
+
+    def sync(self):
+        """
+        Writes the pending records & makes them durable with fsync.
+        """
+        start_time = time()
+        self.journal_file.write(''.join(self.pending))
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+        self.pending = []
+        self.last_sync = time()
+        self.secs += self.last_sync - start_time
+
+    def close(self):
+        self.sync()
+        self.journal_file.close()
+
+    def remove(self):
+        """
+        Closes & deletes the journal once the run it protects has completed.
+        """
+        self.close()
+        os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.journal_file.closed:
+            self.close()
+
+
+def sync_dir(path):
+    """
+    fsyncs the directory of path, making its creation or renaming durable.
+    """
+    dir_fd = os.open(dirname(abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def load_journal(path):
+    """
+    Reads a checkpoint journal, stopping at the first incomplete record.
+    Parameters:
+     path - path of the journal (string)
+    Returns:
+     config - run configuration the journal was written with (dict)
+     records - Dictionary with key as image filename and value as classifier
+               output
+     valid_size - size in bytes of the complete records (int)
+    """
+    config = None
+    records = {}
+    valid_size = 0
+    with open(path, 'rb') as journal_file:
+        for line in journal_file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                entry = json.loads(line.decode('utf-8'))
+            except ValueError:
+                break
+            if 'config' in entry:
+                config = entry['config']
+            else:
+                records[entry['name']] = entry['output']
+            valid_size += len(line)
+
+    return config, records, valid_size
@@ -1,28 +1,261 @@
 import ast
-from PIL import Image
-import torchvision.transforms as transforms
-from torch.autograd import Variable
-import torchvision.models as models
-from torch import __version__
+import threading
+from io import BytesIO
+# torch, torchvision & PIL take seconds & hundreds of MB to import, so they
+# are imported by the functions running inference instead of at module load:
+# importing this module (e.g. for check_images.py --help) stays cheap
 
-resnet18 = models.resnet18(pretrained=True)
-alexnet = models.alexnet(pretrained=True)
-vgg16 = models.vgg16(pretrained=True)
+# torchvision.models builder of each model architecture
+model_builders = {'resnet': 'resnet18', 'alexnet': 'alexnet', 'vgg': 'vgg16'}
 
-models = {'resnet': resnet18, 'alexnet': alexnet, 'vgg': vgg16}
+# input resolution the models were trained at & the range of reduced
+# resolutions the archs ending with a global average pool accept (the fully
+# connected layers of vgg & alexnet expect 224x224 features)
+FULL_RESOLUTION = 224
+MIN_RESOLUTION = 128
+RESOLUTION_ARCHS = ('resnet',)
+
+# numeric precision of inference: fp32, or bf16 through CPU autocast (the
+# weights stay fp32, matmuls & convolutions run in bfloat16)
+PRECISIONS = ('fp32', 'bf16')
+# JPEG decoding: full size, or draft which lets libjpeg decode at the
+# smallest 1/2, 1/4 or 1/8 scale still covering the resize (much faster on
+# large photos, pixels differ slightly from a full decode + resize)
+DECODE_MODES = ('full', 'draft')
+
+# penultimate layer of each model architecture, whose output is the
+# embedding of an image: (module path, embedding size)
+embedding_layers = {'resnet': ('avgpool', 512),
+                    'alexnet': ('classifier.5', 4096),
+                    'vgg': ('classifier.4', 4096)}
+
+# CPU flags of native bf16 matmul support (without them bf16 is emulated &
+# slower than fp32)
+BF16_CPU_FLAGS = ('avx512_bf16', 'amx_bf16')
+
+# pretrained models are only built (and their weights loaded) the first time
+# they are used, then kept here for the following calls
+models = {}
+# models may be requested from several threads (async API executors)
+models_lock = threading.Lock()
 
 # obtain ImageNet labels
 with open('imagenet1000_clsid_to_human.txt') as imagenet_classes_file:
     imagenet_classes_dict = ast.literal_eval(imagenet_classes_file.read())
 
+def load_model(model_name):
+    """
+    Returns the pretrained model for model_name, building it and loading its
+    weights on first use. Loading the model before forking worker processes
+    lets all workers share the weights copy-on-write instead of loading
+    their own copy.
+    Parameters:
+     model_name - model architecture, one of: resnet alexnet vgg (string)
+    Returns:
+     model - pretrained model in evaluation mode
+    """
+    with models_lock:
+        if model_name not in models:
+            import torch.nn as nn
+            import torchvision.models
+
+            # puts model in evaluation mode
+            # instead of (default)training mode
+            model_builder = getattr(torchvision.models, model_builders[model_name])
+            model = model_builder(pretrained=True).eval()
+            # older torchvision resnets average pool a fixed 7x7 window, a
+            # global (adaptive) pool is the same at 224 & accepts any size
+            if model_name in RESOLUTION_ARCHS and not isinstance(
+                    model.avgpool, nn.AdaptiveAvgPool2d):
+                model.avgpool = nn.AdaptiveAvgPool2d(1)
+            models[model_name] = model
+
+    return models[model_name]
+
+
+def set_num_threads(n_threads):
+    """
+    Sets the number of threads torch uses for intra-op parallelism.
+    """
+    import torch
+
+    torch.set_num_threads(n_threads)
+
+
+def bf16_supported():
+    """
+    Returns True if torch has CPU autocast and this CPU runs bf16 natively.
+    """
+    import torch
+
+    if not hasattr(torch, 'autocast'):
+        return False
+    try:
+        with open('/proc/cpuinfo') as cpuinfo_file:
+            cpu_flags = set(cpuinfo_file.read().split())
+    except OSError:
+        return False
+
+    return any(flag in cpu_flags for flag in BF16_CPU_FLAGS)
+
+
+def resolve_precision(precision):
+    """
+    Returns the precision inference will actually run at: precision, or fp32
+    when bf16 was requested but isn't supported by torch or this CPU.
+    """
+    if precision == 'bf16' and not bf16_supported():
+        print('bf16 needs torch.autocast & a CPU with one of: {}, using fp32'.format(
+            ', '.join(BF16_CPU_FLAGS)))
+        return 'fp32'
+
+    return precision
+
+
+def open_image(img_path):
+    """
+    Opens an image given as a path, a file object or its content (bytes, e.g.
+    read from a shard by shard_input.py).
+    Returns:
+     img_pil - opened PIL image
+    """
+    from PIL import Image
+
+    if isinstance(img_path, bytes):
+        img_path = BytesIO(img_path)
+
+    return Image.open(img_path)
+
+
 def classifier(img_path, model_name):
+    """
+    Classifies an image with a pretrained model.
+    Parameters:
+     img_path - path to (file object or bytes of) the image to classify
+     model_name - model architecture, one of: resnet alexnet vgg (string)
+    Returns:
+     ImageNet label of the predicted class (string)
+    """
     # load the image
-    img_pil = Image.open(img_path)
+    img_pil = open_image(img_path)
+
+    return predict(preprocess_image(img_pil), model_name)
+
+
+def classifier_topk(img_path, model_name, k=5):
+    """
+    Classifies an image like classifier() but returns the k best ImageNet
+    class ids and their raw scores (logits) instead of the best label, so the
+    outputs can be stored and re-scored without running the model again.
+    Parameters:
+     img_path - path to (file object or bytes of) the image to classify
+     model_name - model architecture, one of: resnet alexnet vgg (string)
+     k - number of best classes to return (int)
+    Returns:
+     topk_idx - class ids sorted from best to worst (list of int)
+     topk_logits - logits of the topk_idx classes (list of float)
+    """
+    return classifier_topk_batch([img_path], model_name, k)[0]
+
+
+def load_batch(img_paths, resolution=FULL_RESOLUTION, decode='full',
+               image_cache=None):
+    """
+    Loads & preprocesses images into a single batch tensor.
+    Parameters:
+     img_paths - paths to (file objects or bytes of) the images (list)
+     resolution - side of the square input images (int)
+     decode - one of DECODE_MODES (string)
+     image_cache - optional image_cache.DecodedImageCache the images are
+                   decoded through, paths or bytes only
+    Returns:
+     img_tensor - batch tensor of shape Nx3xresolutionxresolution
+    """
+    import torch
+
+    # the shorter side must still cover the resize of preprocess_image()
+    draft_size = None
+    if decode == 'draft':
+        resize_side = int(round(resolution * 256 / FULL_RESOLUTION))
+        draft_size = (resize_side, resize_side)
+
+    if image_cache is not None:
+        img_pils = [image_cache.open(img_path, draft_size) for img_path in img_paths]
+    else:
+        img_pils = [open_image(img_path) for img_path in img_paths]
+        if draft_size is not None:
+            for img_pil in img_pils:
+                img_pil.draft('RGB', draft_size)
+
+    return torch.cat([preprocess_image(img_pil, resolution) for img_pil in img_pils])
+
+
+def classifier_batch(img_paths, model_name, resolution=FULL_RESOLUTION,
+                     precision='fp32', decode='full', embed=False,
+                     image_cache=None):
+    """
+    Classifies a batch of images with a single forward pass of the model.
+    Parameters:
+     img_paths - paths to (file objects or bytes of) the images to classify
+                 (list)
+     model_name - model architecture, one of: resnet alexnet vgg (string)
+     resolution - side of the square input images, less than
+                  FULL_RESOLUTION only for RESOLUTION_ARCHS (int)
+     precision - one of PRECISIONS, already checked by resolve_precision()
+                 (string)
+     decode - one of DECODE_MODES (string)
+     embed - also return the embedding of each image, captured from the
+             penultimate layer during the same forward pass (bool)
+     image_cache - optional DecodedImageCache, see load_batch()
+    Returns:
+     ImageNet labels of the predicted classes, in img_paths order (list),
+     or (label, embedding) tuples when embed
+    """
+    embeddings = [] if embed else None
+    pred_idxs = predict_logits(load_batch(img_paths, resolution, decode, image_cache),
+                               model_name, precision, embeddings).argmax(axis=1)
+    labels = [imagenet_classes_dict[pred_idx] for pred_idx in pred_idxs]
+
+    return list(zip(labels, embeddings[0])) if embed else labels
+
+
+def classifier_topk_batch(img_paths, model_name, k=5,
+                          resolution=FULL_RESOLUTION, precision='fp32',
+                          decode='full', embed=False, image_cache=None):
+    """
+    Batch version of classifier_topk().
+    Returns:
+     list of (topk_idx, topk_logits) tuples, in img_paths order, or
+     ((topk_idx, topk_logits), embedding) tuples when embed
+    """
+    embeddings = [] if embed else None
+    logits = predict_logits(load_batch(img_paths, resolution, decode, image_cache), model_name,
+                            precision, embeddings)
+    topk_idxs = logits.argsort(axis=1)[:, ::-1][:, :k]
+    topk = [(topk_idx.tolist(), img_logits[topk_idx].tolist())
+            for topk_idx, img_logits in zip(topk_idxs, logits)]
+
+    return list(zip(topk, embeddings[0])) if embed else topk
+
+
+def preprocess_image(img_pil, resolution=FULL_RESOLUTION):
+    """
+    Decodes & transforms a PIL image into the normalized tensor (batch of 1)
+    expected by the pretrained models.
+    Parameters:
+     img_pil - opened PIL image
+     resolution - side of the square center crop, the image is first resized
+                  keeping the 256/224 resize/crop ratio (int)
+    Returns:
+     img_tensor - image tensor of shape 1x3xresolutionxresolution
+    """
+    import torchvision.transforms as transforms
+    from torch import __version__
 
     # define transforms
     preprocess = transforms.Compose([
-        transforms.Resize(256),
-        transforms.CenterCrop(224),
+        transforms.Resize(int(round(resolution * 256 / FULL_RESOLUTION))),
+        transforms.CenterCrop(resolution),
         transforms.ToTensor(),
         transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
     ])
@@ -44,31 +277,82 @@ def classifier(img_path, model_name):
     # requires_grad_ to False on our tensor 
     if int(pytorch_ver[0]) > 0 or int(pytorch_ver[1]) >= 4:
         img_tensor.requires_grad_(False)
-    
+
+    return img_tensor
+
+
+def predict(img_tensor, model_name):
+    """
+    Applies a pretrained model to a preprocessed image tensor.
+    Parameters:
+     img_tensor - image tensor returned by preprocess_image()
+     model_name - model architecture, one of: resnet alexnet vgg (string)
+    Returns:
+     ImageNet label of the predicted class (string)
+    """
+    # return index corresponding to predicted class
+    pred_idx = predict_logits(img_tensor, model_name)[0].argmax()
+
+    return imagenet_classes_dict[pred_idx]
+
+
+def predict_logits(img_tensor, model_name, precision='fp32', embeddings=None):
+    """
+    Applies a pretrained model to a batch of preprocessed images.
+    Parameters:
+     img_tensor - image tensor returned by preprocess_image() or load_batch()
+     model_name - model architecture, one of: resnet alexnet vgg (string)
+     precision - one of PRECISIONS, bf16 runs the model under CPU autocast
+                 (string)
+     embeddings - if not None, the output of the embedding layer (a float32
+                  numpy array, one row per image) is appended to this list
+    Returns:
+     logits - scores of the 1000 ImageNet classes, one row per image (numpy
+              array)
+    """
+    import torch
+    from torch.autograd import Variable
+    from torch import __version__
+
+    pytorch_ver = __version__.split('.')
+
     # pytorch versions less than 0.4 - uses Variable because not-depreciated
-    else:
+    if not (int(pytorch_ver[0]) > 0 or int(pytorch_ver[1]) >= 4):
         # apply model to input
         # wrap input in variable
         data = Variable(img_tensor, volatile = True) 
 
     # apply model to input
-    model = models[model_name]
+    model = load_model(model_name)
 
-    # puts model in evaluation mode
-    # instead of (default)training mode
-    model = model.eval()
+    # capture the penultimate layer output during the forward pass
+    hook = None
+    if embeddings is not None:
+        layer_path, _ = embedding_layers[model_name]
+        layer = model
+        for name in layer_path.split('.'):
+            layer = layer._modules[name]
+        hook = layer.register_forward_hook(
+            lambda module, inputs, output: embeddings.append(
+                output.float().reshape(output.shape[0], -1).data.numpy()))
     
     # apply data to model - adjusted based upon version to account for 
     # operating on a Tensor for version 0.4 & higher.
     if int(pytorch_ver[0]) > 0 or int(pytorch_ver[1]) >= 4:
-        output = model(img_tensor)
+        # no autograd graph is needed for inference
+        with torch.no_grad():
+            if precision == 'bf16':
+                with torch.autocast('cpu', dtype=torch.bfloat16):
+                    output = model(img_tensor).float()
+            else:
+                output = model(img_tensor)
 
     # pytorch versions less than 0.4
     else:
         # apply data to model
         output = model(data)
 
-    # return index corresponding to predicted class
-    pred_idx = output.data.numpy().argmax()
+    if hook is not None:
+        hook.remove()
 
-    return imagenet_classes_dict[pred_idx]
+    return output.data.numpy()
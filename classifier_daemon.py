@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/classifier_daemon.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Keeps the pretrained models of classifier.py loaded in a local
+#          daemon so small repeated jobs don't pay for the interpreter start,
+#          the torch import & the weights loading every time. Clients
+#          (check_images.py --daemon, test_classifier.py) connect to its Unix
+#          domain socket and send JSON lines requests: batches of image paths
+#          (or image contents, e.g. read from shards) to classify, or status
+#          requests answered with the uptime & the number of requests served.
+#          Requests are handled in a thread per connection, forward passes
+#          run one at a time. The socket is only accessible to the user
+#          running the daemon (mode 0600, by default in a 0700 directory).
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python classifier_daemon.py --socket <socket path> --preload <models>
+#   Example call:
+#    python classifier_daemon.py --preload vgg
+#    python check_images.py --dir pet_images/ --arch vgg --daemon /tmp/dog_classifier-1000/classifier.sock
+#    python classifier_daemon.py --status
+##
+
+# Imports python modules
+import argparse
+import base64
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from os.path import abspath, dirname, exists, join
+from time import time
+
+# Imports the classifier functions run by the daemon (torch is only
+# imported when the daemon loads a model)
+from classifier import (classifier_batch, classifier_topk_batch, load_model,
+                        models, resolve_precision, set_num_threads,
+                        FULL_RESOLUTION)
+
+# environment variable giving the socket of a running daemon to the clients
+DAEMON_SOCKET_ENV = 'DOG_CLASSIFIER_SOCKET'
+# in a directory only the user can access, as the daemon opens any path it
+# is sent & can be shut down by its clients
+DEFAULT_SOCKET = join(tempfile.gettempdir(), 'dog_classifier-{}'.format(os.getuid()),
+                      'classifier.sock')
+# seconds a client waits for the daemon to answer a request
+CLIENT_TIMEOUT_SECS = 600
+
+# client connections of this process, by socket path
+clients = {}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Keep the classifier models loaded & classify images sent over a Unix socket")
+    parser.add_argument('--socket', type=str,
+                        default=os.environ.get(DAEMON_SOCKET_ENV, DEFAULT_SOCKET),
+                        help='Unix domain socket path(default - ${} or {})'.format(
+                            DAEMON_SOCKET_ENV, DEFAULT_SOCKET))
+    parser.add_argument('--preload', type=str, nargs='*', default=['vgg'],
+                        help='Models loaded at startup, others are loaded on first use(default - vgg)')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='Torch threads(default - torch default)')
+    parser.add_argument('--status', action='store_true',
+                        help='Print the status of the running daemon & exit')
+    parser.add_argument('--stop', action='store_true',
+                        help='Stop the running daemon & exit')
+    in_arg = parser.parse_args()
+
+    if in_arg.status or in_arg.stop:
+        with DaemonClient(in_arg.socket) as client:
+            if in_arg.stop:
+                client.request(op='shutdown')
+                print('Classifier daemon stopped')
+            else:
+                status = client.status()
+                print('Classifier daemon pid {}: up {:.1f}s, {} requests served '
+                      '({} images), models loaded: {}'.format(
+                          status['pid'], status['uptime_secs'], status['n_requests'],
+                          status['n_images'], ', '.join(status['models']) or 'none'))
+        return
+
+    if in_arg.threads is not None:
+        set_num_threads(in_arg.threads)
+    for model_name in in_arg.preload:
+        load_model(model_name)
+
+    server = ClassifierDaemon(in_arg.socket)
+    print('Classifier daemon listening on {} (models loaded: {})'.format(
+        in_arg.socket, ', '.join(sorted(models)) or 'none'))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class ClassifierDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server classifying the images of the requests with the
+    models kept loaded in this process.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        socket_dir = dirname(abspath(socket_path))
+        if not exists(socket_dir):
+            os.makedirs(socket_dir, mode=0o700)
+        # a socket file left by a daemon that died can be replaced
+        if exists(socket_path):
+            try:
+                DaemonClient(socket_path).close()
+            except OSError:
+                os.remove(socket_path)
+            else:
+                raise RuntimeError('a classifier daemon is already listening on {}'.format(
+                    socket_path))
+        socketserver.UnixStreamServer.__init__(self, socket_path, DaemonRequestHandler)
+        self.socket_path = socket_path
+        self.start_time = time()
+        self.n_requests = 0
+        self.n_images = 0
+        # forward passes run one at a time, each one uses all the torch threads
+        self.inference_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+
+    def server_bind(self):
+        # created with mode 0600: only this user can connect
+        umask = os.umask(0o177)
+        try:
+            socketserver.UnixStreamServer.server_bind(self)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def handle_request_message(self, request):
+        """
+        Runs a decoded request & returns its response.
+        Parameters:
+         request - Dictionary with 'op' one of: classify status
+                   resolve_precision shutdown, 'precision' for
+                   resolve_precision, and for classify 'arch', 'images'
+                   (paths or {'bytes': base64 content}) and optionally
+                   'resolution', 'precision', 'decode', 'topk' (k, or None
+                   for the best label only) and 'embed'
+        Returns:
+         response - Dictionary with 'ok' and 'outputs' & 'precision' (the
+                    one used, classify), the status fields (status),
+                    'precision' (resolve_precision) or 'error'
+        """
+        with self.stats_lock:
+            self.n_requests += 1
+
+        if request['op'] == 'status':
+            return {'ok': True, 'pid': os.getpid(),
+                    'uptime_secs': round(time() - self.start_time, 3),
+                    'n_requests': self.n_requests, 'n_images': self.n_images,
+                    'models': sorted(models)}
+        if request['op'] == 'resolve_precision':
+            return {'ok': True, 'precision': resolve_precision(request['precision'])}
+        if request['op'] == 'shutdown':
+            # shutdown() waits for serve_forever(), which runs in another thread
+            threading.Thread(target=self.shutdown).start()
+            return {'ok': True}
+        if request['op'] != 'classify':
+            return {'ok': False, 'error': 'unknown op {!r}'.format(request['op'])}
+
+        img_paths = [base64.b64decode(image['bytes']) if isinstance(image, dict) else image
+                     for image in request['images']]
+        settings = {'resolution': request.get('resolution', FULL_RESOLUTION),
+                    'precision': resolve_precision(request.get('precision', 'fp32')),
+                    'decode': request.get('decode', 'full'),
+                    'embed': request.get('embed', False)}
+        with self.inference_lock:
+            if request.get('topk'):
+                outputs = classifier_topk_batch(img_paths, request['arch'],
+                                                k=request['topk'], **settings)
+            else:
+                outputs = classifier_batch(img_paths, request['arch'], **settings)
+        # embeddings are numpy arrays
+        if settings['embed']:
+            outputs = [(output, embedding.tolist()) for output, embedding in outputs]
+        with self.stats_lock:
+            self.n_images += len(img_paths)
+
+        return {'ok': True, 'outputs': outputs, 'precision': settings['precision']}
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answers the JSON lines requests of a client connection until it closes.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.handle_request_message(json.loads(line.decode('utf-8')))
+            except Exception as error:
+                response = {'ok': False, 'error': '{}: {}'.format(type(error).__name__, error)}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class DaemonClient(object):
+    """
+    Connection to a running classifier daemon, raising OSError if it can't
+    connect & socket.timeout if the daemon doesn't answer within timeout
+    seconds.
+    """
+
+    def __init__(self, socket_path, timeout=CLIENT_TIMEOUT_SECS):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        try:
+            self.socket.connect(socket_path)
+        except OSError:
+            self.socket.close()
+            raise
+        self.stream = self.socket.makefile('rwb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.stream.close()
+        self.socket.close()
+
+    def request(self, **request):
+        """
+        Sends a request & returns the daemon's response, raises RuntimeError
+        with the daemon's error message if it failed.
+        """
+        self.stream.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise RuntimeError('the classifier daemon closed the connection')
+        response = json.loads(line.decode('utf-8'))
+        if not response['ok']:
+            raise RuntimeError('classifier daemon: {}'.format(response['error']))
+
+        return response
+
+    def status(self):
+        """
+        Returns the status of the daemon: Dictionary with 'pid',
+        'uptime_secs', 'n_requests', 'n_images' and 'models' (loaded).
+        """
+        return self.request(op='status')
+
+    def resolve_precision(self, precision):
+        """
+        Returns the precision the daemon runs precision at, see
+        classifier.resolve_precision().
+        """
+        return self.request(op='resolve_precision', precision=precision)['precision']
+
+    def classify(self, img_paths, model_name, resolution=FULL_RESOLUTION,
+                 precision='fp32', decode='full', k=None, embed=False):
+        """
+        Classifies a batch of images in the daemon, see
+        classifier.classifier_batch() & classifier.classifier_topk_batch().
+        Parameters:
+         img_paths - paths (relative to this process) or content bytes of the
+                     images (list)
+         model_name - model architecture, one of: resnet alexnet vgg (string)
+         resolution, precision, decode, embed - see classifier_batch()
+         k - number of classes returned per image, None for the best label
+             only (int)
+        Returns:
+         outputs - classifier_batch() outputs, or classifier_topk_batch()
+                   ones when k (tuples come back as lists)
+        """
+        images = [{'bytes': base64.b64encode(img_path).decode('ascii')}
+                  if isinstance(img_path, bytes) else abspath(img_path)
+                  for img_path in img_paths]
+
+        return self.request(op='classify', arch=model_name, images=images,
+                            resolution=resolution, precision=precision,
+                            decode=decode, topk=k, embed=embed)['outputs']
+
+
+def daemon_classify_batch(img_paths, model_name, socket_path, **settings):
+    """
+    classify_fn classifying a batch in the daemon listening on socket_path
+    (see worker_pool.classify_paths()), reusing this process's connection.
+    Parameters:
+     socket_path - Unix socket of the daemon (string)
+     settings - DaemonClient.classify() keyword arguments
+    Returns:
+     outputs - see DaemonClient.classify()
+    """
+    client_key = (os.getpid(), socket_path)
+    if client_key not in clients:
+        clients[client_key] = DaemonClient(socket_path)
+
+    return clients[client_key].classify(img_paths, model_name, **settings)
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/dedupe.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Groups byte-identical and near-identical (re-uploaded, resized)
+#          images together so that only one representative per group has to
+#          be classified. Exact duplicates are found with a content hash,
+#          near duplicates with a difference hash (dHash) kept in a
+#          multi-index so lookups don't compare against every image.
+#
+#   Example call:
+#    python dedupe.py --dir pet_images/
+##
+
+# Imports python modules
+import argparse
+import hashlib
+from io import BytesIO
+from os import listdir
+from os.path import isfile
+
+# dHash is computed on a (HASH_SIZE + 1) x HASH_SIZE grayscale thumbnail
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Group duplicate and near duplicate images")
+    parser.add_argument('--dir', type=str, default='pet_images/',
+                        help="Path to images files directory")
+    parser.add_argument('--max-distance', type=int, default=3,
+                        help='Max hamming distance between dHashes of near duplicates(default - 3)')
+    in_arg = parser.parse_args()
+    if in_arg.max_distance < 0:
+        parser.error('--max-distance must be 0 or more')
+
+    img_names = [name for name in sorted(listdir(in_arg.dir))
+                 if isfile(in_arg.dir + name)]
+
+    stats = {}
+    groups = group_duplicates(in_arg.dir, img_names, in_arg.max_distance, stats)
+    for rep_name, members in groups.items():
+        if len(members) > 1:
+            print('{}: {}'.format(rep_name, ', '.join(members[1:])))
+    print(stats)
+
+
+def file_digest(img_path, chunk_size=1 << 16):
+    """
+    Returns the sha1 hex digest of the file content, read in chunks so that
+    large files don't have to fit in memory.
+    Parameters:
+     img_path - path to the image file (string) or its content (bytes)
+     chunk_size - number of bytes read at a time (int)
+    Returns:
+     digest - hex digest of the file content (string)
+    """
+    if isinstance(img_path, bytes):
+        return hashlib.sha1(img_path).hexdigest()
+
+    sha1 = hashlib.sha1()
+    with open(img_path, 'rb') as img_file:
+        for chunk in iter(lambda: img_file.read(chunk_size), b''):
+            sha1.update(chunk)
+
+    return sha1.hexdigest()
+
+
+def dhash(img_path):
+    """
+    Computes the difference hash of an image: the image is shrunk to a small
+    grayscale thumbnail and each bit tells if a pixel is brighter than its
+    right neighbour. Resized or re-encoded copies get the same or a very
+    close hash.
+    Parameters:
+     img_path - path to the image file (string) or its content (bytes)
+    Returns:
+     hash_value - HASH_BITS bits perceptual hash (int)
+    """
+    # Imports PIL to compute the perceptual hash of images (imported here so
+    # that importing this module stays cheap)
+    from PIL import Image
+
+    if isinstance(img_path, bytes):
+        img_path = BytesIO(img_path)
+    img = Image.open(img_path)
+    # only decode at the scale needed for the thumbnail (JPEG only)
+    img.draft('L', (HASH_SIZE * 4, HASH_SIZE * 4))
+    pixels = img.convert('L').resize(
+        (HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR).tobytes()
+
+    hash_value = 0
+    for row in range(HASH_SIZE):
+        row_start = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            left = pixels[row_start + col]
+            right = pixels[row_start + col + 1]
+            hash_value = (hash_value << 1) | int(left > right)
+
+    return hash_value
+
+
+def hash_bands(hash_value, n_bands):
+    """
+    Splits a hash in n_bands contiguous bit ranges. Two hashes that are at
+    most n_bands - 1 bits apart share at least one identical band, so bands
+    can be used as exact-match keys to find near duplicate candidates.
+    Parameters:
+     hash_value - perceptual hash (int)
+     n_bands - number of bands to split the hash in (int)
+    Returns:
+     bands - list of (band index, band value) tuples
+    """
+    band_bits = HASH_BITS // n_bands
+    bands = []
+    for band_idx in range(n_bands):
+        start = band_idx * band_bits
+        # last band takes the remaining bits
+        width = band_bits if band_idx < n_bands - 1 else HASH_BITS - start
+        bands.append((band_idx, (hash_value >> start) & ((1 << width) - 1)))
+
+    return bands
+
+
+def group_duplicates(images_dir, img_names, max_distance=3, stats=None,
+                     img_files=None):
+    """
+    Groups images that are byte-identical or whose perceptual hashes are at
+    most max_distance bits apart. The first image of a group is its
+    representative; later images join the group of the first representative
+    found close enough to them.
+    Parameters:
+     images_dir - The (full) path to the folder of images (string)
+     img_names - image filenames in images_dir to group (list)
+     max_distance - max hamming distance between dHashes of near
+                    duplicates, 0 only groups exact duplicates, raises
+                    ValueError if negative (int)
+     stats - optional dictionary updated with the counts 'n_groups',
+             'n_exact_dups' and 'n_near_dups'
+     img_files - optional iterable of (image filename, image content bytes)
+                 read instead of images_dir + filename (e.g. from shards)
+    Returns:
+     groups - Dictionary with key as representative image filename and value
+              as the list of all image filenames in its group (representative
+              first)
+    """
+    if max_distance < 0:
+        raise ValueError('max_distance must be 0 or more, got {}'.format(max_distance))
+
+    groups = {}
+    digest_reps = {}
+    # band (index, value) -> representatives having that band
+    band_index = {}
+    rep_hashes = {}
+    rep_order = {}
+    n_bands = max_distance + 1
+    n_exact = n_near = 0
+
+    if img_files is None:
+        img_files = ((img_name, images_dir + img_name) for img_name in img_names)
+
+    for img_name, img_path in img_files:
+
+        digest = file_digest(img_path)
+        if digest in digest_reps:
+            groups[digest_reps[digest]].append(img_name)
+            n_exact += 1
+            continue
+
+        rep_name = None
+        if max_distance > 0:
+            hash_value = dhash(img_path)
+            bands = hash_bands(hash_value, n_bands)
+            candidates = set()
+            for band in bands:
+                candidates.update(band_index.get(band, ()))
+            # keep the order representatives were found in
+            for candidate in sorted(candidates, key=rep_order.get):
+                if bin(rep_hashes[candidate] ^ hash_value).count('1') <= max_distance:
+                    rep_name = candidate
+                    break
+
+        if rep_name is not None:
+            groups[rep_name].append(img_name)
+            digest_reps[digest] = rep_name
+            n_near += 1
+            continue
+
+        # new representative
+        groups[img_name] = [img_name]
+        rep_order[img_name] = len(rep_order)
+        digest_reps[digest] = img_name
+        if max_distance > 0:
+            rep_hashes[img_name] = hash_value
+            for band in bands:
+                band_index.setdefault(band, []).append(img_name)
+
+    if stats is not None:
+        stats['n_groups'] = len(groups)
+        stats['n_exact_dups'] = n_exact
+        stats['n_near_dups'] = n_near
+
+    return groups
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/embedding_index.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Finds similar pets from the embeddings saved by
+#          check_images.py --save-embeddings (the penultimate layer output
+#          of every image, captured during the classification forward pass)
+#          without running the model again. Embeddings are stored as a
+#          float16 .npy matrix, one row per image, memory-mapped so it
+#          doesn't have to fit in memory, with the image filenames & labels
+#          in <file>.json. Top-k cosine similarity is computed with numpy
+#          over chunks of rows, keeping the running top-k of every query.
+#          The pet label of every image can also be predicted from its
+#          nearest neighbours (leave-one-out majority vote).
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python embedding_index.py --embeddings <file saved by check_images.py>
+#             --image <image filename> --k <number of similar images>
+#   Example call:
+#    python embedding_index.py --embeddings vgg_embeddings.npy
+#           --image Collie_03797.jpg --k 5
+##
+
+# Imports python modules
+import argparse
+import json
+from os.path import exists
+
+# Imports numpy for the memory-mapped matrix & the similarity products
+import numpy as np
+
+EMBEDDING_DTYPE = np.float16
+# index rows multiplied at a time
+CHUNK_ROWS = 1 << 16
+# queries searched at a time by knn_labels(), bounds the score matrix to
+# QUERY_ROWS x CHUNK_ROWS whatever the index size
+QUERY_ROWS = 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find similar pets from the saved embeddings")
+    parser.add_argument('--embeddings', type=str, required=True,
+                        help='Embeddings file saved by check_images.py --save-embeddings')
+    parser.add_argument('--image', type=str, nargs='+', default=[],
+                        help='Filenames of the images to find similar pets of')
+    parser.add_argument('--k', type=int, default=5,
+                        help='Number of similar images / voting neighbours(default - 5)')
+    parser.add_argument('--knn-labels', action='store_true',
+                        help='Predict the pet label of every image from its k nearest neighbours & report the accuracy')
+    in_arg = parser.parse_args()
+
+    index = SimilarityIndex(in_arg.embeddings)
+    for img_name in in_arg.image:
+        print('\n*** Images most similar to {} ({}) ***'.format(
+            img_name, index.pet_labels[index.rows[img_name]]))
+        for similar_name, pet_label, score in index.similar_to(img_name, in_arg.k):
+            print('{:>40} {:>30} {:8.4f}'.format(similar_name, pet_label, score))
+
+    if in_arg.knn_labels:
+        predicted = index.knn_labels(in_arg.k)
+        n_correct = sum(predicted_label == pet_label
+                        for predicted_label, pet_label in zip(predicted, index.pet_labels))
+        print('\n*** {}-NN pet labels: {} of {} correct ({:.1f}%) ***'.format(
+            in_arg.k, n_correct, len(predicted),
+            n_correct / max(len(predicted), 1) * 100))
+
+
+def open_embeddings(path, n_images, dim, resume=False):
+    """
+    Creates (or reopens when resuming) the memory-mapped embeddings matrix.
+    Parameters:
+     path - path of the .npy file (string)
+     n_images - number of rows (int)
+     dim - embedding size (int)
+     resume - keep the rows already written by an interrupted run, the
+              file must exist with the expected shape (bool)
+    Returns:
+     embeddings - n_images x dim float16 np.memmap, flush it after writing
+    """
+    if resume:
+        # the resumed images won't be classified again, so their rows can't
+        # be recreated
+        if not exists(path):
+            raise ValueError('{} is missing, the resumed images have no embeddings: '
+                             'run again without resuming'.format(path))
+        embeddings = np.lib.format.open_memmap(path, mode='r+')
+        if embeddings.shape != (n_images, dim) or embeddings.dtype != EMBEDDING_DTYPE:
+            raise ValueError('{} holds {} {} embeddings instead of {} x {} {}: '
+                             'run again without resuming'.format(
+                                 path, embeddings.shape, embeddings.dtype, n_images, dim,
+                                 np.dtype(EMBEDDING_DTYPE)))
+        return embeddings
+
+    return np.lib.format.open_memmap(path, mode='w+', dtype=EMBEDDING_DTYPE,
+                                     shape=(n_images, dim))
+
+
+def save_embeddings_meta(path, arch, img_names, pet_labels, classifier_labels):
+    """
+    Saves the row filenames & labels of an embeddings file to <path>.json.
+    Parameters:
+     path - path of the .npy embeddings file (string)
+     arch - model architecture the embeddings come from (string)
+     img_names - image filename of each row (list)
+     pet_labels - pet image label of each row (list)
+     classifier_labels - classifier label of each row (list)
+    Returns:
+     None
+    """
+    with open(path + '.json', 'w') as meta_file:
+        json.dump({'arch': arch, 'filenames': img_names, 'pet_labels': pet_labels,
+                   'classifier_labels': classifier_labels}, meta_file)
+
+
+class SimilarityIndex(object):
+    """
+    Top-k cosine similarity search over a saved embeddings file.
+    """
+
+    def __init__(self, path, chunk_rows=CHUNK_ROWS):
+        self.embeddings = np.load(path, mmap_mode='r')
+        with open(path + '.json') as meta_file:
+            meta = json.load(meta_file)
+        self.arch = meta['arch']
+        self.filenames = meta['filenames']
+        self.pet_labels = meta['pet_labels']
+        self.rows = {img_name: row for row, img_name in enumerate(self.filenames)}
+        self.chunk_rows = chunk_rows
+
+        # row norms, computed once chunk by chunk (0 for missing rows)
+        self.norms = np.concatenate([
+            np.linalg.norm(chunk.astype(np.float32), axis=1)
+            for chunk in self.chunks()]) if len(self.embeddings) else np.zeros(0)
+
+    def chunks(self):
+        for start in range(0, len(self.embeddings), self.chunk_rows):
+            yield self.embeddings[start:start + self.chunk_rows]
+
+    def top_k(self, queries, k, query_rows=None):
+        """
+        Finds the k index rows most similar to each query.
+        Parameters:
+         queries - query embeddings, one per row (numpy array)
+         k - number of rows returned per query (int)
+         query_rows - index row of each query, excluded from its results
+                      (numpy array, default- None)
+        Returns:
+         rows - k best index rows of each query, best first (numpy array)
+         scores - their cosine similarities (numpy array)
+        """
+        queries = queries.astype(np.float32)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        k = min(k, len(self.embeddings))
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), k), dtype=np.int64)
+
+        for start, chunk in zip(range(0, len(self.embeddings), self.chunk_rows),
+                                self.chunks()):
+            chunk_norms = np.maximum(self.norms[start:start + len(chunk)], 1e-12)
+            scores = queries @ chunk.astype(np.float32).T / chunk_norms
+            chunk_rows = np.arange(start, start + len(chunk))
+            if query_rows is not None:
+                in_chunk = (query_rows >= start) & (query_rows < start + len(chunk))
+                scores[np.flatnonzero(in_chunk), query_rows[in_chunk] - start] = -np.inf
+
+            # merge the chunk into the running top-k
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, np.broadcast_to(chunk_rows, (len(queries), len(chunk)))],
+                                  axis=1)
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, keep, axis=1)
+            best_rows = np.take_along_axis(rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+    def similar_to(self, img_name, k=5):
+        """
+        Returns the k images most similar to an indexed image as a list of
+        (image filename, pet label, cosine similarity) tuples, best first.
+        """
+        row = self.rows[img_name]
+        rows, scores = self.top_k(self.embeddings[row:row + 1], k + 1, np.array([row]))
+
+        return [(self.filenames[similar_row], self.pet_labels[similar_row], float(score))
+                for similar_row, score in zip(rows[0], scores[0])
+                if score > -np.inf][:k]
+
+    def knn_labels(self, k=5):
+        """
+        Predicts the pet label of every image by a majority vote of its k
+        nearest neighbours (itself excluded, so at most the other rows vote).
+        Returns:
+         predicted - predicted pet label of each row, None without any other
+                     row to vote (list)
+        """
+        n_rows = len(self.embeddings)
+        if n_rows < 2:
+            return [None] * n_rows
+        k = min(k, n_rows - 1)
+        labels, label_ids = np.unique(self.pet_labels, return_inverse=True)
+        predicted = []
+        for start in range(0, n_rows, QUERY_ROWS):
+            queries = self.embeddings[start:start + QUERY_ROWS]
+            query_rows = np.arange(start, start + len(queries))
+            rows, scores = self.top_k(queries, k, query_rows)
+            # the masked self rows & the -inf padding of the top-k don't vote
+            voting = scores > -np.inf
+            votes = np.zeros((len(queries), len(labels)), dtype=np.int64)
+            np.add.at(votes, (np.repeat(np.arange(len(queries)), rows.shape[1])[voting.ravel()],
+                              label_ids[rows][voting]), 1)
+            predicted.extend(labels[votes.argmax(axis=1)].tolist())
+
+        return predicted
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/image_cache.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Decoded image cache of a run, so the images decoded to be
+#          classified aren't read & decoded again to be labeled
+#          (check_images.py --decode-cache-mb). Decoded PIL images are kept
+#          by source (path, or (shards, member name) of the content read
+#          from a shard, see shard_input.ShardMember) and decode mode,
+#          bounded by the size of their pixels with least recently used
+#          eviction. Cached images are shared: callers drawing on them must
+#          copy them first. The decodes avoided & the
+#          source bytes not read again are counted for the report.
+#
+#   Example usage:
+#    image_cache = DecodedImageCache(512 << 20)
+#    img_pil = image_cache.open('pet_images/Collie_03797.jpg')
+##
+
+# Imports python modules
+import hashlib
+from collections import OrderedDict
+from os.path import getsize
+
+# Imports image opening of the classifier (PIL is imported when decoding)
+from classifier import open_image
+
+
+class DecodedImageCache(object):
+    """
+    LRU cache of decoded PIL images bounded by the bytes of their pixels.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        # (source, draft size) -> (image, its pixel bytes, source bytes),
+        # least recently used first
+        self.images = OrderedDict()
+        self.n_decodes = 0
+        self.n_hits = 0
+        self.n_evictions = 0
+        self.bytes_saved = 0
+
+    def get(self, source, draft_size=None):
+        """
+        Returns the cached image of a source, None if it isn't cached.
+        Parameters:
+         source - image path, or source of a shard member (see
+                  image_source())
+         draft_size - see open()
+        Returns:
+         img_pil - loaded PIL image, shared with the other callers: copy it
+                   before modifying it
+        """
+        key = (source, draft_size)
+        if key not in self.images:
+            return None
+
+        self.images.move_to_end(key)
+        img_pil, _, source_bytes = self.images[key]
+        self.n_hits += 1
+        self.bytes_saved += source_bytes
+
+        return img_pil
+
+    def open(self, img_path, draft_size=None):
+        """
+        Returns the decoded image of a source, decoding it on a miss.
+        Parameters:
+         img_path - path to the image file (string) or its content (bytes)
+         draft_size - if not None, JPEGs are draft decoded at the smallest
+                      scale covering this (width, height) (tuple)
+        Returns:
+         img_pil - loaded PIL image, shared with the other callers: copy it
+                   before modifying it
+        """
+        source = image_source(img_path)
+        key = (source, draft_size)
+        img_pil = self.get(source, draft_size)
+        if img_pil is not None:
+            return img_pil
+
+        img_pil = open_image(img_path)
+        if draft_size is not None:
+            img_pil.draft('RGB', draft_size)
+        img_pil.load()
+        self.n_decodes += 1
+
+        img_bytes = img_pil.width * img_pil.height * len(img_pil.getbands())
+        source_bytes = len(img_path) if isinstance(img_path, bytes) else getsize(img_path)
+        # an image larger than the whole cache isn't kept
+        if img_bytes <= self.max_bytes:
+            self.images[key] = (img_pil, img_bytes, source_bytes)
+            self.n_bytes += img_bytes
+            while self.n_bytes > self.max_bytes:
+                _, (_, evicted_bytes, _) = self.images.popitem(last=False)
+                self.n_bytes -= evicted_bytes
+                self.n_evictions += 1
+
+        return img_pil
+
+    def recent_sources(self, draft_size=None):
+        """
+        Returns the sources of the cached images decoded with draft_size,
+        most recently used first (to use them before they get evicted).
+        """
+        return [source for source, key_draft_size in reversed(self.images)
+                if key_draft_size == draft_size]
+
+
+def image_source(img_path):
+    """
+    Returns the cache source of an image path or content: the path, the
+    source of a shard_input.ShardMember, else the digest of the content.
+    """
+    if isinstance(img_path, bytes):
+        return getattr(img_path, 'source', None) or hashlib.sha1(img_path).digest()
+
+    return img_path
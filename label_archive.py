@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/label_archive.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Packs labeled images into a few large tar or zip shards instead of
+#          one small file per image, which is what makes writing, copying
+#          and serving millions of annotated images expensive. Members are
+#          stored uncompressed (JPEG is already compressed) so that each one
+#          can be read straight from its shard using the offset & size kept
+#          in the index.jsonl file written next to the shards:
+#            {"name": ..., "label": ..., "shard": ..., "offset": ..., "size": ...}
+#
+#   Example usage:
+#    with ShardedArchiveWriter('pet_images/labeled_imgs', 'tar') as writer:
+#        writer.add('Collie_03797.jpg', jpeg_bytes, 'collie')
+#    index = load_index('pet_images/labeled_imgs')
+#    jpeg_bytes = read_member('pet_images/labeled_imgs', index['Collie_03797.jpg'])
+##
+
+# Imports python modules
+import json
+import tarfile
+import zipfile
+from io import BytesIO
+from os.path import join
+from time import time
+
+ARCHIVE_FORMATS = ('tar', 'zip')
+INDEX_FILENAME = 'index.jsonl'
+# size of a zip local file header before the member name
+ZIP_LOCAL_HEADER_SIZE = 30
+
+
+class ShardedArchiveWriter(object):
+    """
+    Streams members into archive shards of about shard_bytes each & writes
+    the name -> (shard, offset, size) index.
+    """
+
+    def __init__(self, out_dir, archive_format='tar', shard_bytes=256 << 20,
+                 prefix='labeled'):
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError('Unknown archive format {} (expected one of: {})'.format(
+                archive_format, ', '.join(ARCHIVE_FORMATS)))
+        self.out_dir = out_dir
+        self.archive_format = archive_format
+        self.shard_bytes = shard_bytes
+        self.prefix = prefix
+        self.n_shards = 0
+        self.shard = None
+        self.shard_name = None
+        self.shard_size = 0
+        self.index_file = open(join(out_dir, INDEX_FILENAME), 'w')
+
+    def open_shard(self):
+        self.close_shard()
+        self.shard_name = '{}-{:05d}.{}'.format(self.prefix, self.n_shards,
+                                                self.archive_format)
+        shard_path = join(self.out_dir, self.shard_name)
+        if self.archive_format == 'tar':
+            self.shard = tarfile.open(shard_path, 'w', format=tarfile.PAX_FORMAT)
+        else:
+            self.shard = zipfile.ZipFile(shard_path, 'w', zipfile.ZIP_STORED)
+        self.n_shards += 1
+        self.shard_size = 0
+
+    def close_shard(self):
+        if self.shard is not None:
+            self.shard.close()
+            self.shard = None
+
+    def add(self, name, data, label=None):
+        """
+        Adds a member to the current shard (starting a new shard when it is
+        full) & indexes it.
+        Parameters:
+         name - member name (string)
+         data - member content (bytes)
+         label - optional classification label kept in the index (string)
+        """
+        if self.shard is None or self.shard_size + len(data) > self.shard_bytes:
+            self.open_shard()
+
+        if self.archive_format == 'tar':
+            member_info = tarfile.TarInfo(name)
+            member_info.size = len(data)
+            member_info.mtime = int(time())
+            self.shard.addfile(member_info, BytesIO(data))
+            # the shard offset is now past the member data & its padding
+            padded_size = -(-len(data) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+            offset = self.shard.offset - padded_size
+        else:
+            self.shard.writestr(name, data)
+            member_info = self.shard.getinfo(name)
+            offset = (member_info.header_offset + ZIP_LOCAL_HEADER_SIZE +
+                      len(member_info.filename.encode('utf-8')) +
+                      len(member_info.extra))
+        self.shard_size += len(data)
+
+        self.index_file.write(json.dumps({'name': name, 'label': label,
+                                          'shard': self.shard_name,
+                                          'offset': offset,
+                                          'size': len(data)}) + '\n')
+
+    def close(self):
+        self.close_shard()
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_index(out_dir):
+    """
+    Loads the index written by ShardedArchiveWriter.
+    Returns:
+     index - Dictionary with key as member name and value as its index entry
+    """
+    index = {}
+    with open(join(out_dir, INDEX_FILENAME)) as index_file:
+        for line in index_file:
+            entry = json.loads(line)
+            index[entry['name']] = entry
+
+    return index
+
+
+def read_member(out_dir, entry):
+    """
+    Reads a member straight from its shard with a seek & a single read.
+    Parameters:
+     out_dir - directory of the shards (string)
+     entry - index entry of the member
+    Returns:
+     data - member content (bytes)
+    """
+    with open(join(out_dir, entry['shard']), 'rb') as shard_file:
+        shard_file.seek(entry['offset'])
+        return shard_file.read(entry['size'])
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/memory_budget.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Fits a run into a memory budget (check_images.py --max-memory)
+#          instead of letting it get OOM-killed by a container limit. At
+#          startup the footprint of the model weights & of each image of a
+#          batch (activations grow linearly with the batch size) is measured
+#          with probe forward passes, then the most workers & the largest
+#          batch fitting the budget are picked: workers share the weights
+#          (see worker_pool.py) so each one only adds its activations. During
+#          the run a MemoryGuard follows the peak memory of the classifying
+#          processes and halves the batch size whenever it gets close to the
+#          budget. The probes use the largest images, since the decoded
+#          images of a batch grow with their resolution, and the guard also
+#          shrinks a batch before starting it when its estimated footprint
+#          wouldn't fit.
+#
+#   Example usage:
+#    footprint = measure_footprint('vgg', probe_images(img_files))
+#    n_workers, batch_size = plan_layout(4096, footprint, os.cpu_count())
+##
+
+# Imports python modules
+import argparse
+import heapq
+from itertools import islice
+from os.path import getsize
+
+# Imports the memory measurements of the classifying processes
+from worker_pool import memory_usage, reset_peak_memory
+
+# images per probe forward pass (the per-image footprint is the difference
+# between a PROBE_BATCH_SIZE & a 1 image forward pass)
+PROBE_BATCH_SIZE = 4
+# images whose size is compared to pick the probe images when their content
+# has to be read (shards)
+PROBE_SCAN_IMAGES = 256
+# private memory of a forked worker besides its activations (python objects
+# & allocator caches written after the fork)
+WORKER_OVERHEAD_MB = 32
+# fraction of the budget planned for, the rest absorbs estimation errors
+PLAN_FRACTION = 0.85
+# fraction of the budget at which the guard halves the batch size
+HIGH_WATER_FRACTION = 0.95
+# largest fraction of the budget given to the decoded image cache
+CACHE_BUDGET_FRACTION = 0.25
+# batch sizes considered by plan_layout()
+MIN_PLANNED_BATCH_SIZE = 4
+MAX_PLANNED_BATCH_SIZE = 64
+
+MEMORY_UNITS = {'K': 1.0 / 1024, 'M': 1, 'G': 1024, 'T': 1024 * 1024}
+
+
+def memory_arg(value):
+    """
+    argparse type of memory sizes such as 512M, 4G or 4096 (MB).
+    Returns:
+     size in MB (float)
+    """
+    value = value.strip().upper().rstrip('B')
+    unit = 'M'
+    if value and value[-1] in MEMORY_UNITS:
+        value, unit = value[:-1], value[-1]
+    try:
+        size_mb = float(value) * MEMORY_UNITS[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected a memory size such as 512M or 4G')
+    if size_mb <= 0:
+        raise argparse.ArgumentTypeError('expected a positive memory size')
+
+    return size_mb
+
+
+def probe_images(img_files, n_images=PROBE_BATCH_SIZE, max_scanned=None):
+    """
+    Picks the images with the largest files to probe with: they are expected
+    to decode to the largest images, so the per-image footprint measured is
+    an upper estimate rather than the one of arbitrary images.
+    Parameters:
+     img_files - (image filename, image path or content bytes) tuples
+                 (iterable)
+     n_images - number of images picked (int)
+     max_scanned - only consider the first max_scanned images, e.g. when
+                   their content has to be read from shards (int)
+    Returns:
+     img_paths - paths (or content bytes) of the picked images (list)
+    """
+    def file_size(img_file):
+        img_path = img_file[1]
+        return len(img_path) if isinstance(img_path, bytes) else getsize(img_path)
+
+    return [img_path for _, img_path in
+            heapq.nlargest(n_images, islice(img_files, max_scanned), key=file_size)]
+
+
+def fixed_footprint(footprint, n_workers, reserved_mb=0.0):
+    """
+    Returns the memory (MB) used by n_workers classifying processes besides
+    the images of their batches: the parent with the model weights (shared
+    by the workers) and the fixed cost of each worker's forward passes,
+    plus reserved_mb kept for other uses (e.g. a cache).
+    """
+    worker_mb = footprint['overhead'] + (WORKER_OVERHEAD_MB if n_workers > 1 else 0)
+
+    return footprint['base'] + footprint['model'] + n_workers * worker_mb + reserved_mb
+
+
+def measure_footprint(model_name, img_paths, classify_fn=None):
+    """
+    Measures the memory taken by the model weights & by a forward pass.
+    Loads the model (in this process, where workers will share it).
+    Parameters:
+     model_name - model architecture, one of: resnet alexnet vgg (string)
+     img_paths - a few paths (or content bytes) of images to probe with,
+                 the largest first (see probe_images()), repeated if less
+                 than PROBE_BATCH_SIZE (list)
+     classify_fn - function called as classify_fn(img_paths, model_name)
+                   (default- classifier_batch)
+    Returns:
+     footprint - Dictionary (MB) with 'base' (rss before loading the model),
+                 'model' (weights), 'overhead' (fixed cost of a forward pass)
+                 and 'per_image' (extra cost of each image of a batch)
+    """
+    from classifier import classifier_batch, load_model
+
+    classify_fn = classify_fn or classifier_batch
+    probe_paths = [img_paths[idx % len(img_paths)] for idx in range(PROBE_BATCH_SIZE)]
+
+    base_mb = memory_usage()['rss']
+    load_model(model_name)
+    model_mb = memory_usage()['rss'] - base_mb
+
+    # the first forward pass also allocates caches that stay allocated
+    classify_fn(probe_paths[:1], model_name)
+    peaks = {}
+    for batch_size in (1, PROBE_BATCH_SIZE):
+        reset_peak_memory()
+        classify_fn(probe_paths[:batch_size], model_name)
+        usage = memory_usage()
+        peaks[batch_size] = usage.get('peak', usage['rss'])
+
+    per_image_mb = max((peaks[PROBE_BATCH_SIZE] - peaks[1]) / (PROBE_BATCH_SIZE - 1), 1.0)
+    overhead_mb = max(peaks[1] - base_mb - model_mb - per_image_mb, 0.0)
+
+    return {'base': base_mb, 'model': model_mb, 'overhead': overhead_mb,
+            'per_image': per_image_mb}
+
+
+def cache_budget(max_mb, footprint, cache_mb):
+    """
+    Returns the part of the budget (MB) given to a cache of cache_mb MB: at
+    most CACHE_BUDGET_FRACTION of it, and none if 1 image batches wouldn't
+    fit next to it.
+    """
+    cache_mb = min(cache_mb, int(max_mb * CACHE_BUDGET_FRACTION))
+    if fixed_footprint(footprint, 1, cache_mb) + footprint['per_image'] > max_mb * PLAN_FRACTION:
+        return 0
+
+    return cache_mb
+
+
+def plan_layout(max_mb, footprint, n_cores, max_batch_size=MAX_PLANNED_BATCH_SIZE,
+                reserved_mb=0.0):
+    """
+    Picks the most workers (up to n_cores) that can still run batches of at
+    least MIN_PLANNED_BATCH_SIZE images within the budget, then the largest
+    batch size for them. Falls back to 1 worker & the largest batch that fits.
+    Parameters:
+     max_mb - memory budget in MB (float)
+     footprint - Dictionary returned by measure_footprint()
+     n_cores - cores available (int)
+     max_batch_size - largest batch size considered (int)
+     reserved_mb - memory of the budget kept for other uses (MB, float)
+    Returns:
+     n_workers - number of worker processes (int)
+     batch_size - images per forward pass, at least 1 even when even that
+                  doesn't fit (int)
+    """
+    def largest_batch(n_workers):
+        images_mb = max_mb * PLAN_FRACTION - fixed_footprint(footprint, n_workers, reserved_mb)
+        return min(max_batch_size, int(images_mb / n_workers // footprint['per_image']))
+
+    for n_workers in range(max(n_cores, 1), 1, -1):
+        batch_size = largest_batch(n_workers)
+        if batch_size >= MIN_PLANNED_BATCH_SIZE:
+            return n_workers, batch_size
+
+    batch_size = largest_batch(1)
+    if batch_size < 1:
+        print('A {:.0f}MB memory budget is below the estimated footprint of 1 image batches, '
+              'using batches of 1 image'.format(max_mb))
+
+    return 1, max(batch_size, 1)
+
+
+class MemoryGuard(object):
+    """
+    Batch size of the next batch (call it). With a footprint, a batch is
+    halved before it starts while its estimated peak (fixed_footprint() +
+    batch images) is above HIGH_WATER_FRACTION of the budget, the per-image
+    estimate growing with the peaks update() sees. update() also halves the
+    following batches whenever the memory used got above it. Also keeps the
+    peak memory seen.
+    """
+
+    def __init__(self, max_mb, batch_size, footprint=None, n_workers=1,
+                 reserved_mb=0.0):
+        self.max_mb = max_mb
+        self.batch_size = batch_size
+        self.n_workers = n_workers
+        self.fixed_mb = 0.0
+        self.per_image_mb = 0.0
+        if footprint is not None:
+            self.fixed_mb = fixed_footprint(footprint, n_workers, reserved_mb)
+            self.per_image_mb = footprint['per_image']
+        self.peak_mb = 0.0
+        self.n_shrinks = 0
+
+    def __call__(self):
+        while self.batch_size > 1 and self.estimate(self.batch_size) > self.max_mb * HIGH_WATER_FRACTION:
+            self.shrink()
+        return self.batch_size
+
+    def estimate(self, batch_size):
+        """
+        Returns the estimated peak memory (MB) when every worker runs a batch
+        of batch_size images.
+        """
+        return self.fixed_mb + self.n_workers * batch_size * self.per_image_mb
+
+    def shrink(self):
+        self.batch_size = max(1, self.batch_size // 2)
+        self.n_shrinks += 1
+
+    def update(self, used_mb):
+        """
+        Records the memory used (MB) by the classifying processes after a
+        batch & shrinks the following batches if it's too close to the budget.
+        """
+        self.peak_mb = max(self.peak_mb, used_mb)
+        # the images of the batch took at least what the fixed footprint
+        # doesn't explain (the batch may have been larger than the current
+        # batch size, which overestimates them)
+        if self.fixed_mb:
+            self.per_image_mb = max(self.per_image_mb, (used_mb - self.fixed_mb) / (
+                self.n_workers * self.batch_size))
+        if used_mb > self.max_mb * HIGH_WATER_FRACTION and self.batch_size > 1:
+            self.shrink()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/pareto_bench.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Accuracy vs throughput benchmark of the optimization modes of
+#          check_images.py. Every combination of arch, batch size, precision,
+#          resolution & decode mode is run on the same images, each in its
+#          own process so its peak RSS can be measured, recording images/sec,
+#          peak RSS and the results stats percentages. The configurations on
+#          the Pareto frontier (no other one is at least as fast, as accurate
+#          and as small, and better at one of them) are marked.
+#          Configurations meant to be exact (fp32, full resolution & decode,
+#          any batch size) are checked against a golden results file of the
+#          arch (check_images.py --results-file, e.g. from
+#          run_models_batch.sh): any changed prediction is reported.
+#
+#   Example call:
+#    python pareto_bench.py --dir test_data/pet_images/ --archs resnet vgg
+#           --batch-sizes 1 8 --output pareto.jsonl
+##
+
+# Imports python modules
+import argparse
+import itertools
+import json
+import os
+import tempfile
+from os.path import exists
+from time import time
+
+# Imports the child process runner measuring peak RSS
+from bench_startup import run_command
+from classifier import FULL_RESOLUTION, RESOLUTION_ARCHS, PRECISIONS, DECODE_MODES
+from classifier_daemon import DAEMON_SOCKET_ENV
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark every optimization mode & report the Pareto frontier")
+    parser.add_argument('--dir', type=str, default='test_data/pet_images/',
+                        help="Path to images files directory(default - test_data/pet_images/)")
+    parser.add_argument('--dogfile', type=str, default='dognames.txt',
+                        help='Text file that contains all labels associated to dogs(default -"dognames.txt")')
+    parser.add_argument('--archs', type=str, nargs='+', default=['resnet', 'alexnet', 'vgg'],
+                        help='CNN model architectures(default - resnet alexnet vgg)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8],
+                        help='Batch sizes(default - 1 8)')
+    parser.add_argument('--precisions', type=str, nargs='+', default=list(PRECISIONS),
+                        choices=PRECISIONS,
+                        help='Precisions(default - fp32 bf16)')
+    parser.add_argument('--resolutions', type=int, nargs='+', default=[160, FULL_RESOLUTION],
+                        help='Resolutions, only the full resolution is run for archs other than {}(default - 160 224)'.format(
+                            ', '.join(RESOLUTION_ARCHS)))
+    parser.add_argument('--decodes', type=str, nargs='+', default=list(DECODE_MODES),
+                        choices=DECODE_MODES,
+                        help='Decode modes(default - full draft)')
+    parser.add_argument('--metric', type=str, default='pct_correct_breed',
+                        help='Results stat used as the accuracy of a configuration(default - pct_correct_breed)')
+    parser.add_argument('--golden', type=str, default='{arch}.jsonl',
+                        help='Golden results file of each arch, {arch} is replaced by the arch(default - {arch}.jsonl)')
+    parser.add_argument('--write-golden', action='store_true',
+                        help='Write the missing golden files from the first exact configuration of their arch')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Append the results as a JSON line to this file')
+    in_arg = parser.parse_args()
+
+    configs = grid_configs(in_arg.archs, in_arg.batch_sizes, in_arg.precisions,
+                           in_arg.resolutions, in_arg.decodes)
+    results = []
+    for config in configs:
+        result = run_config(config, in_arg.dir, in_arg.dogfile)
+        golden_file = in_arg.golden.format(arch=config['arch'])
+        if is_exact(config):
+            if exists(golden_file):
+                result['n_changed'] = count_changed(result['predictions'], golden_file)
+            elif in_arg.write_golden:
+                write_golden(golden_file, result['predictions'])
+                result['n_changed'] = 0
+        del result['predictions']
+        results.append(result)
+        print('{arch:>8} batch {batch_size:>3} {precision:>5} {resolution:>4}px '
+              '{decode:>5}: {images_per_sec:8.2f} images/sec'.format(**result))
+
+    frontier = pareto_frontier(results, in_arg.metric)
+    print_table(results, frontier, in_arg.metric)
+
+    if in_arg.output:
+        with open(in_arg.output, 'a') as output_file:
+            output_file.write(json.dumps({'time': time(), 'dir': in_arg.dir,
+                                          'metric': in_arg.metric,
+                                          'results': results,
+                                          'pareto': sorted(frontier)}) + '\n')
+
+
+def grid_configs(archs, batch_sizes, precisions, resolutions, decodes):
+    """
+    Returns every valid combination of the modes as a list of dictionaries
+    with keys 'arch', 'batch_size', 'precision', 'resolution' and 'decode'
+    (reduced resolutions are only run for RESOLUTION_ARCHS).
+    """
+    configs = []
+    for arch, batch_size, precision, resolution, decode in itertools.product(
+            archs, batch_sizes, precisions, resolutions, decodes):
+        if resolution != FULL_RESOLUTION and arch not in RESOLUTION_ARCHS:
+            continue
+        configs.append({'arch': arch, 'batch_size': batch_size, 'precision': precision,
+                        'resolution': resolution, 'decode': decode})
+
+    return configs
+
+
+def is_exact(config):
+    """
+    Returns True if a configuration must predict exactly like the fp32 full
+    resolution baseline (batching doesn't change predictions).
+    """
+    return (config['precision'] == 'fp32' and config['resolution'] == FULL_RESOLUTION
+            and config['decode'] == 'full')
+
+
+def run_config(config, images_dir, dogsfile):
+    """
+    Runs check_images.py with a configuration in a child process.
+    Parameters:
+     config - Dictionary returned in the grid_configs() list
+     images_dir - The (full) path to the folder of images (string)
+     dogsfile - text file with one dog name per line (string)
+    Returns:
+     result - config updated with 'images_per_sec', 'max_rss_mb', 'secs'
+              (wall time of the whole process), the results stats
+              percentages and 'predictions' (Dictionary with key as image
+              filename and value as classifier label)
+    """
+    results_fd, results_file = tempfile.mkstemp(suffix='.jsonl')
+    os.close(results_fd)
+    # the model must run in the measured process, not in a daemon
+    env = dict(os.environ)
+    env.pop(DAEMON_SOCKET_ENV, None)
+    try:
+        secs, max_rss_mb, _ = run_command([
+            'check_images.py', '--dir', images_dir, '--dogfile', dogsfile,
+            '--arch', config['arch'], '--batch-size', str(config['batch_size']),
+            '--precision', config['precision'], '--resolution', str(config['resolution']),
+            '--decode', config['decode'], '--results-file', results_file,
+            '--no-checks', '--no-checkpoint', '--no-labels'], env=env)
+        predictions, stats = read_results_file(results_file)
+    finally:
+        os.remove(results_file)
+
+    if not stats:
+        print('check_images.py failed for {}'.format(config))
+
+    result = dict(config, secs=round(secs, 2), max_rss_mb=round(max_rss_mb, 1),
+                  failed=not stats,
+                  images_per_sec=stats.get('images_per_sec', 0.0),
+                  precision_used=stats.get('precision', config['precision']),
+                  predictions=predictions)
+    result.update((stat, value) for stat, value in stats.items() if stat[:3] == 'pct')
+
+    return result
+
+
+def read_results_file(results_file):
+    """
+    Reads a jsonl file written by check_images.py --results-file.
+    Returns:
+     predictions - Dictionary with key as image filename and value as
+                   classifier label
+     stats - Dictionary of the stats record
+    """
+    predictions = {}
+    stats = {}
+    with open(results_file) as results:
+        for line in results:
+            record = json.loads(line)
+            if 'stats' in record:
+                stats = record['stats']
+            else:
+                predictions[record['filename']] = record['classifier_label']
+
+    return predictions, stats
+
+
+def count_changed(predictions, golden_file):
+    """
+    Returns the number of images whose prediction differs from (or is
+    missing in) the golden results file.
+    """
+    golden_predictions, _ = read_results_file(golden_file)
+
+    return sum(golden_predictions.get(img_name) != label
+               for img_name, label in predictions.items())
+
+
+def write_golden(golden_file, predictions):
+    """
+    Writes predictions as a golden results file (records only).
+    """
+    with open(golden_file, 'w') as golden:
+        for img_name, label in predictions.items():
+            golden.write(json.dumps({'filename': img_name,
+                                     'classifier_label': label}) + '\n')
+
+
+def pareto_frontier(results, metric):
+    """
+    Finds the results no other result dominates: at least as fast, as
+    accurate (metric) and as small (peak RSS), and strictly better at one.
+    Failed runs are left out.
+    Returns:
+     frontier - set of the indexes of the frontier results in results
+    """
+    # a failed run can't dominate the others either
+    objectives = {idx: (result['images_per_sec'], result.get(metric, 0.0), -result['max_rss_mb'])
+                  for idx, result in enumerate(results) if not result['failed']}
+
+    return {idx for idx, objective in objectives.items()
+            if not any(all(other_value >= value for other_value, value in zip(other, objective))
+                       and other != objective
+                       for other in objectives.values())}
+
+
+def print_table(results, frontier, metric):
+    """
+    Prints every result, the Pareto frontier ones marked with a *.
+    """
+    print('\n*** Accuracy vs throughput ({}) ***'.format(metric))
+    print('{:1} {:>8} {:>5} {:>9} {:>5} {:>6} {:>11} {:>10} {:>9} {:>12} {:>9} {:>8}'.format(
+        '', 'Arch', 'Batch', 'Precision', 'Res', 'Decode', 'Images/sec', 'Peak RSS',
+        'Pct Dogs', 'Pct Not Dogs', 'Pct Breed', 'Changed'))
+    for idx, result in enumerate(results):
+        changed = result.get('n_changed')
+        print('{:1} {:>8} {:>5d} {:>9} {:>5d} {:>6} {:>11.2f} {:>8.1f}MB {:>8.1f}% {:>11.1f}% '
+              '{:>8.1f}% {:>8}'.format(
+                  '*' if idx in frontier else '', result['arch'], result['batch_size'],
+                  result['precision_used'], result['resolution'], result['decode'],
+                  result['images_per_sec'], result['max_rss_mb'],
+                  result.get('pct_correct_dogs', 0.0), result.get('pct_correct_notdogs', 0.0),
+                  result.get('pct_correct_breed', 0.0), '-' if changed is None else changed))
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
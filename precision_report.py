@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/precision_report.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Reports what reduced precision inference (check_images.py
+#          --precision bf16) buys & costs for a model: the images/sec of fp32
+#          and bf16 runs over the same images, the images whose top-1
+#          prediction changed between them, and how both compare with the
+#          fp32 baseline report of the arch (vgg.txt, resnet.txt,
+#          alexnet.txt written by run_models_batch.sh). The baseline reports
+#          don't include filenames, so they are compared as multisets of
+#          (pet label, classifier label) pairs.
+#
+#   Example call:
+#    python precision_report.py --dir test_data/pet_images/ --arch vgg
+##
+
+# Imports python modules
+import argparse
+import re
+from collections import Counter
+from itertools import islice
+
+# Imports the check_images.py pipeline functions
+from check_images import get_pet_labels, classify_images, image_files
+from classifier import classifier_batch, load_model, resolve_precision
+
+# "Real: <pet label>   Classifier: <classifier label>" lines of the reports
+PAIR_PATTERN = re.compile(r'^Real:\s+(.*?)\s+Classifier:\s+(.*?)(\s{2,}|\s*$)')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare bf16 with fp32 inference: throughput & top-1 changes")
+    parser.add_argument('--dir', type=str, default='test_data/pet_images/',
+                        help="Path to images files directory(default - test_data/pet_images/)")
+    parser.add_argument('--arch', type=str, default='vgg',
+                        help='CNN model architecture(default - vgg)')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='fp32 report written by run_models_batch.sh(default - <arch>.txt)')
+    parser.add_argument('--batch-size', type=int, default=8,
+                        help='Number of images per forward pass(default - 8)')
+    in_arg = parser.parse_args()
+
+    report = precision_report(in_arg.dir, in_arg.arch,
+                              in_arg.baseline or '{}.txt'.format(in_arg.arch),
+                              in_arg.batch_size)
+
+    print('\n*** bf16 vs fp32 for CNN model architecture {} ***'.format(
+        in_arg.arch.upper()))
+    if report['precision'] != 'bf16':
+        print('bf16 is not supported here, both runs used fp32')
+    print('{:>30}: {:8.2f}'.format('fp32 images/sec', report['fp32_images_per_sec']))
+    print('{:>30}: {:8.2f}'.format('bf16 images/sec', report['bf16_images_per_sec']))
+    print('{:>30}: {:8.2f}x'.format('Speedup', report['speedup']))
+    print('{:>30}: {:d} of {:d}'.format('Top-1 changed vs fp32 run',
+                                        len(report['changed']), report['n_images']))
+    for img_name, (fp32_label, bf16_label) in sorted(report['changed'].items()):
+        print('{:>30}  {} -> {}'.format(img_name, fp32_label, bf16_label))
+    for precision in ('fp32', 'bf16'):
+        print('{:>30}: {}'.format('{} pairs not in baseline'.format(precision),
+                                  report['{}_baseline_diff'.format(precision)]))
+
+
+def load_baseline_pairs(report_path):
+    """
+    Reads the (pet label, classifier label) pairs of the first results
+    listing of a check_images.py report.
+    Parameters:
+     report_path - report written by run_models_batch.sh (string)
+    Returns:
+     pairs - Counter of (pet label, classifier label) tuples
+    """
+    pairs = Counter()
+    with open(report_path) as report_file:
+        for line in report_file:
+            # the listing is printed again with the is-a-dog flags
+            if line.startswith('# Total Images'):
+                break
+            pair_match = PAIR_PATTERN.match(line)
+            if pair_match:
+                pairs[pair_match.group(1), pair_match.group(2)] += 1
+
+    return pairs
+
+
+def precision_report(images_dir, arch, baseline_file, batch_size=8):
+    """
+    Classifies the images at fp32 then bf16 & compares the predictions. Each
+    precision is warmed up with an untimed batch first, so the fp32 run
+    doesn't pay for the thread pools & kernels initialization alone.
+    Parameters:
+     images_dir - The (full) path to the folder of images (string)
+     arch - model architecture, one of: resnet alexnet vgg (string)
+     baseline_file - fp32 report of arch written by run_models_batch.sh
+                     (string)
+     batch_size - number of images per forward pass (int)
+    Returns:
+     report - Dictionary with 'precision' (what bf16 resolved to), 'n_images',
+              '<precision>_images_per_sec', 'speedup', 'changed' (Dictionary
+              with key as image filename and value as its (fp32 label, bf16
+              label)) and '<precision>_baseline_diff' (number of pairs of
+              each run missing from the baseline)
+    """
+    petlabel_dic = get_pet_labels(images_dir)
+    baseline_pairs = load_baseline_pairs(baseline_file)
+    # model loading isn't part of either run's time
+    load_model(arch)
+
+    report = {'precision': resolve_precision('bf16'), 'n_images': len(petlabel_dic)}
+    warmup_files = [img_file for _, img_file in
+                    islice(image_files(images_dir, petlabel_dic), batch_size)]
+    for precision in ('fp32', report['precision']):
+        classifier_batch(warmup_files, arch, precision=precision)
+    results = {}
+    for name, precision in (('fp32', 'fp32'), ('bf16', report['precision'])):
+        run_stats = {}
+        results[name] = classify_images(images_dir, petlabel_dic, arch,
+                                        batch_size=batch_size,
+                                        precision=precision,
+                                        run_stats=run_stats)
+        report['{}_images_per_sec'.format(name)] = run_stats['images_per_sec']
+        run_pairs = Counter((image_result[0], image_result[1])
+                            for image_result in results[name].values())
+        report['{}_baseline_diff'.format(name)] = sum((run_pairs - baseline_pairs).values())
+
+    report['speedup'] = report['bf16_images_per_sec'] / report['fp32_images_per_sec']
+    report['changed'] = {img_name: (results['fp32'][img_name][1], results['bf16'][img_name][1])
+                         for img_name in petlabel_dic
+                         if results['fp32'][img_name][1] != results['bf16'][img_name][1]}
+
+    return report
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/rescore.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Re-scores stored model outputs without running (or even loading)
+#          any model. check_images.py --save-topk stores the top-k ImageNet
+#          class ids & logits of every image; this program recomputes the
+#          results_dic flags (match, pet is-a-dog, classifier is-a-dog) and
+#          the calculates_results_stats() statistics from them with a new
+#          dognames file or match rule, using numpy over all images at once.
+#          Each distinct (pet label, class) pair is matched only once.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python rescore.py --topk-file <file saved by check_images.py>
+#             --dogfile <file that contains dognames> --match-rule <rule>
+#   Example call:
+#    python rescore.py --topk-file vgg_topk.npz --dogfile dognames.txt
+##
+
+# Imports python modules
+import argparse
+import ast
+import sys
+
+# Imports numpy for vectorized re-scoring
+import numpy as np
+
+# Imports the label matching of the words match rule
+from check_images import check_match
+
+# match rules between a pet label and a (lowercase) classifier label
+MATCH_RULES = ('words', 'substring', 'exact')
+
+
+def main():
+    in_arg = get_input_args()
+
+    topk_data = load_topk(in_arg.topk_file)
+    try:
+        flags = rescore(topk_data, in_arg.dogfile, in_arg.match_rule,
+                        in_arg.topk_match)
+    except ValueError as error:
+        sys.exit('rescore.py: error: {}'.format(error))
+    results_stats = calculates_results_stats_vectorized(flags)
+
+    print('*** Re-scored {} images of model architecture {} ***'.format(
+        len(topk_data['filenames']), str(topk_data['arch']).upper()))
+    for stat, value in results_stats.items():
+        if stat[0] == 'n':
+            print('{:>20}: {:3d}'.format(stat, value))
+    for stat, value in results_stats.items():
+        if stat[:3] == 'pct':
+            print('{:>20}: {:5.1f}%'.format(stat, value))
+
+    if in_arg.results_file:
+        # Imports structured results writers (only needed here)
+        from results_writer import open_results_writer
+        with open_results_writer(in_arg.results_file) as results_writer:
+            for idx, img_name in enumerate(topk_data['filenames']):
+                results_writer.write_record(img_name, [
+                    topk_data['pet_labels'][idx], flags['classifier_labels'][idx],
+                    int(flags['match'][idx]), int(flags['pet_is_dog'][idx]),
+                    int(flags['classifier_is_dog'][idx])])
+            results_writer.write_stats(results_stats)
+
+
+def get_input_args():
+    """
+    Retrieves and parses the command line arguments of rescore.py.
+    Parameters:
+     None - simply using argparse module to create & store command line arguments
+    Returns:
+     parse_args() -data structure that stores the command line arguments object
+    """
+    parser = argparse.ArgumentParser(
+        description="Re-score stored model outputs without running the model")
+    parser.add_argument('--topk-file', type=str, required=True,
+                        help='File saved by check_images.py --save-topk')
+    parser.add_argument('--dogfile', type=str, default='dognames.txt',
+                        help='Text file that contains all labels associated to dogs(default -"dognames.txt")')
+    parser.add_argument('--match-rule', type=str, default='words',
+                        choices=MATCH_RULES,
+                        help='words: check_images.check_match(), substring: pet label found in the classifier label, exact: pet label equals one of the classifier label names(default - words)')
+    parser.add_argument('--topk-match', type=int, default=1,
+                        help='Count a match if any of the best N classes matches the pet label(default - 1)')
+    parser.add_argument('--results-file', type=str, default=None,
+                        help='Write the re-scored records & stats to this file (jsonl, csv or npz)')
+
+    return parser.parse_args()
+
+
+def save_topk(path, arch, img_names, pet_labels, topk_idx, topk_logits):
+    """
+    Saves the top-k outputs of a run to a compact .npz file: class ids are
+    stored as int16 and logits as float16.
+    Parameters:
+     path - path of the .npz file (string)
+     arch - model architecture the outputs come from (string)
+     img_names - image filenames (list)
+     pet_labels - pet image labels, same order as img_names (list)
+     topk_idx - top-k class ids of each image, best first (list of lists)
+     topk_logits - logits of the topk_idx classes (list of lists)
+    Returns:
+     None
+    """
+    np.savez_compressed(path, arch=np.array(arch),
+                        filenames=np.array(img_names, dtype=str),
+                        pet_labels=np.array(pet_labels, dtype=str),
+                        topk_idx=np.array(topk_idx, dtype=np.int16),
+                        topk_logits=np.array(topk_logits, dtype=np.float16))
+
+
+def load_topk(path):
+    """
+    Loads a file saved by save_topk().
+    Returns:
+     topk_data - Dictionary with keys 'arch', 'filenames', 'pet_labels',
+                 'topk_idx' and 'topk_logits'
+    """
+    with np.load(path) as npz_file:
+        return {key: npz_file[key] for key in npz_file.files}
+
+
+def load_class_labels(classes_file='imagenet1000_clsid_to_human.txt'):
+    """
+    Returns the lowercase ImageNet labels as a numpy array indexed by class id
+    (classifier.py is not imported so no model is built).
+    """
+    with open(classes_file) as imagenet_classes_file:
+        classes_dict = ast.literal_eval(imagenet_classes_file.read())
+
+    return np.array([classes_dict[class_id].lower()
+                     for class_id in range(len(classes_dict))])
+
+
+def label_matches(classification, label, match_rule):
+    """
+    Returns 1 if the pet label matches the classifier label under match_rule
+    (one of MATCH_RULES), else 0.
+    """
+    if match_rule == 'words':
+        return check_match(classification, label)
+    if match_rule == 'substring':
+        return int(label in classification)
+
+    return int(label in classification.split(', '))
+
+
+def rescore(topk_data, dogsfile, match_rule='words', topk_match=1):
+    """
+    Recomputes the results_dic flags of every image from stored outputs.
+    Parameters:
+     topk_data - Dictionary returned by load_topk()
+     dogsfile - text file with one dog name per line (string)
+     match_rule - one of MATCH_RULES (string)
+     topk_match - a match with any of the best topk_match classes counts as
+                  a match, raises ValueError if more classes than saved per
+                  image (int)
+    Returns:
+     flags - Dictionary of numpy arrays, one value per image:
+             'classifier_labels' (best class label), 'match', 'pet_is_dog'
+             and 'classifier_is_dog' (int8 1/0)
+    """
+    saved_k = topk_data['topk_idx'].shape[1]
+    if not 1 <= topk_match <= saved_k:
+        raise ValueError('can\'t match the best {} classes, {} classes were saved per '
+                         'image'.format(topk_match, saved_k))
+
+    class_labels = load_class_labels()
+    with open(dogsfile) as dogs_file:
+        dognames = [line.rstrip() for line in dogs_file]
+
+    topk_idx = topk_data['topk_idx'].astype(np.int64)[:, :topk_match]
+    pet_label_names, pet_label_ids = np.unique(topk_data['pet_labels'],
+                                               return_inverse=True)
+    n_classes = len(class_labels)
+
+    # match each distinct (pet label, class) pair once & broadcast back
+    pair_codes = pet_label_ids.reshape(-1, 1) * n_classes + topk_idx
+    unique_codes, pair_ids = np.unique(pair_codes, return_inverse=True)
+    unique_matches = np.array(
+        [label_matches(class_labels[code % n_classes],
+                       pet_label_names[code // n_classes], match_rule)
+         for code in unique_codes], dtype=np.int8)
+    match = unique_matches[pair_ids.reshape(pair_codes.shape)].max(axis=1)
+
+    pet_is_dog = np.isin(pet_label_names, dognames).astype(np.int8)[pet_label_ids]
+    class_is_dog = np.isin(class_labels, dognames).astype(np.int8)
+
+    return {'classifier_labels': class_labels[topk_idx[:, 0]],
+            'match': match,
+            'pet_is_dog': pet_is_dog,
+            'classifier_is_dog': class_is_dog[topk_idx[:, 0]]}
+
+
+def calculates_results_stats_vectorized(flags):
+    """
+    Same statistics as check_images.calculates_results_stats(), computed from
+    the flag arrays returned by rescore().
+    """
+    match = flags['match'].astype(bool)
+    pet_is_dog = flags['pet_is_dog'].astype(bool)
+    classifier_is_dog = flags['classifier_is_dog'].astype(bool)
+
+    n_images = len(match)
+    n_dogs = int(pet_is_dog.sum())
+    n_notdogs = n_images - n_dogs
+    n_correct_dogs = int((pet_is_dog & classifier_is_dog).sum())
+    n_correct_breeds = int((pet_is_dog & classifier_is_dog & match).sum())
+    n_correct_notdogs = int((~pet_is_dog & ~classifier_is_dog).sum())
+
+    results_stats = {'n_images': n_images, 'n_dogs_img': n_dogs,
+                     'n_notdogs_img': n_notdogs, 'pct_correct_dogs': 0.0,
+                     'pct_correct_notdogs': 0.0, 'pct_correct_breed': 0.0}
+    if n_dogs:
+        results_stats['pct_correct_dogs'] = round(n_correct_dogs / n_dogs * 100, 1)
+        results_stats['pct_correct_breed'] = round(n_correct_breeds / n_dogs * 100, 1)
+    if n_notdogs:
+        results_stats['pct_correct_notdogs'] = round(n_correct_notdogs / n_notdogs * 100, 1)
+    if n_images:
+        results_stats['pct_matches'] = round(int(match.sum()) / n_images * 100, 1)
+
+    return results_stats
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
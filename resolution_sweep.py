@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/resolution_sweep.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Classifies the same images at several input resolutions and
+#          reports the throughput next to the accuracy statistics at each
+#          resolution, to pick the speed/accuracy point of high volume runs.
+#          FLOPs drop roughly with the square of the resolution.
+#
+#   Example call:
+#    python resolution_sweep.py --dir test_data/pet_images/ --arch resnet
+#           --resolutions 128 160 192 224
+##
+
+# Imports python modules
+import argparse
+from itertools import islice
+
+# Imports the check_images.py pipeline functions
+from check_images import (get_pet_labels, classify_images, adjust_results4_isadog,
+                          calculates_results_stats, image_files)
+from classifier import (classifier_batch, load_model, FULL_RESOLUTION, MIN_RESOLUTION,
+                        RESOLUTION_ARCHS)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report throughput & accuracy at several input resolutions")
+    parser.add_argument('--dir', type=str, default='test_data/pet_images/',
+                        help="Path to images files directory(default - test_data/pet_images/)")
+    parser.add_argument('--arch', type=str, default='resnet',
+                        choices=RESOLUTION_ARCHS,
+                        help='CNN model architecture(default - resnet)')
+    parser.add_argument('--dogfile', type=str, default='dognames.txt',
+                        help='Text file that contains all labels associated to dogs(default -"dognames.txt")')
+    parser.add_argument('--resolutions', type=int, nargs='+',
+                        default=[128, 160, 192, FULL_RESOLUTION],
+                        help='Resolutions to sweep, {} to {}(default - 128 160 192 224)'.format(
+                            MIN_RESOLUTION, FULL_RESOLUTION))
+    parser.add_argument('--batch-size', type=int, default=8,
+                        help='Number of images per forward pass(default - 8)')
+    in_arg = parser.parse_args()
+    if not all(MIN_RESOLUTION <= resolution <= FULL_RESOLUTION
+               for resolution in in_arg.resolutions):
+        parser.error('--resolutions must be between {} and {}'.format(
+            MIN_RESOLUTION, FULL_RESOLUTION))
+    if in_arg.batch_size < 1:
+        parser.error('--batch-size must be positive')
+
+    sweep = resolution_sweep(in_arg.dir, in_arg.arch, in_arg.dogfile,
+                             in_arg.resolutions, in_arg.batch_size)
+
+    print('\n*** Resolution sweep for CNN model architecture {} ***'.format(
+        in_arg.arch.upper()))
+    print('{:>10} {:>14} {:>12} {:>15} {:>13}'.format(
+        'Resolution', 'Images/sec', 'Pct Dogs', 'Pct Not Dogs', 'Pct Breed'))
+    for resolution, images_per_sec, results_stats in sweep:
+        print('{:>10d} {:>14.2f} {:>11.1f}% {:>14.1f}% {:>12.1f}%'.format(
+            resolution, images_per_sec, results_stats['pct_correct_dogs'],
+            results_stats['pct_correct_notdogs'],
+            results_stats['pct_correct_breed']))
+
+
+def resolution_sweep(images_dir, arch, dogsfile, resolutions, batch_size=8):
+    """
+    Runs the classification pipeline once per resolution, after an untimed
+    warm-up batch at that resolution (so the first one doesn't pay for the
+    thread pools & kernels initialization).
+    Parameters:
+     images_dir - The (full) path to the folder of images (string)
+     arch - model architecture, one of RESOLUTION_ARCHS (string)
+     dogsfile - text file with one dog name per line (string)
+     resolutions - input resolutions to run (list of int)
+     batch_size - number of images per forward pass (int)
+    Returns:
+     sweep - list of (resolution, images/sec, results_stats) tuples
+    """
+    petlabel_dic = get_pet_labels(images_dir)
+    # model loading isn't part of any resolution's time
+    load_model(arch)
+
+    warmup_files = [img_file for _, img_file in
+                    islice(image_files(images_dir, petlabel_dic), batch_size)]
+    sweep = []
+    for resolution in resolutions:
+        classifier_batch(warmup_files, arch, resolution=resolution)
+        run_stats = {}
+        results_dic = classify_images(images_dir, petlabel_dic, arch,
+                                      batch_size=batch_size,
+                                      resolution=resolution,
+                                      run_stats=run_stats)
+        adjust_results4_isadog(results_dic, dogsfile)
+        sweep.append((resolution, run_stats['images_per_sec'],
+                      calculates_results_stats(results_dic)))
+
+    return sweep
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/results_writer.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Writes the results of a run as structured records (one per image,
+#          followed by one stats record) instead of scraping the printed
+#          report. Records are buffered and written in batches (or as soon
+#          as sync() is called, so the records of each classified batch
+#          survive a crash of the run) to one of:
+#            jsonl - one JSON object per line, the last line is
+#                    {"stats": {...}}
+#            csv   - one row per image, stats in <path>.stats.json
+#            npz   - compact binary columnar file: each batch of records is
+#                    a row group stored as one .npy array per column, stats
+#                    in the stats.json member. Read it back with
+#                    read_results(). A zip can't be read before it's closed,
+#                    so sync() doesn't cut row groups short.
+#
+#   Example usage:
+#    with open_results_writer('vgg.jsonl') as writer:
+#        for img_name, img_result in results_dic.items():
+#            writer.write_record(img_name, img_result)
+#        writer.write_stats(results_stats)
+##
+
+# Imports python modules
+import csv
+import json
+import zipfile
+
+# record fields, in results_dic index order after the filename
+FIELDS = ['filename', 'pet_label', 'classifier_label', 'match',
+          'pet_is_dog', 'classifier_is_dog']
+RESULTS_FORMATS = ('jsonl', 'csv', 'npz')
+
+
+def result_record(img_name, img_result):
+    """
+    Converts a results_dic item into a record dictionary with FIELDS keys.
+    The is-a-dog flags are None when adjust_results4_isadog() wasn't run.
+    """
+    values = [img_name] + list(img_result[:5])
+    values += [None] * (len(FIELDS) - len(values))
+
+    return dict(zip(FIELDS, values))
+
+
+def open_results_writer(path, results_format=None, batch_size=1024):
+    """
+    Creates the results writer for path.
+    Parameters:
+     path - path of the results file (string)
+     results_format - one of RESULTS_FORMATS, guessed from the path extension
+                      when None (string)
+     batch_size - number of records buffered before being written (int)
+    Returns:
+     writer - ResultsWriter subclass instance, to be closed after use (it's
+              also a context manager)
+    """
+    if results_format is None:
+        results_format = path.rsplit('.', 1)[-1].lower()
+    if results_format not in RESULTS_FORMATS:
+        raise ValueError('Unknown results format {} (expected one of: {})'.format(
+            results_format, ', '.join(RESULTS_FORMATS)))
+
+    writer_classes = {'jsonl': JsonlResultsWriter, 'csv': CsvResultsWriter,
+                      'npz': ColumnarResultsWriter}
+
+    return writer_classes[results_format](path, batch_size)
+
+
+class ResultsWriter(object):
+    """
+    Buffers records and hands them to flush_records() batch_size at a time.
+    Subclasses implement flush_records() and write_stats().
+    """
+
+    def __init__(self, path, batch_size):
+        self.path = path
+        self.batch_size = batch_size
+        self.records = []
+        self.n_records = 0
+
+    def write_record(self, img_name, img_result):
+        self.records.append(result_record(img_name, img_result))
+        self.n_records += 1
+        if len(self.records) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.records:
+            self.flush_records(self.records)
+            self.records = []
+
+    def sync(self):
+        """
+        Writes the buffered records out to the file.
+        """
+        self.flush()
+
+    def flush_records(self, records):
+        raise NotImplementedError
+
+    def write_stats(self, stats):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonlResultsWriter(ResultsWriter):
+
+    def __init__(self, path, batch_size):
+        super(JsonlResultsWriter, self).__init__(path, batch_size)
+        self.results_file = open(path, 'w')
+
+    def flush_records(self, records):
+        self.results_file.write(''.join(json.dumps(record) + '\n'
+                                        for record in records))
+
+    def sync(self):
+        super(JsonlResultsWriter, self).sync()
+        self.results_file.flush()
+
+    def write_stats(self, stats):
+        self.flush()
+        self.results_file.write(json.dumps({'stats': stats}) + '\n')
+
+    def close(self):
+        super(JsonlResultsWriter, self).close()
+        self.results_file.close()
+
+
+class CsvResultsWriter(ResultsWriter):
+
+    def __init__(self, path, batch_size):
+        super(CsvResultsWriter, self).__init__(path, batch_size)
+        self.results_file = open(path, 'w', newline='')
+        self.csv_writer = csv.DictWriter(self.results_file, FIELDS)
+        self.csv_writer.writeheader()
+
+    def flush_records(self, records):
+        self.csv_writer.writerows(records)
+
+    def sync(self):
+        super(CsvResultsWriter, self).sync()
+        self.results_file.flush()
+
+    def write_stats(self, stats):
+        with open(self.path + '.stats.json', 'w') as stats_file:
+            json.dump(stats, stats_file)
+
+    def close(self):
+        super(CsvResultsWriter, self).close()
+        self.results_file.close()
+
+
+class ColumnarResultsWriter(ResultsWriter):
+
+    def __init__(self, path, batch_size):
+        super(ColumnarResultsWriter, self).__init__(path, batch_size)
+        self.zip_file = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        self.n_row_groups = 0
+
+    def sync(self):
+        # row groups stay batch_size records, see the module header
+        pass
+
+    def flush_records(self, records):
+        # Imports numpy for the columnar format only (the text formats don't
+        # need it & it would slow down the start of every run)
+        import numpy as np
+
+        for field in FIELDS:
+            values = [record[field] for record in records]
+            if field in ('filename', 'pet_label', 'classifier_label'):
+                column = np.array(values, dtype=str)
+            else:
+                # -1 stands for a missing flag
+                column = np.array([-1 if value is None else value
+                                   for value in values], dtype=np.int8)
+            member_name = '{}.{:06d}.npy'.format(field, self.n_row_groups)
+            with self.zip_file.open(member_name, 'w') as member_file:
+                np.lib.format.write_array(member_file, column)
+        self.n_row_groups += 1
+
+    def write_stats(self, stats):
+        self.flush()
+        self.zip_file.writestr('stats.json', json.dumps(stats))
+
+    def close(self):
+        super(ColumnarResultsWriter, self).close()
+        self.zip_file.close()
+
+
+def read_results(path):
+    """
+    Reads a columnar (npz) results file written by ColumnarResultsWriter.
+    Parameters:
+     path - path of the results file (string)
+    Returns:
+     columns - Dictionary with FIELDS as keys and numpy arrays as values
+     stats - Dictionary of the stats record (empty if none was written)
+    """
+    import numpy as np
+
+    columns = {field: [] for field in FIELDS}
+    stats = {}
+    with zipfile.ZipFile(path) as zip_file:
+        # member names sort by field then row group
+        for member_name in sorted(zip_file.namelist()):
+            if member_name == 'stats.json':
+                stats = json.loads(zip_file.read(member_name).decode('utf-8'))
+                continue
+            with zip_file.open(member_name) as member_file:
+                columns[member_name.split('.')[0]].append(
+                    np.lib.format.read_array(member_file))
+
+    columns = {field: np.concatenate(arrays) if arrays else np.array([])
+               for field, arrays in columns.items()}
+
+    return columns, stats
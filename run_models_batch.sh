@@ -6,9 +6,11 @@
 # REVISED DATE: 02/27/2018  - reduce scope of program
 # PURPOSE: Runs all three models to test which provides 'best' solution.
 #          Please note output from each run has been piped into a text file.
+#          Structured results (one record per image + stats) are also
+#          written to <arch>.jsonl for downstream tooling.
 #
 # Usage: sh run_models_batch.sh    -- will run program from commandline
 #  
-python check_images.py --dir pet_images/ --arch resnet  --dogfile dognames.txt > resnet.txt
-python check_images.py --dir pet_images/ --arch alexnet --dogfile dognames.txt > alexnet.txt
-python check_images.py --dir pet_images/ --arch vgg  --dogfile dognames.txt > vgg.txt
+python check_images.py --dir pet_images/ --arch resnet  --dogfile dognames.txt --results-file resnet.jsonl > resnet.txt
+python check_images.py --dir pet_images/ --arch alexnet --dogfile dognames.txt --results-file alexnet.jsonl > alexnet.txt
+python check_images.py --dir pet_images/ --arch vgg  --dogfile dognames.txt --results-file vgg.jsonl > vgg.txt
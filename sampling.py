@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/sampling.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Estimates the results statistics of a large corpus from a sample
+#          (check_images.py --sample) instead of classifying every image.
+#          Images are put in a random order stratified by pet label (every
+#          prefix of it samples each label in proportion to its frequency),
+#          so the sample can be grown progressively. Each percentage gets a
+#          Wilson score confidence interval with a finite population
+#          correction, and the sample stops growing once every interval is
+#          narrower than the target width.
+#
+#   Example usage:
+#    order = stratified_order(petlabel_dic, seed=0)
+#    populations = stat_populations(petlabel_dic, dog_names)
+#    intervals = confidence_intervals(sampled_results_dic, populations)
+##
+
+# Imports python modules
+import random
+from math import sqrt
+from statistics import NormalDist
+
+
+def stratified_order(petlabel_dic, seed=None):
+    """
+    Orders the images so that any prefix is a stratified random sample: the
+    images of each pet label are shuffled & spread evenly over the order.
+    Parameters:
+     petlabel_dic - Dictionary with key as image filename and value as pet
+                    image label
+     seed - random seed, None for a different order every run (int)
+    Returns:
+     img_names - image filenames in sampling order (list)
+    """
+    rng = random.Random(seed)
+    label_images = {}
+    for img_name, label in petlabel_dic.items():
+        label_images.setdefault(label, []).append(img_name)
+
+    # the i-th of n images of a label is placed at a random point of the
+    # i-th 1/n of the order
+    keys = {}
+    for img_names in label_images.values():
+        rng.shuffle(img_names)
+        for rank, img_name in enumerate(img_names):
+            keys[img_name] = (rank + rng.random()) / len(img_names)
+
+    return sorted(keys, key=keys.get)
+
+
+def stat_populations(petlabel_dic, dog_names):
+    """
+    Counts the images of the corpus each calculates_results_stats()
+    percentage is computed over.
+    Parameters:
+     petlabel_dic - Dictionary with key as image filename and value as pet
+                    image label
+     dog_names - dog names of the dogfile (set)
+    Returns:
+     populations - Dictionary with key as percentage statistic name and value
+                   as a number of images
+    """
+    n_dogs = sum(label in dog_names for label in petlabel_dic.values())
+
+    return {'pct_correct_dogs': n_dogs,
+            'pct_correct_notdogs': len(petlabel_dic) - n_dogs,
+            'pct_correct_breed': n_dogs,
+            'pct_matches': len(petlabel_dic)}
+
+
+def stat_counts(results_dic):
+    """
+    Counts the successes & trials behind each calculates_results_stats()
+    percentage.
+    Parameters:
+      results_dic - Dictionary with key as image filename and value as a List
+                    adjusted by adjust_results4_isadog() (see
+                    check_images.calculates_results_stats())
+    Returns:
+     counts - Dictionary with key as percentage statistic name and value as a
+              (successes, trials) tuple
+    """
+    n_dogs = n_correct_dogs = n_correct_breeds = n_correct_notdogs = n_matches = 0
+    for image_data in results_dic.values():
+        n_matches += image_data[2]
+        if image_data[3]:
+            n_dogs += 1
+            if image_data[4]:
+                n_correct_dogs += 1
+                n_correct_breeds += image_data[2]
+        elif not image_data[4]:
+            n_correct_notdogs += 1
+    n_notdogs = len(results_dic) - n_dogs
+
+    return {'pct_correct_dogs': (n_correct_dogs, n_dogs),
+            'pct_correct_notdogs': (n_correct_notdogs, n_notdogs),
+            'pct_correct_breed': (n_correct_breeds, n_dogs),
+            'pct_matches': (n_matches, len(results_dic))}
+
+
+def proportion_interval(successes, n, population=None, confidence=0.95):
+    """
+    Wilson score interval of a proportion, in percent. With a population
+    size, the finite population correction shrinks it to 0 width when the
+    whole population is sampled.
+    Parameters:
+     successes - number of successes in the sample (int)
+     n - sample size, more than 0 (int)
+     population - size of the population sampled, None for infinite (int)
+     confidence - confidence level (float)
+    Returns:
+     low, high - interval bounds in percent (float)
+    """
+    p = successes / n
+    if population is not None and population > 1:
+        if n >= population:
+            return p * 100, p * 100
+        # effective sample size of sampling without replacement
+        n = n * (population - 1) / (population - n)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half_width = z * sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+
+    return max(center - half_width, 0.0) * 100, min(center + half_width, 1.0) * 100
+
+
+def confidence_intervals(results_dic, populations, confidence=0.95):
+    """
+    Computes the confidence interval of each percentage statistic.
+    Parameters:
+     results_dic - sampled results, adjusted by adjust_results4_isadog()
+     populations - Dictionary with key as percentage statistic name and value
+                   as the number of images of the corpus it is computed over
+     confidence - confidence level (float)
+    Returns:
+     intervals - Dictionary with key as percentage statistic name and value
+                 as a (pct, low, high) tuple, None when no image of the
+                 sample counts for the statistic yet
+    """
+    intervals = {}
+    for stat, (successes, n) in stat_counts(results_dic).items():
+        if n == 0:
+            intervals[stat] = None
+            continue
+        low, high = proportion_interval(successes, n, populations.get(stat), confidence)
+        intervals[stat] = (successes / n * 100, low, high)
+
+    return intervals
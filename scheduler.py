@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/scheduler.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Chooses how to split the cores of the machine between worker
+#          processes and torch intra-op threads (e.g. 8 processes x 4 threads
+#          or 1 process x 32 threads on 32 cores). Every layout is timed with
+#          a short calibration run for the model architecture, batch size,
+#          input resolution, precision & decode mode, workers are pinned to
+#          their own set of cores and the fastest layout is saved per machine
+#          so later runs reuse it.
+#
+#   Example call:
+#    python scheduler.py --dir pet_images/ --arch vgg --batch-size 8
+##
+
+# Imports python modules
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+from functools import partial
+from os import listdir
+from os.path import dirname, exists, expanduser, isfile, join
+from time import time
+
+# Imports model loading & worker pool classification
+from classifier import (classifier_batch, load_model, resolve_precision,
+                        FULL_RESOLUTION, PRECISIONS, DECODE_MODES)
+from worker_pool import classify_paths
+
+# tuned layouts of every machine, keyed by machine then
+# arch/batch size/resolution/precision/decode/cores
+CONFIG_PATH = join(expanduser('~'), '.cache', 'dog_neuralnet', 'scheduler.json')
+# min number of images timed per layout (images are repeated if needed)
+CALIBRATION_IMAGES = 32
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Calibrate the processes x threads layout for a model")
+    parser.add_argument('--dir', type=str, default='pet_images/',
+                        help="Path to the images used for calibration")
+    parser.add_argument('--arch', type=str, default='vgg',
+                        help='CNN model architecture to calibrate(default - vgg)')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Number of images per forward pass(default - 1)')
+    parser.add_argument('--resolution', type=int, default=FULL_RESOLUTION,
+                        help='Input resolution(default - {})'.format(FULL_RESOLUTION))
+    parser.add_argument('--precision', type=str, default='fp32', choices=PRECISIONS,
+                        help='Inference precision(default - fp32)')
+    parser.add_argument('--decode', type=str, default='full', choices=DECODE_MODES,
+                        help='JPEG decoding(default - full)')
+    parser.add_argument('--cores', type=int, default=None,
+                        help='Number of cores to split(default - all available)')
+    in_arg = parser.parse_args()
+
+    img_paths = [in_arg.dir + name for name in sorted(listdir(in_arg.dir))
+                 if isfile(in_arg.dir + name)]
+    layout = get_layout(in_arg.arch, in_arg.batch_size, img_paths,
+                        in_arg.cores, recalibrate=True,
+                        resolution=in_arg.resolution,
+                        precision=resolve_precision(in_arg.precision),
+                        decode=in_arg.decode)
+
+    for trial, images_per_sec in sorted(layout['trials'].items()):
+        print('{:>8}: {:7.2f} images/sec'.format(trial, images_per_sec))
+    print('Best layout: {} processes x {} threads ({:.2f} images/sec)'.format(
+        layout['workers'], layout['threads'], layout['images_per_sec']))
+
+
+def available_cores():
+    """
+    Returns the number of cores this process may run on.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+def machine_key():
+    """
+    Returns the key identifying this machine in the saved layouts.
+    """
+    return platform.node()
+
+
+def candidate_layouts(n_cores):
+    """
+    Returns all the (processes, threads) layouts using exactly n_cores.
+    """
+    return [(n_workers, n_cores // n_workers)
+            for n_workers in range(1, n_cores + 1) if n_cores % n_workers == 0]
+
+
+def _time_layout(conn, img_paths, arch, batch_size, n_workers, n_threads, classify_fn):
+    start_time = time()
+    classify_paths(img_paths, arch, n_workers, classify_fn=classify_fn,
+                   batch_size=batch_size, n_threads=n_threads, pin_cpus=True)
+    conn.send(len(img_paths) / (time() - start_time))
+    conn.close()
+
+
+def benchmark_layout(img_paths, arch, batch_size, n_workers, n_threads,
+                     classify_fn=classifier_batch):
+    """
+    Times the classification of img_paths with a layout (classifying with
+    classify_fn, see worker_pool.classify_pool()). Each trial runs in a
+    forked child process so that the torch thread pools started by a trial
+    don't leak into the next one, the weights loaded in this process are
+    still shared.
+    Returns:
+     images_per_sec - throughput of the layout, None if the trial died
+                      (float)
+    """
+    n_images = max(CALIBRATION_IMAGES, n_workers * batch_size * 2)
+    trial_paths = [img_paths[idx % len(img_paths)] for idx in range(n_images)]
+
+    ctx = multiprocessing.get_context('fork')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    trial = ctx.Process(target=_time_layout,
+                        args=(child_conn, trial_paths, arch, batch_size,
+                              n_workers, n_threads, classify_fn))
+    trial.start()
+    # only the child may keep the sending end open, so recv() sees EOF if the
+    # child dies before sending
+    child_conn.close()
+    try:
+        images_per_sec = parent_conn.recv()
+    except EOFError:
+        images_per_sec = None
+    finally:
+        parent_conn.close()
+        trial.join()
+    if images_per_sec is None:
+        print('Calibration of {} processes x {} threads failed (exit code {}), skipping it'.format(
+            n_workers, n_threads, trial.exitcode))
+
+    return images_per_sec
+
+
+def load_layouts():
+    """
+    Returns the saved layouts of this machine (empty dictionary if none).
+    """
+    if not exists(CONFIG_PATH):
+        return {}
+    with open(CONFIG_PATH) as config_file:
+        return json.load(config_file).get(machine_key(), {})
+
+
+def save_layout(layout_key, layout):
+    """
+    Saves the layout tuned for layout_key (see get_layout()) on this
+    machine.
+    """
+    config = {}
+    if exists(CONFIG_PATH):
+        with open(CONFIG_PATH) as config_file:
+            config = json.load(config_file)
+    config.setdefault(machine_key(), {})[layout_key] = layout
+
+    if not exists(dirname(CONFIG_PATH)):
+        os.makedirs(dirname(CONFIG_PATH))
+    with open(CONFIG_PATH, 'w') as config_file:
+        json.dump(config, config_file, indent=2, sort_keys=True)
+
+
+def get_layout(arch, batch_size, img_paths, n_cores=None, recalibrate=False,
+               resolution=FULL_RESOLUTION, precision='fp32', decode='full'):
+    """
+    Returns the fastest processes x threads layout for arch, batch_size &
+    the classifier settings on this machine, calibrating (and saving) it if
+    it wasn't tuned yet.
+    Parameters:
+     arch - model architecture, one of: resnet alexnet vgg (string)
+     batch_size - number of images per forward pass (int)
+     img_paths - paths of images used for calibration (list)
+     n_cores - number of cores to split (default- all available)
+     recalibrate - calibrate even if a saved layout exists (bool)
+     resolution, precision, decode - classifier_batch() settings the layout
+                                     is tuned for, precision already
+                                     resolved by resolve_precision()
+    Returns:
+     layout - Dictionary with keys 'workers', 'threads', 'images_per_sec'
+              (calibration throughput) and 'trials' (throughput of every
+              layout that didn't fail, keyed by 'PxT')
+    """
+    n_cores = n_cores or available_cores()
+    layout_key = '{}/{}/{}px/{}/{}/{}cores'.format(arch, batch_size, resolution,
+                                                  precision, decode, n_cores)
+    if not recalibrate:
+        saved_layouts = load_layouts()
+        if layout_key in saved_layouts:
+            return saved_layouts[layout_key]
+
+    # load the weights once so every trial shares them
+    load_model(arch)
+    classify_fn = partial(classifier_batch, resolution=resolution,
+                          precision=precision, decode=decode)
+    trials = {}
+    for n_workers, n_threads in candidate_layouts(n_cores):
+        images_per_sec = benchmark_layout(img_paths, arch, batch_size,
+                                          n_workers, n_threads, classify_fn)
+        if images_per_sec is not None:
+            trials['{}x{}'.format(n_workers, n_threads)] = images_per_sec
+    if not trials:
+        raise RuntimeError('every {} layout calibration trial failed'.format(arch))
+
+    best_trial = max(trials, key=trials.get)
+    n_workers, n_threads = (int(value) for value in best_trial.split('x'))
+    layout = {'workers': n_workers, 'threads': n_threads,
+              'images_per_sec': round(trials[best_trial], 2),
+              'trials': {trial: round(images_per_sec, 2)
+                         for trial, images_per_sec in trials.items()}}
+    save_layout(layout_key, layout)
+
+    return layout
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
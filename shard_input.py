@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/shard_input.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Reads input images straight out of tar or zip shards instead of
+#          extracting them first (which doubles the I/O & the disk used).
+#          Shards are given as a path or a glob pattern, e.g.
+#            check_images.py --dir 'corpus/pets-*.tar'
+#          and are read sequentially, member after member, handing the image
+#          bytes to the classification pipeline. Members are identified by
+#          their base name, like the files of an image directory.
+##
+
+# Imports python modules
+import tarfile
+import zipfile
+from glob import escape, glob
+from os.path import basename, dirname, isdir
+
+SHARD_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.zip')
+
+
+def is_shard_input(images_dir):
+    """
+    Returns True if images_dir names tar/zip shards (a shard path or a glob
+    pattern) rather than a directory of images. An existing directory is
+    never taken for shards, even with glob characters in its path.
+    """
+    if isdir(images_dir):
+        return False
+
+    return images_dir.lower().endswith(SHARD_EXTENSIONS) or escape(images_dir) != images_dir
+
+
+def shard_paths(shards):
+    """
+    Returns the sorted shard paths matching the shards path or glob pattern.
+    """
+    return sorted(glob(shards))
+
+
+def shards_dir(shards):
+    """
+    Returns the directory of the first shard (with a trailing /), where the
+    outputs of a run over shards are written.
+    """
+    paths = shard_paths(shards)
+
+    return (dirname(paths[0]) if paths else '.') + '/'
+
+
+def list_shard_members(shards):
+    """
+    Lists the base names of the file members of the shards, in shard order.
+    Only the tar headers (or the zip central directory) are read.
+    Parameters:
+     shards - shard path or glob pattern (string)
+    Returns:
+     member_names - base names of the members (list), a name found in
+                    several shards is only listed once
+    """
+    member_names = []
+    seen_names = set()
+    for shard_path in shard_paths(shards):
+        if shard_path.lower().endswith('.zip'):
+            with zipfile.ZipFile(shard_path) as zip_file:
+                names = [info.filename for info in zip_file.infolist()
+                         if not info.filename.endswith('/')]
+        else:
+            with tarfile.open(shard_path, 'r:*') as tar_file:
+                names = [member.name for member in tar_file if member.isfile()]
+
+        for name in names:
+            name = basename(name)
+            if name not in seen_names:
+                seen_names.add(name)
+                member_names.append(name)
+
+    return member_names
+
+
+class ShardMember(bytes):
+    """
+    Content of a shard member, with its source: the (shards, member base
+    name) tuple identifying it (e.g. to cache its decoded image).
+    """
+
+
+def shard_member(shards, name, content):
+    member = ShardMember(content)
+    member.source = (shards, name)
+
+    return member
+
+
+def iter_shard_images(shards, wanted_names=None):
+    """
+    Reads the shards sequentially & yields the content of their members.
+    Parameters:
+     shards - shard path or glob pattern (string)
+     wanted_names - only yield the members with these base names, None for
+                    all of them (set)
+    Yields:
+     (member base name, member content as ShardMember bytes) tuples in shard
+     order
+    """
+    seen_names = set()
+    for shard_path in shard_paths(shards):
+        if shard_path.lower().endswith('.zip'):
+            with zipfile.ZipFile(shard_path) as zip_file:
+                # in file order so the shard is read front to back
+                infos = sorted(zip_file.infolist(), key=lambda info: info.header_offset)
+                for info in infos:
+                    name = basename(info.filename)
+                    if info.filename.endswith('/') or name in seen_names:
+                        continue
+                    if wanted_names is None or name in wanted_names:
+                        seen_names.add(name)
+                        yield name, shard_member(shards, name, zip_file.read(info))
+        else:
+            # stream mode never seeks back, compressed tars work too
+            with tarfile.open(shard_path, 'r|*') as tar_file:
+                for member in tar_file:
+                    name = basename(member.name)
+                    if not member.isfile() or name in seen_names:
+                        continue
+                    if wanted_names is None or name in wanted_names:
+                        seen_names.add(name)
+                        yield name, shard_member(shards, name,
+                                                 tar_file.extractfile(member).read())
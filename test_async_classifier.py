@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_async_classifier.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks that classify_dir_async() of async_classifier.py keeps at
+#          most concurrency images in flight, and cancels the ones still in
+#          flight when its consumer stops early or an image fails. The
+#          classification is a stand-in coroutine, no model is loaded.
+#
+# Usage: python -m pytest test_async_classifier.py
+##
+
+# Imports python modules
+import asyncio
+
+import pytest
+
+# Imports the asyncio classification API
+import async_classifier
+
+
+class StubClassifier(object):
+    """
+    Stand-in for classify_async() counting the images in flight.
+    """
+
+    def __init__(self, fail_first=False):
+        # the first image completes before the others, failing if fail_first
+        self.fail_first = fail_first
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.n_cancelled = 0
+
+    async def __call__(self, img_path, arch):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            first = img_path.endswith('Collie_00000.jpg')
+            await asyncio.sleep(0.01 if first else 0.05)
+            if first and self.fail_first:
+                raise ValueError('cannot identify image file ' + img_path)
+            return arch
+        except asyncio.CancelledError:
+            self.n_cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def images_dir(tmp_path):
+    for idx in range(20):
+        (tmp_path / 'Collie_{:05d}.jpg'.format(idx)).write_bytes(b'')
+    (tmp_path / 'subdir').mkdir()
+
+    return str(tmp_path) + '/'
+
+
+def test_concurrency_is_bounded(monkeypatch, images_dir):
+    stub = StubClassifier()
+    monkeypatch.setattr(async_classifier, 'classify_async', stub)
+
+    async def classify_all():
+        return [result async for result in
+                async_classifier.classify_dir_async(images_dir, 'vgg', concurrency=3)]
+
+    results = asyncio.run(classify_all())
+
+    assert sorted(img_name for img_name, _ in results) == [
+        'Collie_{:05d}.jpg'.format(idx) for idx in range(20)]
+    assert stub.max_in_flight == 3
+
+
+def test_early_exit_cancels_pending(monkeypatch, images_dir):
+    stub = StubClassifier()
+    monkeypatch.setattr(async_classifier, 'classify_async', stub)
+
+    async def classify_first():
+        results = async_classifier.classify_dir_async(images_dir, 'vgg', concurrency=4)
+        async for result in results:
+            break
+        await results.aclose()
+        # before asyncio.run() cancels whatever is left
+        return stub.in_flight, stub.n_cancelled
+
+    assert asyncio.run(classify_first()) == (0, 3)
+
+
+def test_failure_cancels_pending(monkeypatch, images_dir):
+    stub = StubClassifier(fail_first=True)
+    monkeypatch.setattr(async_classifier, 'classify_async', stub)
+
+    async def classify_all():
+        with pytest.raises(ValueError):
+            async for result in async_classifier.classify_dir_async(
+                    images_dir, 'vgg', concurrency=4):
+                pass
+        # before asyncio.run() cancels whatever is left
+        return stub.in_flight, stub.n_cancelled
+
+    assert asyncio.run(classify_all()) == (0, 3)
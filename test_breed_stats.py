@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_breed_stats.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks the per-breed counts, precision & recall, the sparse
+#          confusion matrix and the top confusions computed by breed_stats.py
+#          on a small hand-made results dictionary.
+#
+# Usage: python -m pytest test_breed_stats.py
+##
+
+# Imports python modules
+import math
+
+# Imports the per-breed statistics
+from breed_stats import calculates_breed_stats, top_confusions
+
+RESULTS_DIC = {'Collie_01.jpg': ['collie', 'collie', 1, 1, 1],
+               'Collie_02.jpg': ['collie', 'border collie', 0, 1, 1],
+               'Collie_03.jpg': ['collie', 'border collie', 0, 1, 1],
+               'Border_collie_01.jpg': ['border collie', 'collie', 0, 1, 1],
+               'Beagle_01.jpg': ['beagle', 'basset, basset hound', 0, 1, 1]}
+
+
+def breed_row(breed_stats, label):
+    return list(breed_stats['labels']).index(label)
+
+
+def test_counts_precision_and_recall():
+    breed_stats = calculates_breed_stats(RESULTS_DIC)
+
+    assert breed_stats['labels'].tolist() == ['beagle', 'border collie', 'collie']
+    collie = breed_row(breed_stats, 'collie')
+    assert breed_stats['n_images'][collie] == 3
+    assert breed_stats['n_correct'][collie] == 1
+    # 'collie' is also a word of 'border collie'
+    assert breed_stats['n_predicted'][collie] == 4
+    assert breed_stats['precision'][collie] == 0.25
+    assert math.isclose(breed_stats['recall'][collie], 1 / 3)
+
+    beagle = breed_row(breed_stats, 'beagle')
+    assert breed_stats['n_predicted'][beagle] == 0
+    assert math.isnan(breed_stats['precision'][beagle])
+    assert breed_stats['recall'][beagle] == 0.0
+    assert breed_stats['is_dog'].all()
+
+
+def test_sparse_confusion_matrix():
+    breed_stats = calculates_breed_stats(RESULTS_DIC)
+
+    cells = {(str(breed_stats['labels'][row]), str(breed_stats['classes'][col])): int(count)
+             for row, col, count in zip(breed_stats['rows'], breed_stats['cols'],
+                                        breed_stats['counts'])}
+    assert cells == {('collie', 'collie'): 1, ('collie', 'border collie'): 2,
+                     ('border collie', 'collie'): 1,
+                     ('beagle', 'basset, basset hound'): 1}
+    assert int(breed_stats['counts'].sum()) == len(RESULTS_DIC)
+
+
+def test_top_confusions():
+    confusions = top_confusions(calculates_breed_stats(RESULTS_DIC))
+
+    # the collie -> border collie cells match by words, so aren't confusions
+    assert confusions == {'border collie': ('collie', 1),
+                          'beagle': ('basset, basset hound', 1)}
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_checkpoint.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks the checkpoint journal of checkpoint.py: resuming loads the
+#          complete records & drops a record torn by a crash, a journal of a
+#          different run configuration isn't resumed, and a new run doesn't
+#          clobber an existing journal.
+#
+# Usage: python -m pytest test_checkpoint.py
+##
+
+# Imports python modules
+import pytest
+
+# Imports the checkpoint journal
+from checkpoint import CheckpointJournal, default_checkpoint_path, load_journal
+
+CONFIG = {'arch': 'vgg', 'resolution': 224}
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    path = str(tmp_path / 'checkpoint_vgg.jsonl')
+    with CheckpointJournal(path, CONFIG) as journal:
+        journal.record('Collie_03797.jpg', 'collie')
+        journal.record('cat_07.jpg', 'tabby, tabby cat')
+    # a record torn by a crash
+    with open(path, 'a') as journal_file:
+        journal_file.write('{"name": "gecko_80.jpg", "out')
+
+    return path
+
+
+def test_resume_drops_torn_record(journal_path):
+    with CheckpointJournal(journal_path, CONFIG, resume=True) as journal:
+        assert journal.records == {'Collie_03797.jpg': 'collie',
+                                   'cat_07.jpg': 'tabby, tabby cat'}
+        journal.record('gecko_80.jpg', 'common newt')
+
+    config, records, _ = load_journal(journal_path)
+    assert config == CONFIG
+    assert records['gecko_80.jpg'] == 'common newt'
+    assert len(records) == 3
+
+
+def test_resume_with_other_config_is_rejected(journal_path):
+    with pytest.raises(ValueError):
+        CheckpointJournal(journal_path, dict(CONFIG, arch='resnet'), resume=True)
+
+
+def test_existing_journal_is_not_clobbered(journal_path):
+    with pytest.raises(FileExistsError):
+        CheckpointJournal(journal_path, CONFIG)
+
+    with CheckpointJournal(journal_path, CONFIG, overwrite=True):
+        pass
+    assert load_journal(journal_path)[1] == {}
+
+
+def test_default_path_depends_on_directory():
+    path = default_checkpoint_path('pet_images/', 'vgg')
+
+    assert path.startswith('checkpoint_vgg_pet_images_')
+    assert default_checkpoint_path('pet_images', 'vgg') == path
+    assert default_checkpoint_path('other/pet_images/', 'vgg') != path
@@ -11,11 +11,18 @@
 #          classify images. The only model architectures that this function 
 #          will accept are: 'resnet', 'alexnet', and 'vgg'. See the example
 #          usage below.
+#          When DOG_CLASSIFIER_SOCKET is set, the image is classified by the
+#          classifier_daemon.py listening on that socket instead.
 #
 # Usage: python test_classifier.py    -- will run program from commandline
 
+# Imports python modules
+import os
+
 # Imports classifier function for using pretrained CNN to classify images 
 from classifier import classifier 
+# Imports the client of a running classifier daemon
+from classifier_daemon import DaemonClient, DAEMON_SOCKET_ENV
 
 # Defines a dog test image from pet_images folder
 test_image="pet_images/Collie_03797.jpg"
@@ -29,7 +36,12 @@ model = "vgg"
 # NOTE: image_classication is a text string - It contains mixed case(both lower
 # and upper case letter) image labels that can be separated by commas when a 
 # label has more than one word that can describe it.
-image_classification = classifier(test_image, model)
+daemon_socket = os.environ.get(DAEMON_SOCKET_ENV)
+if daemon_socket:
+    with DaemonClient(daemon_socket) as client:
+        image_classification = client.classify([test_image], model)[0]
+else:
+    image_classification = classifier(test_image, model)
 
 # prints result from running classifier() function
 print("\nResults from test_classifier.py\nImage:", test_image, "using model:",
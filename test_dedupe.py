@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_dedupe.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks that group_duplicates() of dedupe.py groups byte-identical
+#          and resized copies of an image with it, and keeps different images
+#          apart, on tiny generated images.
+#
+# Usage: python -m pytest test_dedupe.py
+##
+
+# Imports python modules
+import math
+import shutil
+
+import pytest
+from PIL import Image
+
+# Imports the duplicate grouping
+from dedupe import group_duplicates
+
+
+def pattern_image(width, height, phase):
+    img = Image.new('L', (width, height))
+    img.putdata([int(127.5 + 127.5 * math.sin(6 * x / width + phase) * math.cos(4 * y / height))
+                 for y in range(height) for x in range(width)])
+
+    return img.convert('RGB')
+
+
+@pytest.fixture
+def images_dir(tmp_path):
+    pattern_image(64, 48, 0.0).save(str(tmp_path / 'cat_01.png'))
+    # exact & near (resized) duplicates of cat_01
+    shutil.copy(str(tmp_path / 'cat_01.png'), str(tmp_path / 'cat_02.png'))
+    pattern_image(64, 48, 0.0).resize((128, 96), Image.BILINEAR).save(
+        str(tmp_path / 'cat_03.png'))
+    pattern_image(64, 48, 2.5).save(str(tmp_path / 'dog_01.png'))
+
+    return str(tmp_path) + '/'
+
+
+def test_groups_exact_and_near_duplicates(images_dir):
+    stats = {}
+    groups = group_duplicates(images_dir, ['cat_01.png', 'cat_02.png', 'cat_03.png',
+                                           'dog_01.png'], stats=stats)
+
+    assert groups == {'cat_01.png': ['cat_01.png', 'cat_02.png', 'cat_03.png'],
+                      'dog_01.png': ['dog_01.png']}
+    assert stats == {'n_groups': 2, 'n_exact_dups': 1, 'n_near_dups': 1}
+
+
+def test_zero_distance_only_groups_exact_duplicates(images_dir):
+    groups = group_duplicates(images_dir, ['cat_01.png', 'cat_02.png', 'cat_03.png'],
+                              max_distance=0)
+
+    assert groups == {'cat_01.png': ['cat_01.png', 'cat_02.png'],
+                      'cat_03.png': ['cat_03.png']}
+
+
+def test_negative_distance_is_rejected(images_dir):
+    with pytest.raises(ValueError):
+        group_duplicates(images_dir, ['cat_01.png'], max_distance=-1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_embedding_index.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks the embeddings index of embedding_index.py on a few
+#          hand-made embeddings, searched in chunks smaller than the index:
+#          top-k cosine similarity without the query itself, nearest
+#          neighbour pet labels, and reopening the embeddings of a resumed
+#          run.
+#
+# Usage: python -m pytest test_embedding_index.py
+##
+
+# Imports python modules
+import numpy as np
+import pytest
+
+# Imports the embeddings index
+from embedding_index import open_embeddings, save_embeddings_meta, SimilarityIndex
+
+EMBEDDINGS = [[1.0, 0.0, 0.0, 0.0], [0.9, 0.1, 0.0, 0.0], [0.8, 0.3, 0.0, 0.0],
+              [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.9, 0.2]]
+IMG_NAMES = ['Collie_01.jpg', 'Collie_02.jpg', 'Collie_03.jpg', 'cat_01.jpg', 'cat_02.jpg']
+PET_LABELS = ['collie', 'collie', 'collie', 'cat', 'cat']
+
+
+def write_index(path, rows):
+    embeddings = open_embeddings(path, len(rows), 4)
+    embeddings[:] = rows
+    embeddings.flush()
+    del embeddings
+    save_embeddings_meta(path, 'resnet', IMG_NAMES[:len(rows)], PET_LABELS[:len(rows)],
+                         PET_LABELS[:len(rows)])
+
+    return SimilarityIndex(path, chunk_rows=2)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return write_index(str(tmp_path / 'embeddings.npy'), EMBEDDINGS)
+
+
+def test_similar_to(index):
+    similar = index.similar_to('Collie_01.jpg', 2)
+
+    assert [img_name for img_name, _, _ in similar] == ['Collie_02.jpg', 'Collie_03.jpg']
+    assert similar[0][1] == 'collie'
+    assert 1.0 > similar[0][2] > similar[1][2] > 0.9
+    # k beyond the other rows, the query isn't one of its results (the
+    # collies are all orthogonal to it)
+    similar_names = [img_name for img_name, _, _ in index.similar_to('cat_01.jpg', 10)]
+    assert similar_names[0] == 'cat_02.jpg'
+    assert sorted(similar_names[1:]) == ['Collie_01.jpg', 'Collie_02.jpg', 'Collie_03.jpg']
+
+
+def test_top_k_matches_brute_force(index):
+    queries = np.array([[0.5, 0.5, 0.5, 0.0], [0.0, 0.1, 0.2, 1.0]])
+    rows, scores = index.top_k(queries, 3)
+
+    embeddings = np.array(EMBEDDINGS, dtype=np.float16).astype(np.float32)
+    cosines = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ (
+        embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)).T
+    assert rows.tolist() == np.argsort(-cosines, axis=1)[:, :3].tolist()
+    assert scores == pytest.approx(-np.sort(-cosines, axis=1)[:, :3], abs=1e-5)
+
+
+def test_knn_labels(index, tmp_path):
+    assert index.knn_labels(1) == PET_LABELS
+    # k is clamped to the 4 other rows: 3 collies outvote the other cat
+    assert index.knn_labels(10)[3:] == ['collie', 'collie']
+    # no other row to vote
+    assert write_index(str(tmp_path / 'one.npy'), EMBEDDINGS[:1]).knn_labels(3) == [None]
+
+
+def test_open_embeddings_resume(tmp_path):
+    path = str(tmp_path / 'embeddings.npy')
+    with pytest.raises(ValueError):
+        open_embeddings(path, 5, 4, resume=True)
+
+    embeddings = open_embeddings(path, 5, 4)
+    embeddings[0] = EMBEDDINGS[0]
+    embeddings.flush()
+    del embeddings
+
+    assert open_embeddings(path, 5, 4, resume=True)[0].tolist() == EMBEDDINGS[0]
+    with pytest.raises(ValueError):
+        open_embeddings(path, 6, 4, resume=True)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_image_cache.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks the DecodedImageCache of image_cache.py on tiny generated
+#          images: hits return the cached image without decoding it again,
+#          the least recently used images are evicted past the size bound,
+#          and image contents are cached by shard source or digest.
+#
+# Usage: python -m pytest test_image_cache.py
+##
+
+# Imports python modules
+from os.path import getsize
+
+import pytest
+from PIL import Image
+
+# Imports the decoded image cache & the shard member contents
+from image_cache import DecodedImageCache
+from shard_input import shard_member
+
+# pixel bytes of the 10x10 RGB test images
+IMAGE_BYTES = 10 * 10 * 3
+
+
+@pytest.fixture
+def img_paths(tmp_path):
+    paths = []
+    for idx, color in enumerate(['red', 'green', 'blue']):
+        path = str(tmp_path / 'img_{}.png'.format(idx))
+        Image.new('RGB', (10, 10), color).save(path)
+        paths.append(path)
+
+    return paths
+
+
+def test_hits_and_lru_eviction(img_paths):
+    image_cache = DecodedImageCache(2 * IMAGE_BYTES)
+    first = image_cache.open(img_paths[0])
+    image_cache.open(img_paths[1])
+
+    assert image_cache.open(img_paths[0]) is first
+    assert image_cache.n_hits == 1
+    assert image_cache.bytes_saved == getsize(img_paths[0])
+
+    # img_1 is the least recently used
+    image_cache.open(img_paths[2])
+    assert image_cache.n_evictions == 1
+    assert image_cache.n_bytes == 2 * IMAGE_BYTES
+    assert image_cache.get(img_paths[1]) is None
+    assert image_cache.recent_sources() == [img_paths[2], img_paths[0]]
+    assert image_cache.n_decodes == 3
+
+
+def test_draft_size_is_part_of_the_key(img_paths):
+    image_cache = DecodedImageCache(4 * IMAGE_BYTES)
+    image_cache.open(img_paths[0])
+    image_cache.open(img_paths[0], draft_size=(4, 4))
+
+    assert image_cache.n_decodes == 2
+    assert image_cache.recent_sources(draft_size=(4, 4)) == [img_paths[0]]
+
+
+def test_image_larger_than_cache_is_not_kept(img_paths):
+    image_cache = DecodedImageCache(IMAGE_BYTES - 1)
+    image_cache.open(img_paths[0])
+
+    assert image_cache.get(img_paths[0]) is None
+    assert image_cache.n_bytes == 0
+
+
+def test_contents_are_cached_by_source(img_paths):
+    with open(img_paths[0], 'rb') as img_file:
+        content = img_file.read()
+    image_cache = DecodedImageCache(4 * IMAGE_BYTES)
+
+    # same content, same digest
+    first = image_cache.open(content)
+    assert image_cache.open(bytes(content)) is first
+    # a shard member is cached by its (shards, name) source
+    member = image_cache.open(shard_member('pets-*.tar', 'img_0.png', content))
+    assert member is not first
+    assert image_cache.get(('pets-*.tar', 'img_0.png')) is member
+    assert image_cache.n_decodes == 2
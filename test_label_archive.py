@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_label_archive.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks that the offsets indexed by the ShardedArchiveWriter of
+#          label_archive.py point at the member contents in tar & zip shards
+#          (read_member() returns them with a single seek), that shards are
+#          cut at the shard size, and that the shards are valid archives.
+#
+# Usage: python -m pytest test_label_archive.py
+##
+
+# Imports python modules
+import tarfile
+import zipfile
+
+import pytest
+
+# Imports the sharded labeled images archive
+from label_archive import ShardedArchiveWriter, load_index, read_member
+
+# member sizes around the tar block size
+MEMBERS = {'Collie_03797.jpg': b'\xff\xd8' + b'c' * 700,
+           'cat_07.jpg': b'\xff\xd8' + b't' * 510,
+           'gecko_80.jpg': b'\xff\xd8' + b'g' * 1500}
+
+
+@pytest.mark.parametrize('archive_format', ['tar', 'zip'])
+def test_offsets_point_at_members(tmp_path, archive_format):
+    out_dir = str(tmp_path)
+    with ShardedArchiveWriter(out_dir, archive_format, shard_bytes=2048) as writer:
+        for name, data in MEMBERS.items():
+            writer.add(name, data, label=name.split('_')[0].lower())
+
+    index = load_index(out_dir)
+    assert sorted(index) == sorted(MEMBERS)
+    for name, data in MEMBERS.items():
+        assert read_member(out_dir, index[name]) == data
+    assert index['gecko_80.jpg']['label'] == 'gecko'
+    # the third member doesn't fit in the first shard
+    shard_names = sorted({entry['shard'] for entry in index.values()})
+    assert shard_names == ['labeled-00000.' + archive_format,
+                           'labeled-00001.' + archive_format]
+    assert index['gecko_80.jpg']['shard'] == shard_names[1]
+
+    for shard_name in shard_names:
+        shard_path = str(tmp_path / shard_name)
+        if archive_format == 'tar':
+            with tarfile.open(shard_path) as tar_file:
+                for member in tar_file:
+                    assert tar_file.extractfile(member).read() == MEMBERS[member.name]
+        else:
+            with zipfile.ZipFile(shard_path) as zip_file:
+                for name in zip_file.namelist():
+                    assert zip_file.read(name) == MEMBERS[name]
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ShardedArchiveWriter(str(tmp_path), '7z')
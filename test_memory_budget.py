@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_memory_budget.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks the memory budget planning of memory_budget.py: memory
+#          size arguments, the footprint measured with probe passes, the
+#          workers x batch size picked for a budget, the cache share of the
+#          budget and the MemoryGuard batch shrinking. The memory usage &
+#          the classification are stand-ins, no model is loaded.
+#
+# Usage: python -m pytest test_memory_budget.py
+##
+
+# Imports python modules
+import argparse
+
+import pytest
+
+# Imports the memory budget planning
+import classifier
+import memory_budget
+from memory_budget import (memory_arg, probe_images, plan_layout, cache_budget,
+                           MemoryGuard)
+
+# MB
+FOOTPRINT = {'base': 100.0, 'model': 500.0, 'overhead': 50.0, 'per_image': 10.0}
+
+
+def test_memory_arg():
+    assert memory_arg('512M') == 512
+    assert memory_arg('4G') == 4096
+    assert memory_arg('4gb') == 4096
+    assert memory_arg('4096') == 4096
+    assert memory_arg('512K') == 0.5
+    for value in ('lots', '0', '-1G'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            memory_arg(value)
+
+
+def test_probe_images_picks_largest():
+    img_files = [('img_{}.jpg'.format(size), b'x' * size) for size in (3, 9, 1, 7, 5, 8)]
+
+    assert probe_images(img_files, 2) == [b'x' * 9, b'x' * 8]
+    assert probe_images(iter(img_files), 2, max_scanned=3) == [b'x' * 9, b'x' * 3]
+
+
+def test_measure_footprint(monkeypatch):
+    memory = {'rss': 100.0, 'peak': 100.0}
+
+    def load_model(model_name):
+        memory['rss'] += 500.0
+
+    def classify(img_paths, model_name):
+        # fixed cost of 50MB & 10MB per image
+        memory['peak'] = memory['rss'] + 50.0 + 10.0 * len(img_paths)
+        return [model_name] * len(img_paths)
+
+    monkeypatch.setattr(classifier, 'load_model', load_model)
+    monkeypatch.setattr(memory_budget, 'memory_usage', lambda: dict(memory))
+    monkeypatch.setattr(memory_budget, 'reset_peak_memory', lambda: True)
+
+    assert memory_budget.measure_footprint('vgg', [b'img'], classify) == FOOTPRINT
+
+
+def test_plan_layout():
+    # most workers with batches of at least MIN_PLANNED_BATCH_SIZE
+    assert plan_layout(2000, FOOTPRINT, 4) == (4, 19)
+    assert plan_layout(1000, FOOTPRINT, 4) == (2, 4)
+    assert plan_layout(100000, FOOTPRINT, 2) == (2, memory_budget.MAX_PLANNED_BATCH_SIZE)
+    # the cache reserved memory leaves less for the batches
+    assert plan_layout(2000, FOOTPRINT, 4, reserved_mb=500) == (4, 6)
+    # even 1 image batches don't fit
+    assert plan_layout(700, FOOTPRINT, 4) == (1, 1)
+
+
+def test_cache_budget():
+    assert cache_budget(2000, FOOTPRINT, 100) == 100
+    # at most CACHE_BUDGET_FRACTION of the budget
+    assert cache_budget(2000, FOOTPRINT, 1024) == 500
+    # 1 image batches wouldn't fit next to it
+    assert cache_budget(1000, FOOTPRINT, 1024) == 0
+
+
+def test_guard_shrinks_before_batch():
+    guard = MemoryGuard(1000, 64, FOOTPRINT)
+
+    # 650MB fixed + 64 or 32 images of 10MB are above 95% of the budget
+    assert guard() == 16
+    assert guard.n_shrinks == 2
+
+
+def test_guard_shrinks_after_peak():
+    guard = MemoryGuard(1000, 16, FOOTPRINT)
+    assert guard() == 16
+
+    guard.update(960)
+    assert guard() == 8
+    assert guard.peak_mb == 960
+    # the images of the batch took (960 - 650) / 16 MB each
+    assert guard.per_image_mb == pytest.approx(19.375)
+
+
+def test_guard_without_footprint():
+    guard = MemoryGuard(1000, 8)
+    guard.update(500)
+    assert guard() == 8
+    guard.update(990)
+    assert guard() == 4
+    guard.update(400)
+    assert guard() == 4
+    assert guard.peak_mb == 990
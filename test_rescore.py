@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_rescore.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks that rescore.py recomputes the results flags & stats from
+#          top-k outputs saved by save_topk(), under the match rules & with
+#          topk_match, without any model.
+#
+# Usage: python -m pytest test_rescore.py
+##
+
+# Imports python modules
+import pytest
+
+# Imports the re-scoring of stored outputs
+from rescore import (save_topk, load_topk, load_class_labels, rescore,
+                     calculates_results_stats_vectorized)
+
+
+@pytest.fixture
+def topk_data(tmp_path):
+    class_ids = {label: class_id for class_id, label in enumerate(load_class_labels())}
+    collie = class_ids['collie']
+    border_collie = class_ids['border collie']
+    tabby = class_ids['tabby, tabby cat']
+    path = str(tmp_path / 'vgg_topk.npz')
+    save_topk(path, 'vgg', ['Collie_03797.jpg', 'Border_collie_01.jpg', 'cat_07.jpg'],
+              ['collie', 'border collie', 'cat'],
+              [[collie, border_collie], [collie, border_collie], [tabby, collie]],
+              [[9.5, 7.0], [8.0, 7.5], [6.0, 1.0]])
+
+    return load_topk(path)
+
+
+def test_rescore_words(topk_data):
+    flags = rescore(topk_data, 'dognames.txt')
+
+    assert flags['classifier_labels'].tolist() == ['collie', 'collie', 'tabby, tabby cat']
+    assert flags['match'].tolist() == [1, 0, 1]
+    assert flags['pet_is_dog'].tolist() == [1, 1, 0]
+    assert flags['classifier_is_dog'].tolist() == [1, 1, 0]
+    assert calculates_results_stats_vectorized(flags) == {
+        'n_images': 3, 'n_dogs_img': 2, 'n_notdogs_img': 1,
+        'pct_correct_dogs': 100.0, 'pct_correct_notdogs': 100.0,
+        'pct_correct_breed': 50.0, 'pct_matches': 66.7}
+
+
+def test_rescore_rules_and_topk_match(topk_data):
+    assert rescore(topk_data, 'dognames.txt', 'exact')['match'].tolist() == [1, 0, 0]
+    assert rescore(topk_data, 'dognames.txt', 'substring')['match'].tolist() == [1, 0, 1]
+    # the second best class of the border collie matches
+    assert rescore(topk_data, 'dognames.txt', topk_match=2)['match'].tolist() == [1, 1, 1]
+
+
+def test_topk_match_beyond_saved_k(topk_data):
+    with pytest.raises(ValueError):
+        rescore(topk_data, 'dognames.txt', topk_match=3)
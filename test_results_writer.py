@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_results_writer.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks that the jsonl, csv & npz writers of results_writer.py
+#          read back the records & stats written to them, across several
+#          batches, and that sync() puts the records of a batch in the text
+#          formats before the writer is closed.
+#
+# Usage: python -m pytest test_results_writer.py
+##
+
+# Imports python modules
+import csv
+import json
+
+import pytest
+
+# Imports the results writers
+from results_writer import open_results_writer, read_results, result_record
+
+RESULTS_DIC = {'Collie_03797.jpg': ['collie', 'collie', 1, 1, 1],
+               'cat_07.jpg': ['cat', 'tabby, tabby cat', 1, 0, 0],
+               'Basenji_00963.jpg': ['basenji', 'pug, pug-dog', 0, 1, 1],
+               'gecko_80.jpg': ['gecko', 'common newt', 0]}
+STATS = {'n_images': 4, 'pct_correct_dogs': 100.0}
+
+
+def write_results(path, batch_size=3):
+    with open_results_writer(path, batch_size=batch_size) as writer:
+        for img_name, img_result in RESULTS_DIC.items():
+            writer.write_record(img_name, img_result)
+        writer.write_stats(STATS)
+
+
+def expected_records():
+    return [result_record(img_name, img_result)
+            for img_name, img_result in RESULTS_DIC.items()]
+
+
+def test_jsonl_round_trip(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    write_results(path)
+
+    with open(path) as results_file:
+        lines = [json.loads(line) for line in results_file]
+    assert lines[:-1] == expected_records()
+    assert lines[-1] == {'stats': STATS}
+
+
+def test_csv_round_trip(tmp_path):
+    path = str(tmp_path / 'results.csv')
+    write_results(path)
+
+    with open(path, newline='') as results_file:
+        rows = list(csv.DictReader(results_file))
+    # csv only stores strings, missing flags are empty
+    assert rows == [{field: '' if value is None else str(value)
+                     for field, value in record.items()}
+                    for record in expected_records()]
+    with open(path + '.stats.json') as stats_file:
+        assert json.load(stats_file) == STATS
+
+
+def test_npz_round_trip(tmp_path):
+    path = str(tmp_path / 'results.npz')
+    write_results(path)
+
+    columns, stats = read_results(path)
+    records = expected_records()
+    for field in columns:
+        # -1 stands for a missing flag
+        assert columns[field].tolist() == [-1 if record[field] is None else record[field]
+                                           for record in records]
+    assert stats == STATS
+
+
+@pytest.mark.parametrize('results_format', ['jsonl', 'csv'])
+def test_sync_writes_buffered_records(tmp_path, results_format):
+    path = str(tmp_path / ('results.' + results_format))
+    writer = open_results_writer(path)
+    writer.write_record('Collie_03797.jpg', RESULTS_DIC['Collie_03797.jpg'])
+    writer.sync()
+
+    with open(path) as results_file:
+        assert 'Collie_03797.jpg' in results_file.read()
+    writer.close()
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_results_writer(str(tmp_path / 'results.parquet'))
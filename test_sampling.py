@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_sampling.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks the sampling of sampling.py: the stratified order samples
+#          each pet label in proportion in any prefix, the Wilson score
+#          intervals (with & without the finite population correction) and
+#          the intervals of the results statistics.
+#
+# Usage: python -m pytest test_sampling.py
+##
+
+# Imports python modules
+import pytest
+
+# Imports the sampling & confidence intervals
+from sampling import (stratified_order, stat_populations, stat_counts,
+                      proportion_interval, confidence_intervals)
+
+PETLABEL_DIC = dict([('Collie_{:02d}.jpg'.format(idx), 'collie') for idx in range(30)] +
+                    [('cat_{:02d}.jpg'.format(idx), 'cat') for idx in range(10)])
+
+
+def test_stratified_order():
+    order = stratified_order(PETLABEL_DIC, seed=1)
+
+    assert sorted(order) == sorted(PETLABEL_DIC)
+    assert stratified_order(PETLABEL_DIC, seed=1) == order
+    # every prefix has 3 collies per cat, give or take one image of each
+    for n_images in range(4, len(order), 4):
+        n_collies = sum(PETLABEL_DIC[img_name] == 'collie' for img_name in order[:n_images])
+        assert abs(n_collies - n_images * 3 / 4) <= 1
+
+
+def test_wilson_interval():
+    low, high = proportion_interval(8, 10)
+    assert (low, high) == pytest.approx((49.02, 94.33), abs=0.01)
+
+    low, high = proportion_interval(0, 10)
+    assert low == pytest.approx(0.0)
+    assert 0.0 < high < 35.0
+
+
+def test_finite_population_correction():
+    infinite_low, infinite_high = proportion_interval(80, 100)
+    low, high = proportion_interval(80, 100, population=200)
+
+    assert infinite_low < low < 80.0 < high < infinite_high
+    # the whole population was sampled
+    assert proportion_interval(80, 100, population=100) == pytest.approx((80.0, 80.0))
+
+
+def test_confidence_intervals():
+    results_dic = {'Collie_00.jpg': ['collie', 'collie', 1, 1, 1],
+                   'Collie_01.jpg': ['collie', 'tabby, tabby cat', 0, 1, 0],
+                   'cat_00.jpg': ['cat', 'tabby, tabby cat', 1, 0, 0]}
+    populations = stat_populations(PETLABEL_DIC, {'collie'})
+
+    assert populations == {'pct_correct_dogs': 30, 'pct_correct_notdogs': 10,
+                           'pct_correct_breed': 30, 'pct_matches': 40}
+    assert stat_counts(results_dic) == {'pct_correct_dogs': (1, 2),
+                                        'pct_correct_notdogs': (1, 1),
+                                        'pct_correct_breed': (1, 2),
+                                        'pct_matches': (2, 3)}
+
+    intervals = confidence_intervals(results_dic, populations)
+    pct, low, high = intervals['pct_correct_dogs']
+    assert pct == 50.0
+    assert low < pct < high
+    # no dog sampled yet
+    cats_only = {'cat_00.jpg': results_dic['cat_00.jpg']}
+    assert confidence_intervals(cats_only, populations)['pct_correct_dogs'] is None
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_shard_input.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks that shard_input.py tells shards from image directories,
+#          and lists & streams the members of tar, gzipped tar & zip shards
+#          matched by a glob pattern, in shard order & by base name.
+#
+# Usage: python -m pytest test_shard_input.py
+##
+
+# Imports python modules
+import tarfile
+import zipfile
+from io import BytesIO
+
+import pytest
+
+# Imports the shard input
+from shard_input import (is_shard_input, list_shard_members, iter_shard_images,
+                         shards_dir)
+
+
+def write_tar(path, members, mode='w'):
+    with tarfile.open(path, mode) as tar_file:
+        for name, data in members:
+            member_info = tarfile.TarInfo(name)
+            if data is None:
+                member_info.type = tarfile.DIRTYPE
+                tar_file.addfile(member_info)
+                continue
+            member_info.size = len(data)
+            tar_file.addfile(member_info, BytesIO(data))
+
+
+@pytest.fixture
+def shards(tmp_path):
+    write_tar(str(tmp_path / 'pets-0.tar'), [('pets', None),
+                                             ('pets/Collie_03797.jpg', b'collie'),
+                                             ('pets/cat_07.jpg', b'cat')])
+    write_tar(str(tmp_path / 'pets-1.tar.gz'), [('gecko_80.jpg', b'gecko')], 'w:gz')
+    with zipfile.ZipFile(str(tmp_path / 'pets-2.zip'), 'w') as zip_file:
+        zip_file.writestr('pets/', b'')
+        zip_file.writestr('pets/Beagle_01.jpg', b'beagle')
+        # already read from the first shard
+        zip_file.writestr('pets/cat_07.jpg', b'other cat')
+
+    return str(tmp_path / 'pets-*')
+
+
+def test_is_shard_input(tmp_path):
+    assert is_shard_input('corpus/pets-0.tar')
+    assert is_shard_input('corpus/pets.ZIP')
+    assert is_shard_input('corpus/pets-*')
+    assert not is_shard_input('pet_images/')
+    # an existing directory, even with glob characters in its name
+    glob_dir = tmp_path / 'pets[1]'
+    glob_dir.mkdir()
+    assert not is_shard_input(str(glob_dir) + '/')
+
+
+def test_list_members(shards):
+    assert list_shard_members(shards) == ['Collie_03797.jpg', 'cat_07.jpg',
+                                          'gecko_80.jpg', 'Beagle_01.jpg']
+
+
+def test_iter_images(shards):
+    images = list(iter_shard_images(shards))
+
+    assert [(name, bytes(content)) for name, content in images] == [
+        ('Collie_03797.jpg', b'collie'), ('cat_07.jpg', b'cat'),
+        ('gecko_80.jpg', b'gecko'), ('Beagle_01.jpg', b'beagle')]
+    assert images[0][1].source == (shards, 'Collie_03797.jpg')
+    assert [name for name, _ in iter_shard_images(shards, {'gecko_80.jpg'})] == ['gecko_80.jpg']
+
+
+def test_shards_dir(shards, tmp_path):
+    assert shards_dir(shards) == str(tmp_path) + '/'
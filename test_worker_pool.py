@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_worker_pool.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Checks that the worker pool of worker_pool.py raises the error of
+#          a failing worker instead of hanging when more batches are queued
+#          than tasks may be in flight. The classify function is a stand-in,
+#          no model is loaded.
+#
+# Usage: python -m pytest test_worker_pool.py
+##
+
+# Imports python modules
+import time
+
+import pytest
+
+# Imports the worker pool
+import worker_pool
+
+
+def classify_or_fail(img_paths, model_name):
+    time.sleep(0.05)
+    if 'bad.jpg' in img_paths:
+        raise ValueError('cannot identify image file bad.jpg')
+    return [model_name] * len(img_paths)
+
+
+def test_worker_error_is_raised(monkeypatch):
+    monkeypatch.setattr(worker_pool, 'load_model', lambda model_name: None)
+    n_workers = 2
+    img_paths = ['{}.jpg'.format(idx) for idx in range(210)]
+    img_paths.insert(20, 'bad.jpg')
+    # more batches than the tasks allowed in flight
+    assert len(img_paths) > n_workers * worker_pool.TASKS_PER_WORKER
+
+    with pytest.raises(ValueError):
+        worker_pool.classify_pool(img_paths, 'vgg', n_workers,
+                                  classify_fn=classify_or_fail, batch_size=1,
+                                  n_threads=1)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/worker_pool.py
+#
+# PROGRAMMER: Mohamed A. Farouk
+# DATE CREATED: 19/10/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Classifies images with a pool of worker processes that share the
+#          pretrained model weights. The weights are loaded once in the parent
+#          process and the workers are forked after that, so they read the
+#          same memory pages (copy-on-write) instead of each loading its own
+#          ~528 MB copy of VGG16. Each worker reports its memory usage so the
+#          sharing can be checked. Workers classify their images in batches
+#          and can be pinned to disjoint sets of cores (see scheduler.py).
+##
+
+# Imports python modules
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+from itertools import islice
+
+# Imports batch classifier function & model loading for using CNN to
+# classify images
+from classifier import classifier_batch, load_model, set_num_threads
+
+# images sent to a worker per task when not batching
+CHUNK_SIZE = 4
+# max tasks queued per worker, bounds the memory used by image bytes waiting
+# to be classified when the images are streamed (e.g. from shards)
+TASKS_PER_WORKER = 4
+# how often the task feeding thread checks if the run was stopped while it
+# waits for a task slot (seconds)
+FEED_POLL_SECS = 0.1
+
+
+def memory_usage():
+    """
+    Returns the memory usage of the current process in MB. On Linux the
+    proportional set size (pss) splits the shared pages between the processes
+    sharing them, so summing pss over the pool gives its real footprint.
+    Parameters:
+     None
+    Returns:
+     usage - Dictionary with keys 'rss', 'pss', 'shared', 'private' and
+             'peak' (peak rss since the last reset_peak_memory(), MB), only
+             'rss' (peak) is available when /proc isn't
+    """
+    usage = {}
+    try:
+        with open('/proc/self/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmHWM:'):
+                    usage['VmHWM'] = int(line.split()[1]) / 1024
+        with open('/proc/self/smaps_rollup') as smaps_file:
+            for line in smaps_file:
+                fields = line.split()
+                if fields[0].rstrip(':') in ('Rss', 'Pss', 'Shared_Clean',
+                                             'Shared_Dirty', 'Private_Clean',
+                                             'Private_Dirty'):
+                    usage[fields[0].rstrip(':')] = int(fields[1]) / 1024
+    except (IOError, OSError, IndexError, ValueError):
+        # ru_maxrss is in KB on Linux (bytes on macOS)
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'rss': max_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)}
+
+    return {'rss': usage.get('Rss', 0.0),
+            'pss': usage.get('Pss', 0.0),
+            'shared': usage.get('Shared_Clean', 0.0) + usage.get('Shared_Dirty', 0.0),
+            'private': usage.get('Private_Clean', 0.0) + usage.get('Private_Dirty', 0.0),
+            'peak': usage.get('VmHWM', usage.get('Rss', 0.0))}
+
+
+def reset_peak_memory():
+    """
+    Resets the peak rss of the current process to its current rss (Linux
+    4.0+), so the next memory_usage() 'peak' only covers what runs after.
+    Returns:
+     True if the peak was reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs_file:
+            clear_refs_file.write('5')
+    except (IOError, OSError):
+        return False
+
+    return True
+
+
+def format_memory(usage):
+    """
+    Formats a memory_usage() dictionary as a one line string.
+    """
+    return ' '.join('{} {:.1f}MB'.format(key, value)
+                    for key, value in sorted(usage.items()))
+
+
+def worker_cpu_sets(n_workers, n_threads):
+    """
+    Splits the cores this process may run on into n_workers disjoint sets of
+    n_threads cores (the last sets wrap around when there aren't enough).
+    Returns:
+     cpu_sets - list of n_workers sets of core ids, None if the platform
+                can't pin processes to cores
+    """
+    if not hasattr(os, 'sched_getaffinity'):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+
+    return [set(cpus[(worker_idx * n_threads + thread_idx) % len(cpus)]
+                for thread_idx in range(n_threads))
+            for worker_idx in range(n_workers)]
+
+
+def _init_worker(n_threads, cpu_sets, worker_counter):
+    # split the cores between the workers instead of each worker using all
+    # of them for its intra-op thread pool
+    set_num_threads(n_threads)
+
+    if cpu_sets:
+        with worker_counter.get_lock():
+            worker_idx = worker_counter.value
+            worker_counter.value += 1
+        os.sched_setaffinity(0, cpu_sets[worker_idx % len(cpu_sets)])
+
+
+def _classify_chunk(task):
+    img_paths, model_name, classify_fn = task
+    classifications = classify_fn(img_paths, model_name)
+    usage = memory_usage()
+    # the next chunk reports its own peak
+    reset_peak_memory()
+
+    return classifications, os.getpid(), usage
+
+
+def batches(img_paths, batch_size):
+    """
+    Yields lists of batch_size items (the last one may be shorter) of a list
+    or of any iterable, which is consumed lazily. batch_size can also be a
+    function returning the size of the next batch (e.g. a MemoryGuard).
+    """
+    img_paths = iter(img_paths)
+    next_size = batch_size if callable(batch_size) else lambda: batch_size
+    batch = list(islice(img_paths, next_size()))
+    while batch:
+        yield batch
+        batch = list(islice(img_paths, next_size()))
+
+
+def classify_serial(img_paths, model_name, classify_fn=classifier_batch,
+                    batch_size=CHUNK_SIZE, on_batch=None, memory_guard=None):
+    """
+    Classifies images in this process, batch_size images at a time.
+    Parameters & Returns: see classify_pool()
+    """
+    classifications = []
+    for batch in batches(img_paths, memory_guard or batch_size):
+        batch_classifications = classify_fn(batch, model_name)
+        if memory_guard is not None:
+            usage = memory_usage()
+            memory_guard.update(usage.get('peak', usage['rss']))
+            reset_peak_memory()
+        if on_batch is not None:
+            on_batch(batch_classifications)
+        classifications.extend(batch_classifications)
+
+    return classifications
+
+
+def classify_paths(img_paths, model_name, n_workers=1, run_stats=None,
+                   classify_fn=classifier_batch, batch_size=CHUNK_SIZE,
+                   n_threads=None, pin_cpus=False, on_batch=None,
+                   memory_guard=None):
+    """
+    Classifies images in this process when n_workers is 1, else with a pool
+    of n_workers processes sharing the model weights.
+    Parameters & Returns: see classify_pool()
+    """
+    if n_workers > 1:
+        return classify_pool(img_paths, model_name, n_workers, run_stats,
+                             classify_fn, batch_size, n_threads, pin_cpus,
+                             on_batch, memory_guard)
+
+    if n_threads is not None:
+        set_num_threads(n_threads)
+
+    return classify_serial(img_paths, model_name, classify_fn, batch_size,
+                           on_batch, memory_guard)
+
+
+def classify_pool(img_paths, model_name, n_workers, run_stats=None,
+                  classify_fn=classifier_batch, batch_size=CHUNK_SIZE,
+                  n_threads=None, pin_cpus=False, on_batch=None,
+                  memory_guard=None):
+    """
+    Classifies images using n_workers forked processes sharing the model
+    weights loaded in this (parent) process.
+    Parameters:
+     img_paths - paths (or content bytes) of the images to classify, a list
+                 or an iterable read as the workers need more images
+     model_name - model architecture, one of: resnet alexnet vgg (string)
+     n_workers - number of worker processes (int)
+     run_stats - optional dictionary updated with the number of workers and
+                 the memory usage of the parent and of each worker
+     classify_fn - function called as classify_fn(img_paths, model_name) to
+                   classify a batch of images, must be picklable (default-
+                   classifier_batch)
+     batch_size - number of images classified per classify_fn call (int)
+     n_threads - torch intra-op threads per worker (default- cores divided
+                 by n_workers)
+     pin_cpus - pin each worker to its own set of n_threads cores (bool)
+     on_batch - optional function called in this process with the list of
+                classifications of each batch as soon as it is done, in
+                img_paths order (e.g. to checkpoint them)
+     memory_guard - optional memory_budget.MemoryGuard deciding the size of
+                    the batches (instead of batch_size) from the memory used
+                    by the classifying processes
+    Returns:
+     classifications - classify_fn results in the same order as img_paths
+                       (list)
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        print("Process pool needs the fork start method, classifying in a single process")
+        return classify_serial(img_paths, model_name, classify_fn, batch_size,
+                               on_batch, memory_guard)
+
+    # load the weights once, before forking, so workers share them
+    load_model(model_name)
+
+    if n_threads is None:
+        n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+    cpu_sets = worker_cpu_sets(n_workers, n_threads) if pin_cpus else None
+    # the pool feeds tasks from a thread as fast as it can, so limit the
+    # number of tasks in flight
+    tasks_in_flight = threading.BoundedSemaphore(n_workers * TASKS_PER_WORKER)
+    # set when the results stop being consumed (a worker raised), so the
+    # pool's task feeding thread doesn't wait for a slot forever & the pool
+    # can be terminated
+    stop_feeding = threading.Event()
+
+    def tasks():
+        for batch in batches(img_paths, memory_guard or batch_size):
+            while not tasks_in_flight.acquire(timeout=FEED_POLL_SECS):
+                if stop_feeding.is_set():
+                    return
+            yield batch, model_name, classify_fn
+
+    classifications = []
+    workers_memory = {}
+    # memory of each worker as of its last chunk
+    workers_last_memory = {}
+    ctx = multiprocessing.get_context('fork')
+    worker_counter = ctx.Value('i', 0)
+    with ctx.Pool(n_workers, initializer=_init_worker,
+                  initargs=(n_threads, cpu_sets, worker_counter)) as pool:
+        try:
+            for chunk_classifications, pid, usage in pool.imap(_classify_chunk, tasks()):
+                tasks_in_flight.release()
+                if on_batch is not None:
+                    on_batch(chunk_classifications)
+                classifications.extend(chunk_classifications)
+                # keep the peak usage seen for each worker
+                if pid not in workers_memory or usage['rss'] > workers_memory[pid]['rss']:
+                    workers_memory[pid] = usage
+                if memory_guard is not None:
+                    # the weights pages are shared: count them once with the
+                    # parent & only the private peak of each worker
+                    workers_last_memory[pid] = usage
+                    memory_guard.update(memory_usage()['rss'] + sum(
+                        worker_usage.get('peak', worker_usage['rss']) - worker_usage.get('shared', 0.0)
+                        for worker_usage in workers_last_memory.values()))
+        except BaseException:
+            stop_feeding.set()
+            raise
+        # while the workers are alive so pss shows the shared pages split
+        parent_memory = memory_usage()
+
+    if run_stats is not None:
+        run_stats['n_workers'] = n_workers
+        run_stats['parent_memory'] = format_memory(parent_memory)
+        for worker_idx, pid in enumerate(sorted(workers_memory), 1):
+            run_stats['worker{}_memory'.format(worker_idx)] = format_memory(
+                workers_memory[pid])
+
+    return classifications